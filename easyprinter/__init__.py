@@ -9,8 +9,8 @@ __author__ = "EasyPrinter"
 
 from .models import (
     PrintSettings, PaperSize, PaperSource, PrintQuality, DuplexMode, PageOrientation,
-    ScanSettings, ScanResolution, ScanFormat, ScanSource,
-    PrinterStatus, PrinterState,
+    ScanSettings, ScanResolution, ScanFormat, ScanSource, ScanRegion, ScannerDevice,
+    PrinterStatus, PrinterState, FleetSummary,
     ImageAdjustments
 )
 
@@ -33,8 +33,8 @@ from .views import (
 __all__ = [
     # Models
     'PrintSettings', 'PaperSize', 'PaperSource', 'PrintQuality', 'DuplexMode', 'PageOrientation',
-    'ScanSettings', 'ScanResolution', 'ScanFormat', 'ScanSource',
-    'PrinterStatus', 'PrinterState',
+    'ScanSettings', 'ScanResolution', 'ScanFormat', 'ScanSource', 'ScanRegion', 'ScannerDevice',
+    'PrinterStatus', 'PrinterState', 'FleetSummary',
     'ImageAdjustments',
 
     # Services
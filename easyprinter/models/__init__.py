@@ -3,13 +3,13 @@
 """
 
 from .print_settings import PrintSettings, PaperSize, PaperSource, PrintQuality, DuplexMode, PageOrientation
-from .scan_settings import ScanSettings, ScanResolution, ScanFormat, ScanSource
-from .printer_status import PrinterStatus, PrinterState
+from .scan_settings import ScanSettings, ScanResolution, ScanFormat, ScanSource, ScanColorMode, ScanRegion, ScannerDevice
+from .printer_status import PrinterStatus, PrinterState, FleetSummary
 from .image_adjustments import ImageAdjustments
 
 __all__ = [
     'PrintSettings', 'PaperSize', 'PaperSource', 'PrintQuality', 'DuplexMode', 'PageOrientation',
-    'ScanSettings', 'ScanResolution', 'ScanFormat', 'ScanSource',
-    'PrinterStatus', 'PrinterState',
+    'ScanSettings', 'ScanResolution', 'ScanFormat', 'ScanSource', 'ScanColorMode', 'ScanRegion', 'ScannerDevice',
+    'PrinterStatus', 'PrinterState', 'FleetSummary',
     'ImageAdjustments'
 ]
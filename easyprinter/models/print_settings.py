@@ -4,7 +4,7 @@
 
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Optional
+from typing import Optional, Tuple
 
 from .image_adjustments import ImageAdjustments
 
@@ -19,6 +19,28 @@ class PaperSize(Enum):
     ENVELOPE_C5 = auto()
     ENVELOPE_DL = auto()
 
+    @property
+    def size_mm(self) -> Tuple[float, float]:
+        """Ширина и высота листа в книжной ориентации (мм)"""
+        return _PAPER_SIZES_MM[self]
+
+    @property
+    def size_points(self) -> Tuple[float, float]:
+        """Ширина и высота листа в книжной ориентации (пункты PDF)"""
+        width, height = self.size_mm
+        return width * 72.0 / 25.4, height * 72.0 / 25.4
+
+
+_PAPER_SIZES_MM = {
+    PaperSize.A4: (210.0, 297.0),
+    PaperSize.LETTER: (215.9, 279.4),
+    PaperSize.LEGAL: (215.9, 355.6),
+    PaperSize.A5: (148.0, 210.0),
+    PaperSize.ENVELOPE_10: (104.8, 241.3),
+    PaperSize.ENVELOPE_C5: (162.0, 229.0),
+    PaperSize.ENVELOPE_DL: (110.0, 220.0),
+}
+
 
 class PaperSource(Enum):
     """Источник бумаги"""
@@ -53,3 +53,26 @@ class PrinterStatus:
 
     # Последнее обновление статуса
     last_updated: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class FleetSummary:
+    """Сводный статус всех отслеживаемых принтеров"""
+
+    # Всего принтеров
+    total: int = 0
+
+    # Принтеров в сети
+    online: int = 0
+
+    # Принтеров не в сети
+    offline: int = 0
+
+    # Принтеров с ошибкой (замятие, нет бумаги, ошибка)
+    with_errors: int = 0
+
+    # Суммарное количество заданий в очередях
+    jobs_in_queue: int = 0
+
+    # Последнее обновление сводки
+    last_updated: datetime = field(default_factory=datetime.now)
@@ -6,6 +6,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from datetime import datetime
+from typing import List, Optional
 import os
 
 from .image_adjustments import ImageAdjustments
@@ -27,12 +28,90 @@ class ScanFormat(Enum):
     TIFF = "tiff"
 
 
+class ScanColorMode(Enum):
+    """Цветовой режим сканирования (значение - режим SANE)"""
+    COLOR = "Color"         # Цветной
+    GRAY = "Gray"           # Оттенки серого
+
+
 class ScanSource(Enum):
     """Источник сканирования"""
     FLATBED = "flatbed"     # Стекло сканера
     ADF = "adf"             # Автоподатчик документов
 
 
+@dataclass
+class ScanRegion:
+    """Область сканирования на стекле (миллиметры от левого верхнего угла)"""
+
+    left: float = 0.0
+    top: float = 0.0
+    width: float = 0.0
+    height: float = 0.0
+
+    @property
+    def is_empty(self) -> bool:
+        return self.width <= 0 or self.height <= 0
+
+    def to_pixels(self, dpi: float) -> tuple:
+        """Прямоугольник (x, y, ширина, высота) в пикселях при указанном DPI"""
+        scale = dpi / 25.4
+        return (
+            int(round(self.left * scale)),
+            int(round(self.top * scale)),
+            int(round(self.width * scale)),
+            int(round(self.height * scale))
+        )
+
+    @classmethod
+    def from_pixels(cls, x: float, y: float, width: float, height: float, dpi: float) -> 'ScanRegion':
+        """Создать область из прямоугольника в пикселях изображения с указанным DPI"""
+        scale = 25.4 / dpi
+        return cls(x * scale, y * scale, width * scale, height * scale)
+
+
+@dataclass
+class ScannerDevice:
+    """Сканер и его возможности (по данным scanimage -L / -A)"""
+
+    # Имя устройства SANE (для scanimage -d)
+    name: str
+
+    # Описание для пользователя
+    description: str = ""
+
+    # Поддерживаемые разрешения (DPI)
+    resolutions: List[int] = field(default_factory=list)
+
+    # Режимы цвета (Color, Gray, Lineart...)
+    modes: List[str] = field(default_factory=list)
+
+    # Источники (Flatbed, ADF...)
+    sources: List[str] = field(default_factory=list)
+
+    # Максимальная область сканирования (мм)
+    max_width_mm: float = 0.0
+    max_height_mm: float = 0.0
+
+    @property
+    def has_adf(self) -> bool:
+        return any('adf' in source.lower() or 'feeder' in source.lower() for source in self.sources)
+
+    def source_name(self, adf: bool) -> str:
+        """Имя источника в терминах устройства (ADF или стекло)"""
+        for source in self.sources:
+            is_adf = 'adf' in source.lower() or 'feeder' in source.lower()
+            if is_adf == adf:
+                return source
+        return "ADF" if adf else "Flatbed"
+
+    def nearest_resolution(self, dpi: int) -> int:
+        """Ближайшее поддерживаемое разрешение"""
+        if not self.resolutions or dpi in self.resolutions:
+            return dpi
+        return min(self.resolutions, key=lambda value: abs(value - dpi))
+
+
 @dataclass
 class ScanSettings:
     """Настройки сканирования"""
@@ -52,9 +131,24 @@ class ScanSettings:
     # Источник сканирования
     source: ScanSource = ScanSource.FLATBED
 
+    # Цветовой режим
+    color_mode: ScanColorMode = ScanColorMode.COLOR
+
     # Настройки изображения
     image_adjustments: ImageAdjustments = field(default_factory=ImageAdjustments)
 
+    # Область сканирования (None - всё стекло)
+    region: Optional[ScanRegion] = None
+
+    # Устройство SANE (None - первое найденное)
+    device: Optional[str] = None
+
+    # Качество JPEG для цветных и полутоновых страниц PDF (1-95)
+    jpeg_quality: int = 85
+
+    # PDF со слоями MRC: чёткая маска текста поверх фона в низком разрешении
+    pdf_mrc: bool = False
+
     def get_full_path(self) -> str:
         """Получить полный путь к файлу"""
         extension = self.format.value
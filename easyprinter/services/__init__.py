@@ -4,18 +4,44 @@
 
 from .image_processing_service import ImageProcessingService
 from .status_service import StatusService
-from .printer_service import PrinterService
+from .status_history import StatusHistory, HistorySeries
+from .printer_service import PrinterService, PrintStream
 from .scanner_service import ScannerService
+from .copy_service import CopyService, CopyCache
+from .scanner_cache import ScannerCache
+from .sane_session import SaneSession, SaneSessionError, SaneDeviceError
+from .scan_buffer import ScanBuffer
+from .batch_scan import BatchScanPipeline, BatchScanIncomplete, PageSink, SeparateFilesSink, MultiPageFileSink, ParallelPageEncoder
+from .document_writer import PdfWriter, TiffWriter
 from .logger_service import LoggerService, logger
 from .update_service import UpdateService
 from .settings_storage import SettingsStorage, settings_storage, UserPreferences
 from .sound_service import SoundService, sound_service
+from .metrics_service import MetricsRegistry, MetricsServer, metrics, metrics_server
 
 __all__ = [
     'ImageProcessingService',
     'StatusService',
+    'StatusHistory',
+    'HistorySeries',
     'PrinterService',
+    'PrintStream',
     'ScannerService',
+    'CopyService',
+    'CopyCache',
+    'ScannerCache',
+    'SaneSession',
+    'SaneSessionError',
+    'SaneDeviceError',
+    'ScanBuffer',
+    'BatchScanPipeline',
+    'BatchScanIncomplete',
+    'PageSink',
+    'SeparateFilesSink',
+    'MultiPageFileSink',
+    'ParallelPageEncoder',
+    'PdfWriter',
+    'TiffWriter',
     'LoggerService',
     'logger',
     'UpdateService',
@@ -23,5 +49,9 @@ __all__ = [
     'settings_storage',
     'UserPreferences',
     'SoundService',
-    'sound_service'
+    'sound_service',
+    'MetricsRegistry',
+    'MetricsServer',
+    'metrics',
+    'metrics_server'
 ]
@@ -0,0 +1,440 @@
+"""
+Конвейерное пакетное сканирование из автоподатчика (ADF)
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections import deque
+from io import BytesIO
+from threading import Event, Lock, Thread, Timer
+from typing import Callable, Dict, Iterable, List, Optional
+from PIL import Image
+
+from ..models import ScanSettings, ScanFormat
+from .image_processing_service import ImageProcessingService
+from .metrics_service import track_subprocess, JOB_STAGE_SECONDS
+from .pnm_stream import read_pnm_image
+from .document_writer import PdfWriter, TiffWriter, temp_sibling, commit_file, remove_partial
+
+
+# Коды выхода scanimage, при которых пакет считается завершённым:
+# 0 - успех, 7 - в автоподатчике кончились листы
+SCANIMAGE_BATCH_DONE_CODES = (0, 7)
+
+
+class BatchScanIncomplete(RuntimeError):
+    """Сканер остановился посреди пакета (замятие, ошибка устройства)
+
+    Уже отсканированные страницы не выбрасываются: приёмник завершает
+    запись, и пользователю остаётся доложить в автоподатчик остальные листы.
+    """
+
+    def __init__(self, reason: str, pages: int, paths: List[str]):
+        super().__init__(f"{reason}. Сканирование прервано, обработано страниц: {pages}")
+        self.pages = pages
+        self.paths = paths
+
+
+class PageSink(ABC):
+    """Приёмник страниц пакета
+
+    encode() вызывается параллельно в рабочих потоках,
+    write() - строго по порядку страниц в одном потоке записи.
+    """
+
+    @abstractmethod
+    def encode(self, index: int, image: Image.Image) -> object:
+        """Подготовить страницу к записи (сжатие и т.п.)"""
+
+    @abstractmethod
+    def write(self, index: int, encoded: object) -> None:
+        """Записать подготовленную страницу"""
+
+    @abstractmethod
+    def close(self) -> List[str]:
+        """Завершить запись; вернуть пути созданных файлов"""
+
+    def abort(self) -> None:
+        """Прервать запись и удалить созданные файлы"""
+        pass
+
+
+class SeparateFilesSink(PageSink):
+    """Каждая страница - отдельный файл: <имя>_001.<расширение>
+
+    dpi - разрешение, с которым страницы действительно отсканированы
+    (по умолчанию - из настроек).
+    """
+
+    def __init__(self, settings: ScanSettings, dpi: Optional[float] = None):
+        self._settings = settings
+        self._dpi = float(dpi or settings.resolution.value)
+        self._paths: List[str] = []
+
+    def encode(self, index: int, image: Image.Image) -> bytes:
+        buffer = BytesIO()
+        fmt = self._settings.format
+
+        if fmt == ScanFormat.PDF:
+            writer = PdfWriter(buffer, self._settings.jpeg_quality, mrc=self._settings.pdf_mrc)
+            writer.add_page(image, self._dpi)
+            writer.close()
+        elif fmt == ScanFormat.JPEG:
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            image.save(buffer, 'JPEG', quality=95)
+        elif fmt == ScanFormat.PNG:
+            image.save(buffer, 'PNG')
+        else:
+            image.save(buffer, 'TIFF')
+
+        return buffer.getvalue()
+
+    def write(self, index: int, encoded: bytes) -> None:
+        path = os.path.join(
+            self._settings.output_folder,
+            f"{self._settings.file_name}_{index + 1:03d}.{self._settings.format.value}"
+        )
+        temp_path = temp_sibling(path)
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(encoded)
+            commit_file(temp_path, path)
+        except BaseException:
+            remove_partial(temp_path)
+            raise
+        self._paths.append(path)
+
+    def close(self) -> List[str]:
+        return list(self._paths)
+
+    def abort(self) -> None:
+        # Как и многостраничный файл, прерванный пакет не оставляет страниц
+        for path in self._paths:
+            remove_partial(path)
+        self._paths.clear()
+
+
+class MultiPageFileSink(PageSink):
+    """Все страницы в один PDF или многостраничный TIFF
+
+    Страница дописывается в файл сразу после обработки и освобождается,
+    поэтому память не зависит от числа страниц. Файл пишется под временным
+    именем и появляется в папке только завершённым.
+    """
+
+    def __init__(self, settings: ScanSettings, dpi: Optional[float] = None):
+        if settings.format not in (ScanFormat.PDF, ScanFormat.TIFF):
+            raise ValueError(f"Формат {settings.format.value} не поддерживает несколько страниц")
+
+        self._path = settings.get_full_path()
+        self._temp_path = temp_sibling(self._path)
+        self._dpi = float(dpi or settings.resolution.value)
+        if settings.format == ScanFormat.PDF:
+            self._writer = PdfWriter(self._temp_path, settings.jpeg_quality, mrc=settings.pdf_mrc)
+        else:
+            self._writer = TiffWriter(self._temp_path)
+
+    def encode(self, index: int, image: Image.Image) -> object:
+        return self._writer.encode_page(image, self._dpi)
+
+    def write(self, index: int, encoded: object) -> None:
+        self._writer.write_page(encoded)
+
+    def close(self) -> List[str]:
+        try:
+            self._writer.close()
+            commit_file(self._temp_path, self._path)
+        except BaseException:
+            remove_partial(self._temp_path)
+            raise
+        return [self._path]
+
+    def abort(self) -> None:
+        self._writer.abort()
+        remove_partial(self._temp_path)
+
+
+def create_page_sink(settings: ScanSettings, dpi: Optional[float] = None) -> PageSink:
+    """Приёмник по формату: PDF и TIFF - один многостраничный файл, остальное - по файлу на страницу"""
+    if settings.format in (ScanFormat.PDF, ScanFormat.TIFF):
+        return MultiPageFileSink(settings, dpi)
+    return SeparateFilesSink(settings, dpi)
+
+
+class ParallelPageEncoder:
+    """Параллельное сжатие готовых страниц с записью по порядку
+
+    Кодеки Pillow (JPEG, zlib, libtiff) отпускают GIL, поэтому страницы
+    сжимаются в пуле потоков одновременно, а контейнер собирается в
+    исходном порядке. В работе одновременно не больше 2 * workers страниц,
+    так что страницы можно подавать генератором.
+    """
+
+    def __init__(self, sink: PageSink, workers: Optional[int] = None,
+                 on_page_saved: Optional[Callable[[int], None]] = None):
+        self._sink = sink
+        self._workers = workers or min(4, os.cpu_count() or 1)
+        self._on_page_saved = on_page_saved
+
+    def run(self, pages: Iterable[Image.Image]) -> List[str]:
+        """Сжать и записать страницы; вернуть пути созданных файлов"""
+        in_flight: "deque[Future]" = deque()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="page-encode") as executor:
+                for index, image in enumerate(pages):
+                    if len(in_flight) >= self._workers * 2:
+                        self._write_next(in_flight)
+                    in_flight.append(executor.submit(self._encode, index, image))
+                    del image
+
+                while in_flight:
+                    self._write_next(in_flight)
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            self._sink.abort()
+            raise
+
+        return self._sink.close()
+
+    def _encode(self, index: int, image: Image.Image) -> tuple:
+        with JOB_STAGE_SECONDS.time(job="scan", stage="encode"):
+            return index, self._sink.encode(index, image)
+
+    def _write_next(self, in_flight: "deque[Future]") -> None:
+        """Дождаться самой ранней страницы и записать её"""
+        index, encoded = in_flight.popleft().result()
+        with JOB_STAGE_SECONDS.time(job="scan", stage="write"):
+            self._sink.write(index, encoded)
+        if self._on_page_saved:
+            self._on_page_saved(index)
+
+
+class BatchScanPipeline:
+    """Конвейер пакетного сканирования
+
+    Поток получения забирает готовые страницы от `scanimage --batch`,
+    пока следующая страница ещё протягивается через автоподатчик.
+    Рабочие потоки применяют коррекцию и сжимают страницы, поток записи
+    сохраняет их по порядку. Очереди ограничены: если обработка не успевает,
+    страницы ждут на диске во временной папке, а не в памяти.
+
+    Если сканер остановился посреди пакета (замятие), уже полученные
+    страницы дообрабатываются и приёмник завершает запись - run() сообщает
+    об ошибке через BatchScanIncomplete. Отмена и ошибки обработки или
+    записи откатывают весь пакет.
+    """
+
+    # Сколько распакованных страниц может ждать обработки
+    QUEUE_SIZE = 2
+
+    # Максимальная длительность пакета (секунды)
+    BATCH_TIMEOUT = 1800
+
+    def __init__(self, settings: ScanSettings, scanimage_args: List[str], sink: PageSink,
+                 image_processing: ImageProcessingService, workers: Optional[int] = None,
+                 on_page_scanned: Optional[Callable[[int], None]] = None,
+                 on_page_saved: Optional[Callable[[int], None]] = None):
+        self._settings = settings
+        self._scanimage_args = scanimage_args
+        self._sink = sink
+        self._image_processing = image_processing
+        self._workers = workers or min(4, os.cpu_count() or 1)
+        self._on_page_scanned = on_page_scanned
+        self._on_page_saved = on_page_saved
+
+        self._pages: "queue.Queue" = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._encoded: "queue.Queue" = queue.Queue(maxsize=self.QUEUE_SIZE + self._workers)
+        self._cancelled = Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = Lock()
+        # Ошибка сканера: конвейер не останавливается, полученные страницы дописываются
+        self._scan_error: Optional[BaseException] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._pages_scanned = 0
+        self._pages_written = 0
+
+    def run(self) -> List[str]:
+        """Выполнить пакет; вернуть пути сохранённых файлов"""
+        batch_dir = tempfile.mkdtemp(prefix="easyprinter_batch_")
+
+        threads = [Thread(target=self._acquire, args=(batch_dir,), name="batch-acquire", daemon=True)]
+        threads += [
+            Thread(target=self._process_pages, name=f"batch-process-{n}", daemon=True)
+            for n in range(self._workers)
+        ]
+        threads.append(Thread(target=self._write_pages, name="batch-write", daemon=True))
+
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            shutil.rmtree(batch_dir, ignore_errors=True)
+
+        if self._error is not None:
+            self._sink.abort()
+            raise self._error
+
+        if self._cancelled.is_set():
+            self._sink.abort()
+            raise RuntimeError("Сканирование отменено")
+
+        if self._scan_error is not None:
+            if self._pages_written == 0:
+                self._sink.abort()
+                raise self._scan_error
+            paths = self._sink.close()
+            raise BatchScanIncomplete(str(self._scan_error), self._pages_written, paths)
+
+        return self._sink.close()
+
+    def cancel(self) -> None:
+        """Прервать пакет"""
+        self._cancelled.set()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _fail(self, error: BaseException) -> None:
+        """Запомнить первую ошибку и остановить конвейер"""
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self.cancel()
+
+    def _put(self, target: "queue.Queue", item) -> bool:
+        """Положить в ограниченную очередь, реагируя на отмену"""
+        while not self._cancelled.is_set():
+            try:
+                target.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _acquire(self, batch_dir: str) -> None:
+        """Получение страниц от scanimage"""
+        args = self._scanimage_args + [
+            f"--batch={os.path.join(batch_dir, 'page%04d.pnm')}",
+            "--batch-print"
+        ]
+
+        try:
+            track_subprocess(args[0])
+            self._process = subprocess.Popen(
+                args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+            stderr_chunks: List[str] = []
+            stderr_thread = Thread(
+                target=lambda: stderr_chunks.append(self._process.stderr.read()), daemon=True
+            )
+            stderr_thread.start()
+
+            watchdog = Timer(self.BATCH_TIMEOUT, self.cancel)
+            watchdog.daemon = True
+            watchdog.start()
+
+            try:
+                # scanimage печатает имя файла, когда страница полностью записана
+                for line in self._process.stdout:
+                    path = line.strip()
+                    if not path:
+                        continue
+                    if self._cancelled.is_set():
+                        break
+
+                    with JOB_STAGE_SECONDS.time(job="scan", stage="batch_read"):
+                        with open(path, 'rb') as f:
+                            image = read_pnm_image(f)
+                    os.unlink(path)
+
+                    index = self._pages_scanned
+                    self._pages_scanned += 1
+                    if self._on_page_scanned:
+                        self._on_page_scanned(index)
+
+                    if not self._put(self._pages, (index, image)):
+                        break
+
+                self._process.wait()
+            finally:
+                watchdog.cancel()
+                if self._process.poll() is None:
+                    self._process.kill()
+                    self._process.wait()
+
+            stderr_thread.join(timeout=1)
+
+            if not self._cancelled.is_set():
+                if self._pages_scanned == 0 or self._process.returncode not in SCANIMAGE_BATCH_DONE_CODES:
+                    error_msg = "".join(stderr_chunks).strip() or "Автоподатчик пуст"
+                    # Конвейер не отменяем: уже полученные страницы будут дописаны
+                    self._scan_error = RuntimeError(f"Ошибка сканирования: {error_msg}")
+
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            # По одному маркеру конца на каждый рабочий поток
+            for _ in range(self._workers):
+                self._pages.put(None)
+
+    def _process_pages(self) -> None:
+        """Коррекция и сжатие страниц (параллельно)"""
+        while True:
+            item = self._pages.get()
+            if item is None:
+                break
+            if self._cancelled.is_set():
+                continue
+
+            index, image = item
+            try:
+                if self._settings.image_adjustments.has_changes:
+                    with JOB_STAGE_SECONDS.time(job="scan", stage="adjust"):
+                        image = self._image_processing.apply_adjustments(image, self._settings.image_adjustments)
+
+                with JOB_STAGE_SECONDS.time(job="scan", stage="encode"):
+                    encoded = self._sink.encode(index, image)
+                del image
+
+                self._put(self._encoded, (index, encoded))
+            except BaseException as e:
+                self._fail(e)
+
+        self._encoded.put(None)
+
+    def _write_pages(self) -> None:
+        """Запись страниц строго по порядку"""
+        pending: Dict[int, object] = {}
+        next_index = 0
+        finished_workers = 0
+
+        while finished_workers < self._workers:
+            item = self._encoded.get()
+            if item is None:
+                finished_workers += 1
+                continue
+            if self._cancelled.is_set():
+                continue
+
+            index, encoded = item
+            pending[index] = encoded
+            try:
+                while next_index in pending:
+                    with JOB_STAGE_SECONDS.time(job="scan", stage="write"):
+                        self._sink.write(next_index, pending.pop(next_index))
+                    if self._on_page_saved:
+                        self._on_page_saved(next_index)
+                    next_index += 1
+                    self._pages_written = next_index
+            except BaseException as e:
+                self._fail(e)
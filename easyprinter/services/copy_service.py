@@ -0,0 +1,380 @@
+"""
+Копирование: скан сразу на печать
+"""
+
+import copy
+import time
+from io import BytesIO
+from threading import Lock, Timer
+from typing import BinaryIO, Callable, List, Optional, Tuple
+from PIL import Image
+
+from ..models import (
+    ScanSettings, ScanSource, ScanResolution, ScanColorMode, ScanRegion, PrintSettings, PageOrientation
+)
+from .scanner_service import ScannerService
+from .printer_service import PrinterService, PrintStream
+from .image_processing_service import ImageProcessingService
+from .scan_buffer import ScanBuffer
+from .batch_scan import BatchScanIncomplete, PageSink
+from .document_writer import PdfWriter, StripedPage, EncodedPage
+from .metrics_service import JOB_STAGE_SECONDS, JOBS_TOTAL
+
+
+class RecordingStream:
+    """Поток-тройник: данные уходят дальше и запоминаются, пока их не больше limit байт
+
+    Без target данные только запоминаются.
+    """
+
+    def __init__(self, target: Optional[BinaryIO], limit: int):
+        self._target = target
+        self._limit = limit
+        self._copy: Optional[BytesIO] = BytesIO()
+
+    def write(self, data: bytes) -> int:
+        written = self._target.write(data) if self._target is not None else len(data)
+        if self._copy is not None:
+            if self._copy.tell() + len(data) > self._limit:
+                # Документ не помещается в кэш - перестаём копить
+                self._copy = None
+            else:
+                self._copy.write(data)
+        return written
+
+    def flush(self) -> None:
+        if self._target is not None:
+            self._target.flush()
+
+    @property
+    def recorded(self) -> Optional[bytes]:
+        """Записанный документ целиком (None - превысил лимит)"""
+        return self._copy.getvalue() if self._copy is not None else None
+
+
+class CachedCopy:
+    """Готовый к печати документ последней копии"""
+
+    def __init__(self, document: bytes, print_settings: PrintSettings, page_count: int):
+        self.document = document
+        self.print_settings = print_settings
+        self.page_count = page_count
+        self.created = time.monotonic()
+
+
+class CopyCache:
+    """Последняя копия для повторной печати без сканера
+
+    Хранится уже сжатый PDF, отправленный на принтер: он в десятки раз
+    меньше растра. Документы больше MAX_BYTES не запоминаются, запись
+    удаляется через EXPIRY секунд - оригинал на стекле мог смениться.
+    """
+
+    # Предел размера документа в кэше (байты)
+    MAX_BYTES = 64 * 1024 * 1024
+
+    # Срок хранения (секунды)
+    EXPIRY = 15 * 60
+
+    def __init__(self, max_bytes: Optional[int] = None, expiry: Optional[float] = None):
+        self.max_bytes = max_bytes or self.MAX_BYTES
+        self.expiry = expiry or self.EXPIRY
+        self._entry: Optional[CachedCopy] = None
+        self._timer: Optional[Timer] = None
+        self._lock = Lock()
+
+    def store(self, document: Optional[bytes], print_settings: PrintSettings, page_count: int) -> bool:
+        """Запомнить документ (None или слишком большой - очистить кэш); True - сохранён"""
+        with self._lock:
+            self._cancel_timer()
+            if document is None or len(document) > self.max_bytes:
+                self._entry = None
+                return False
+
+            self._entry = CachedCopy(document, copy.deepcopy(print_settings), page_count)
+            self._timer = Timer(self.expiry, self.clear)
+            self._timer.daemon = True
+            self._timer.start()
+            return True
+
+    def get(self) -> Optional[CachedCopy]:
+        """Сохранённая копия, если не устарела"""
+        with self._lock:
+            if self._entry is not None and time.monotonic() - self._entry.created > self.expiry:
+                self._entry = None
+            return self._entry
+
+    def clear(self) -> None:
+        """Забыть сохранённую копию"""
+        with self._lock:
+            self._cancel_timer()
+            self._entry = None
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+class PrintJobSink(PageSink):
+    """Приёмник пакета: страницы уходят на принтер по мере готовности
+
+    CUPS отдаёт задание PDF принтеру только после конца документа, поэтому
+    пакет одним заданием начал бы печататься лишь после последнего листа.
+    При одном экземпляре каждая страница уходит отдельным заданием: принтер
+    печатает её, пока сканируются следующие, и пакет занимает время более
+    медленного из устройств, а не их сумму. Разложить несколько экземпляров
+    по комплектам может только спулер - тогда пакет идёт одним заданием.
+    Отменить уже отправленные страницы нельзя.
+    """
+
+    def __init__(self, open_job: Callable[[], PrintStream], print_settings: PrintSettings, dpi: float,
+                 on_page_sent: Optional[Callable[[int], None]] = None, record_limit: int = 0):
+        self._open_job = open_job
+        self._dpi = dpi
+        self._media_size = CopyService.media_size(print_settings)
+        self._scale = print_settings.scale / 100.0
+        self._on_page_sent = on_page_sent
+
+        # Общее задание - только для комплектов; иначе документ целиком лишь копится для кэша
+        self._job: Optional[PrintStream] = open_job() if print_settings.copies > 1 else None
+        self._recorder = RecordingStream(self._job.stream if self._job else None, record_limit)
+        self._writer = PdfWriter(self._recorder)
+
+    @property
+    def page_count(self) -> int:
+        return self._writer.page_count
+
+    @property
+    def document(self) -> Optional[bytes]:
+        """Весь пакет одним документом (None - больше record_limit)"""
+        return self._recorder.recorded
+
+    def encode(self, index: int, image: Image.Image) -> EncodedPage:
+        return self._writer.encode_page(image, self._dpi)
+
+    def write(self, index: int, encoded: EncodedPage) -> None:
+        if self._job is None:
+            self._print_page(encoded)
+        self._writer.write_page(encoded, self._media_size, self._scale)
+        if self._on_page_sent:
+            self._on_page_sent(index)
+
+    def _print_page(self, encoded: EncodedPage) -> None:
+        """Отправить страницу отдельным заданием"""
+        job = self._open_job()
+        try:
+            writer = PdfWriter(job.stream)
+            writer.write_page(encoded, self._media_size, self._scale)
+            writer.close()
+            job.close()
+        except BaseException:
+            job.abort()
+            raise
+
+    def close(self) -> List[str]:
+        try:
+            self._writer.close()
+            if self._job is not None:
+                self._job.close()
+        except BaseException:
+            self.abort()
+            raise
+        return []
+
+    def abort(self) -> None:
+        self._writer.abort()
+        if self._job is not None:
+            self._job.abort()
+
+
+class CopyService:
+    """Копирование без промежуточных файлов
+
+    Кадр сканируется в ScanBuffer, настройки изображения применяются
+    полосами и каждая полоса сразу сжимается - за один проход по пикселям.
+    Масштаб задаётся матрицей размещения на листе PDF, без пересчёта
+    пикселей. Документ пишется прямо в stdin спулера.
+    """
+
+    # Собственное разрешение печатающего механизма HP LaserJet M1536dnf
+    PRINTER_DPI = 600
+
+    def __init__(self, scanner_service: ScannerService, printer_service: PrinterService,
+                 image_processing: ImageProcessingService, cache: Optional[CopyCache] = None):
+        self._scanner_service = scanner_service
+        self._printer_service = printer_service
+        self._image_processing = image_processing
+        self._cache = cache or CopyCache()
+
+    @property
+    def last_copy(self) -> Optional[CachedCopy]:
+        """Последняя копия, которую можно напечатать ещё раз"""
+        return self._cache.get()
+
+    def scan_settings_for(self, print_settings: PrintSettings, source: ScanSource = ScanSource.FLATBED,
+                          device: Optional[str] = None) -> ScanSettings:
+        """Профиль копии под принтер: его разрешение, оттенки серого, область - лист бумаги
+
+        Кадр совпадает с растром принтера точка в точку, поэтому при печати
+        нет ни пересчёта разрешения, ни преобразования цвета, а данных
+        меньше, чем у цветного скана.
+        """
+        settings = ScanSettings(
+            resolution=ScanResolution(self.PRINTER_DPI),
+            source=source,
+            color_mode=ScanColorMode.GRAY,
+            device=device
+        )
+
+        # Со стекла берём ровно лист (книжная ориентация - так он лежит на стекле)
+        width, height = print_settings.paper_size.size_mm
+        devices = self._scanner_service.get_scanner_devices()
+        scanner = next((d for d in devices if d.name == device), None) if device else next(iter(devices), None)
+        if scanner is not None and scanner.max_width_mm > 0 and scanner.max_height_mm > 0:
+            width = min(width, scanner.max_width_mm)
+            height = min(height, scanner.max_height_mm)
+        settings.region = ScanRegion(0.0, 0.0, width, height)
+
+        return settings
+
+    def copy(self, scan_settings: ScanSettings, print_settings: PrintSettings,
+             on_progress: Optional[Callable[[str, int], None]] = None) -> None:
+        """Отсканировать страницу и напечатать её print_settings.copies раз"""
+        notify = on_progress or (lambda message, progress: None)
+
+        try:
+            with JOB_STAGE_SECONDS.time(job="copy", stage="total"):
+                notify("Сканирование документа...", 20)
+                with JOB_STAGE_SECONDS.time(job="copy", stage="scan"):
+                    # Кадр копии (600 DPI, оттенки серого) - десятки мегабайт: держим его
+                    # в памяти, а не в файле буфера - промежуточных файлов у копии нет
+                    buffer = self._scanner_service.scan_to_buffer(scan_settings, in_memory=True)
+
+                try:
+                    dpi = self._scanner_service.effective_resolution(scan_settings)
+                    notify("Печать копии...", 60)
+                    self.print_buffer(buffer, dpi, print_settings)
+                finally:
+                    buffer.close()
+        except Exception:
+            JOBS_TOTAL.inc(job="copy", result="error")
+            raise
+
+        JOBS_TOTAL.inc(job="copy", result="success")
+        notify("Копирование завершено", 100)
+
+    def copy_batch(self, scan_settings: ScanSettings, print_settings: PrintSettings,
+                   on_progress: Optional[Callable[[str, int], None]] = None) -> int:
+        """Скопировать все листы из автоподатчика; вернуть число страниц
+
+        Этапы идут конвейером пакетного сканирования: пока лист протягивается
+        через автоподатчик, предыдущие обрабатываются и уходят на принтер
+        (см. PrintJobSink). Очереди между этапами ограничены, поэтому память
+        не зависит от числа листов.
+        """
+        notify = on_progress or (lambda message, progress: None)
+
+        # Коррекция применяется на этапе обработки конвейера
+        settings = copy.deepcopy(scan_settings)
+        settings.source = ScanSource.ADF
+        settings.image_adjustments = print_settings.image_adjustments
+
+        try:
+            with JOB_STAGE_SECONDS.time(job="copy_batch", stage="total"):
+                notify("Сканирование из автоподатчика...", 5)
+                sink = PrintJobSink(
+                    lambda: self._printer_service.open_stream(print_settings, title="Копия"),
+                    print_settings, self._scanner_service.effective_resolution(settings),
+                    on_page_sent=lambda index: notify(
+                        f"Отправлена на печать страница {index + 1}", min(95, 10 + index * 5)
+                    ),
+                    record_limit=self._cache.max_bytes
+                )
+                try:
+                    self._scanner_service.scan_batch(settings, sink)
+                except BatchScanIncomplete:
+                    # Отсканированные до замятия страницы уже ушли на печать
+                    raise
+                except BaseException:
+                    sink.abort()
+                    raise
+        except Exception:
+            JOBS_TOTAL.inc(job="copy_batch", result="error")
+            raise
+
+        self._cache.store(sink.document, print_settings, sink.page_count)
+        JOBS_TOTAL.inc(job="copy_batch", result="success")
+        notify(f"Копирование завершено, страниц: {sink.page_count}", 100)
+        return sink.page_count
+
+    def print_buffer(self, buffer: ScanBuffer, dpi: float, print_settings: PrintSettings) -> None:
+        """Напечатать кадр из буфера, отсканированный с разрешением dpi"""
+        # Спулер запускается сразу и ждёт данные, пока страница сжимается
+        job = self._printer_service.open_stream(print_settings, title="Копия")
+        try:
+            recorder = RecordingStream(job.stream, self._cache.max_bytes)
+            writer = PdfWriter(recorder)
+
+            with JOB_STAGE_SECONDS.time(job="copy", stage="process"):
+                page = self.encode_page(writer, buffer, dpi, print_settings)
+
+            with JOB_STAGE_SECONDS.time(job="copy", stage="print"):
+                writer.write_page(page, self.media_size(print_settings), print_settings.scale / 100.0)
+                writer.close()
+                job.close()
+        except BaseException:
+            job.abort()
+            raise
+
+        self._cache.store(recorder.recorded, print_settings, 1)
+
+    def print_again(self, copies: Optional[int] = None,
+                    on_progress: Optional[Callable[[str, int], None]] = None) -> int:
+        """Напечатать последнюю копию ещё раз, без сканирования; вернуть число страниц"""
+        notify = on_progress or (lambda message, progress: None)
+
+        cached = self._cache.get()
+        if cached is None:
+            raise RuntimeError("Нет сохранённой копии - отсканируйте документ заново")
+
+        print_settings = copy.deepcopy(cached.print_settings)
+        if copies is not None:
+            print_settings.copies = copies
+
+        try:
+            with JOB_STAGE_SECONDS.time(job="copy_again", stage="print"):
+                notify("Печать копии...", 50)
+                job = self._printer_service.open_stream(print_settings, title="Копия")
+                try:
+                    job.stream.write(cached.document)
+                    job.close()
+                except BaseException:
+                    job.abort()
+                    raise
+        except Exception:
+            JOBS_TOTAL.inc(job="copy_again", result="error")
+            raise
+
+        JOBS_TOTAL.inc(job="copy_again", result="success")
+        notify("Копирование завершено", 100)
+        return cached.page_count
+
+    def encode_page(self, writer: PdfWriter, buffer: ScanBuffer, dpi: float,
+                    print_settings: PrintSettings) -> StripedPage:
+        """Применить настройки изображения и сжать кадр полосами"""
+        adjustments = print_settings.image_adjustments
+        if not adjustments.has_changes:
+            return writer.encode_buffer(buffer, dpi)
+
+        sample = self._image_processing.apply_adjustments(buffer.sample(), adjustments)
+        bands = self._image_processing.adjusted_bands(buffer, adjustments)
+        return writer.encode_bands(bands, sample, buffer.width, buffer.height, dpi)
+
+    @staticmethod
+    def media_size(print_settings: PrintSettings) -> Tuple[float, float]:
+        """Размер листа в пунктах с учётом ориентации"""
+        width, height = print_settings.paper_size.size_points
+        if print_settings.orientation == PageOrientation.LANDSCAPE:
+            return height, width
+        return width, height
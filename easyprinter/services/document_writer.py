@@ -0,0 +1,579 @@
+"""
+Постраничная запись многостраничных PDF и TIFF
+"""
+
+import os
+import platform
+import tempfile
+import zlib
+from enum import Enum
+from io import BytesIO
+from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from PIL import Image, TiffImagePlugin
+
+from .scan_buffer import ScanBuffer
+
+
+# Качество JPEG для цветных и серых страниц
+DEFAULT_JPEG_QUALITY = 85
+
+# Разрешение слоёв MRC: фон и цвет текста (маска текста - в разрешении скана)
+MRC_BACKGROUND_DPI = 100
+MRC_FOREGROUND_DPI = 50
+
+
+class PageContent(Enum):
+    """Тип содержимого страницы для выбора сжатия"""
+    BILEVEL = "bilevel"     # Текст/чертёж: чёрное на белом -> CCITT G4
+    GRAPHICS = "graphics"   # Серое с несколькими уровнями -> Flate
+    GRAY = "gray"           # Серые полутона (фото) -> JPEG
+    COLOR = "color"         # Цвет -> JPEG
+
+
+class EncodedPage:
+    """Страница, сжатая для записи в PDF"""
+
+    def __init__(self, data: bytes, width: int, height: int, color_space: str,
+                 bits_per_component: int, filter_name: str, dpi: float, decode_parms: str = ""):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.color_space = color_space  # Пустая строка - маска-трафарет (ImageMask)
+        self.bits_per_component = bits_per_component
+        self.filter_name = filter_name
+        self.dpi = dpi
+        self.decode_parms = decode_parms
+
+        # Размер страницы в пунктах (у слоёв MRC он задаётся маской)
+        self.page_size = (width * 72.0 / dpi, height * 72.0 / dpi)
+
+        # MRC: цвет текста, рисуемый поверх этой страницы через маску
+        self.foreground: Optional['EncodedPage'] = None
+        self.mask: Optional['EncodedPage'] = None
+
+
+def flatten_image(image: Image.Image) -> Image.Image:
+    """Привести изображение к режиму, который можно положить в PDF (1, L или RGB)"""
+    if image.mode in ('1', 'L', 'RGB'):
+        return image
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[3])
+        return background
+    return image.convert('RGB')
+
+
+def classify_page(image: Image.Image) -> PageContent:
+    """Определить тип содержимого страницы по гистограмме и насыщенности"""
+    if image.mode == '1':
+        return PageContent.BILEVEL
+
+    # Прореживаем без усреднения: сглаживание при уменьшении
+    # размыло бы края букв в полутона
+    step = max(1, max(image.size) // 1000)
+    pixels = np.asarray(image)[::step, ::step]
+
+    if pixels.ndim == 3:
+        wide = pixels.astype(np.int32)
+        chroma = wide.max(axis=2) - wide.min(axis=2)
+        if np.count_nonzero(chroma > 40) > chroma.size * 0.01:
+            return PageContent.COLOR
+        # Яркость по ITU-R 601, как в Image.convert('L')
+        pixels = (wide[..., 0] * 299 + wide[..., 1] * 587 + wide[..., 2] * 114) // 1000
+
+    histogram = np.bincount(pixels.ravel(), minlength=256)
+    total = histogram.sum()
+
+    # Почти нет полутонов - текст или чертёж
+    if histogram[70:186].sum() < total * 0.06:
+        return PageContent.BILEVEL
+
+    # Немного различных уровней - графика, хорошо сжимается без потерь
+    if np.count_nonzero(histogram > total * 0.001) <= 16:
+        return PageContent.GRAPHICS
+
+    return PageContent.GRAY
+
+
+def otsu_threshold(image: Image.Image) -> int:
+    """Порог бинаризации по методу Оцу"""
+    histogram = np.array(image.convert('L').histogram(), dtype=np.float64)
+    levels = np.arange(256)
+
+    # Порог, максимизирующий межклассовую дисперсию
+    weight_dark = np.cumsum(histogram)
+    weight_light = weight_dark[-1] - weight_dark
+    sum_dark = np.cumsum(histogram * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+    return int(np.argmax(weight_dark * weight_light * (mean_dark - mean_light) ** 2))
+
+
+def to_bilevel(image: Image.Image, threshold: Optional[int] = None) -> Image.Image:
+    """Перевести в 1 бит (порог по умолчанию - по методу Оцу)"""
+    if image.mode == '1':
+        return image
+
+    gray = image.convert('L')
+    if threshold is None:
+        threshold = otsu_threshold(gray)
+    return gray.point(lambda value: 255 if value > threshold else 0, '1')
+
+
+def encode_g4(image: Image.Image) -> Tuple[bytes, bool]:
+    """Сжать 1-битное изображение в CCITT G4; вернуть данные и признак BlackIs1"""
+    buffer = BytesIO()
+    # Одна полоса на всю страницу - её данные и есть поток CCITT для PDF
+    image.save(buffer, 'TIFF', compression='group4', tiffinfo={278: image.height})
+
+    tiff = Image.open(BytesIO(buffer.getvalue()))
+    offset = tiff.tag_v2[273][0]
+    length = tiff.tag_v2[279][0]
+    # Photometric 1 (BlackIsZero) - в данных 1 означает чёрный
+    black_is_1 = tiff.tag_v2.get(262, 0) == 1
+
+    return buffer.getvalue()[offset:offset + length], black_is_1
+
+
+def _block_view(pixels: np.ndarray, block: int) -> np.ndarray:
+    """Разбить массив (H, W, ...) на блоки block x block: (H/b, b, W/b, b, ...)
+
+    Края дополняются повтором последней строки/столбца до кратного размера.
+    """
+    height, width = pixels.shape[:2]
+    pad_y = -height % block
+    pad_x = -width % block
+    if pad_y or pad_x:
+        padding = [(0, pad_y), (0, pad_x)] + [(0, 0)] * (pixels.ndim - 2)
+        pixels = np.pad(pixels, padding, mode='edge')
+    rows, cols = pixels.shape[0] // block, pixels.shape[1] // block
+    return pixels.reshape((rows, block, cols, block) + pixels.shape[2:])
+
+
+def _block_sums(pixels: np.ndarray, block: int) -> np.ndarray:
+    """Суммы по блокам block x block (неполные блоки на краях - по имеющимся пикселям)"""
+    rows = np.arange(0, pixels.shape[0], block)
+    cols = np.arange(0, pixels.shape[1], block)
+    # Сначала вдоль строк: так numpy идёт по памяти подряд
+    sums = np.add.reduceat(pixels, cols, axis=1, dtype=np.uint32)
+    return np.add.reduceat(sums, rows, axis=0)
+
+
+def _block_means(sums: np.ndarray, counts: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+    """Средний цвет блоков по суммам и числу пикселей; пустые блоки - fallback"""
+    counts = counts[..., None]
+    means = sums / np.maximum(counts, 1)
+    return np.where(counts > 0, means, fallback).round().astype(np.uint8)
+
+
+def segment_mrc(image: Image.Image, dpi: float) -> Tuple[np.ndarray, Image.Image, Image.Image]:
+    """Разделить страницу на слои MRC: маску текста, фон и цвет текста
+
+    Текстом считаются тёмные пиксели в контрастных блоках, где почти нет
+    полутонов (у фотографий полутонов много, они остаются в фоне).
+    Возвращает маску (True - текст) в разрешении скана и два уменьшенных слоя.
+    """
+    image = image.convert('RGB')
+    pixels = np.asarray(image)
+    luma = np.asarray(image.convert('L'), dtype=np.int16)
+    height, width = luma.shape
+
+    # Блоки около 3 мм - больше высоты строчной буквы
+    block = max(8, int(dpi / 8))
+    blocks = _block_view(luma, block)
+    lightest = blocks.max(axis=3).max(axis=1)
+    darkest = blocks.min(axis=3).min(axis=1)
+    contrast = lightest - darkest
+    middle = (lightest + darkest) // 2
+
+    # Доля полутонов: пиксели в средней половине диапазона яркости блока
+    quarter = (contrast // 4)[:, None, :, None]
+    midtones = (np.abs(blocks - middle[:, None, :, None]) < quarter).mean(axis=3).mean(axis=1)
+    is_text_block = (contrast > 80) & (midtones < 0.3)
+
+    threshold = np.where(is_text_block, middle, -1).astype(np.int16)
+    threshold = np.repeat(np.repeat(threshold, block, axis=0), block, axis=1)[:height, :width]
+    mask = luma < threshold
+
+    ink_pixels = np.where(mask[..., None], pixels, np.uint8(0))
+    ink_counts = mask.astype(np.uint8)
+
+    # Фон: средний цвет без пикселей текста (под буквами - цвет бумаги вокруг)
+    background_block = max(1, int(round(dpi / MRC_BACKGROUND_DPI)))
+    totals = _block_sums(pixels, background_block)
+    edges = np.arange(0, height, background_block), np.arange(0, width, background_block)
+    all_counts = np.outer(
+        np.minimum(background_block, height - edges[0]),
+        np.minimum(background_block, width - edges[1])
+    )
+    text_counts = _block_sums(ink_counts, background_block)
+    background = _block_means(
+        totals - _block_sums(ink_pixels, background_block),
+        all_counts - text_counts,
+        totals / all_counts[..., None]
+    )
+
+    # Цвет текста: средний цвет пикселей маски. Блоки без текста не видны,
+    # их заполняем средним цветом текста, чтобы JPEG не размывал в буквы чужой цвет
+    foreground_block = max(1, int(round(dpi / MRC_FOREGROUND_DPI)))
+    ink = pixels[mask].mean(axis=0) if mask.any() else np.zeros(3)
+    foreground = _block_means(
+        _block_sums(ink_pixels, foreground_block),
+        _block_sums(ink_counts, foreground_block),
+        ink
+    )
+
+    return mask, Image.fromarray(background, 'RGB'), Image.fromarray(foreground, 'RGB')
+
+
+class StripedPage:
+    """Страница PDF из горизонтальных полос-изображений (сверху вниз)
+
+    Так кадр из ScanBuffer сжимается полосами, без полноразмерной копии.
+    """
+
+    def __init__(self, strips: List[EncodedPage], width: int, height: int, dpi: float):
+        self.strips = strips
+        self.page_size = (width * 72.0 / dpi, height * 72.0 / dpi)
+
+
+class PdfWriter:
+    """Инкрементальная запись PDF
+
+    Каждая страница сразу пишется в выходной поток, в памяти остаются
+    только смещения объектов. Позиция считается самостоятельно, поэтому
+    подходит и поток без seek (например, stdin принтера).
+    """
+
+    # Зарезервированные номера объектов
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, output: Union[str, BinaryIO], jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+                 auto_compression: bool = True, mrc: bool = False):
+        if isinstance(output, str):
+            self._stream: BinaryIO = open(output, 'wb')
+            self._owns_stream = True
+        else:
+            self._stream = output
+            self._owns_stream = False
+
+        self._jpeg_quality = jpeg_quality
+        self._auto_compression = auto_compression
+        self._mrc = mrc
+        self._position = 0
+        self._offsets: List[int] = [0, 0, 0]  # 0 - свободный объект, 1-2 - каталог и дерево страниц
+        self._page_ids: List[int] = []
+        self._closed = False
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(self.CATALOG_ID, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def encode_page(self, image: Image.Image, dpi: float) -> EncodedPage:
+        """Сжать страницу подходящим способом (можно вызывать из нескольких потоков)
+
+        Текст - CCITT G4, серая графика - Flate, фото и цвет - JPEG.
+        В режиме MRC страницы с фото и текстом раскладываются на слои.
+        """
+        image = flatten_image(image)
+
+        if self._auto_compression:
+            content = classify_page(image)
+        else:
+            content = PageContent.BILEVEL if image.mode == '1' else PageContent.COLOR
+
+        if content == PageContent.BILEVEL:
+            return self._encode_bilevel(to_bilevel(image), dpi, "DeviceGray")
+
+        if self._mrc and content in (PageContent.GRAY, PageContent.COLOR):
+            page = self._encode_mrc(image, dpi)
+            if page is not None:
+                return page
+
+        if content == PageContent.GRAPHICS:
+            gray = image.convert('L')
+            data = zlib.compress(gray.tobytes(), 6)
+            return EncodedPage(data, gray.width, gray.height, "DeviceGray", 8, "FlateDecode", dpi)
+
+        if content == PageContent.GRAY:
+            image = image.convert('L')
+
+        return self._encode_jpeg(image, dpi)
+
+    def encode_buffer(self, buffer: ScanBuffer, dpi: float) -> StripedPage:
+        """Сжать кадр из ScanBuffer полосами (можно вызывать из нескольких потоков)
+
+        Тип содержимого и порог бинаризации определяются один раз по
+        прореженной копии, чтобы все полосы были сжаты одинаково.
+        Слои MRC для буфера не строятся.
+        """
+        return self.encode_bands(buffer.bands(), buffer.sample(), buffer.width, buffer.height, dpi)
+
+    def encode_bands(self, bands: Iterable[Tuple[int, Image.Image]], sample: Image.Image,
+                     width: int, height: int, dpi: float) -> StripedPage:
+        """Сжать кадр, заданный полосами сверху вниз; sample - его прореженная копия"""
+        if self._auto_compression:
+            content = classify_page(sample)
+        else:
+            content = PageContent.COLOR
+        threshold = otsu_threshold(sample) if content == PageContent.BILEVEL else None
+
+        strips = []
+        for _, band in bands:
+            if content == PageContent.BILEVEL:
+                strips.append(self._encode_bilevel(to_bilevel(band, threshold), dpi, "DeviceGray"))
+            elif content == PageContent.GRAPHICS:
+                gray = band.convert('L')
+                strips.append(EncodedPage(zlib.compress(gray.tobytes(), 6), gray.width, gray.height,
+                                          "DeviceGray", 8, "FlateDecode", dpi))
+            else:
+                strips.append(self._encode_jpeg(band.convert('L') if content == PageContent.GRAY else band, dpi))
+
+        return StripedPage(strips, width, height, dpi)
+
+    def _encode_jpeg(self, image: Image.Image, dpi: float) -> EncodedPage:
+        """Сжать полутоновое или цветное изображение в JPEG"""
+        buffer = BytesIO()
+        image.save(buffer, 'JPEG', quality=self._jpeg_quality, optimize=True)
+        color_space = "DeviceGray" if image.mode == 'L' else "DeviceRGB"
+        return EncodedPage(buffer.getvalue(), image.width, image.height, color_space, 8, "DCTDecode", dpi)
+
+    def _encode_bilevel(self, bilevel: Image.Image, dpi: float, color_space: str) -> EncodedPage:
+        """Сжать 1-битное изображение в CCITT G4 (пустой color_space - маска-трафарет)"""
+        data, black_is_1 = encode_g4(bilevel)
+        decode_parms = (
+            f"<< /K -1 /Columns {bilevel.width} /Rows {bilevel.height} "
+            f"/BlackIs1 {'true' if black_is_1 else 'false'} >>"
+        )
+        return EncodedPage(data, bilevel.width, bilevel.height, color_space, 1,
+                           "CCITTFaxDecode", dpi, decode_parms)
+
+    def _encode_mrc(self, image: Image.Image, dpi: float) -> Optional[EncodedPage]:
+        """Разложить страницу на фон, цвет текста и маску текста (None - текста нет)"""
+        mask, background, foreground = segment_mrc(image, dpi)
+        if not mask.any():
+            return None
+
+        # В маске-трафарете чёрные (нулевые) пиксели - те, что закрашиваются
+        stencil = self._encode_bilevel(Image.fromarray(~mask), dpi, "")
+
+        page = self._encode_jpeg(background, dpi * background.width / image.width)
+        page.page_size = stencil.page_size
+        page.foreground = self._encode_jpeg(foreground, dpi * foreground.width / image.width)
+        page.mask = stencil
+        return page
+
+    def write_page(self, page: Union[EncodedPage, StripedPage],
+                   media_size: Optional[Tuple[float, float]] = None, scale: float = 1.0) -> None:
+        """Дописать сжатую страницу
+
+        media_size - размер листа в пунктах: изображение ставится в его левый
+        верхний угол в масштабе scale и обрезается по краю листа (как на копире).
+        Без него лист совпадает с изображением.
+        """
+        width_pt, height_pt = page.page_size
+        # Изображения и их место на странице: (ширина, высота, нижний край) в пунктах
+        images = []
+
+        if isinstance(page, StripedPage):
+            top_pt = height_pt
+            for strip in page.strips:
+                strip_height_pt = strip.height * 72.0 / strip.dpi
+                top_pt -= strip_height_pt
+                images.append((self._write_image(strip), (width_pt, strip_height_pt, top_pt)))
+        else:
+            images.append((self._write_image(page), (width_pt, height_pt, 0.0)))
+            if page.foreground is not None and page.mask is not None:
+                mask_id = self._write_image(page.mask)
+                images.append((self._write_image(page.foreground, f" /Mask {mask_id} 0 R"),
+                               (width_pt, height_pt, 0.0)))
+
+        if media_size is not None:
+            # Масштаб - матрицей размещения, без пересчёта пикселей
+            images = [
+                (object_id, (width * scale, height * scale, media_size[1] - (height_pt - bottom) * scale))
+                for object_id, (width, height, bottom) in images
+            ]
+            width_pt, height_pt = media_size
+
+        content = " ".join(
+            f"q {width:.4f} 0 0 {height:.4f} 0 {bottom:.4f} cm /Im{index} Do Q"
+            for index, (_, (width, height, bottom)) in enumerate(images)
+        ).encode('ascii')
+        content_id = self._next_id()
+        self._write_stream(content_id, "", content)
+
+        resources = " ".join(f"/Im{index} {object_id} 0 R" for index, (object_id, _) in enumerate(images))
+        page_id = self._next_id()
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent {self.PAGES_ID} 0 R "
+            f"/MediaBox [0 0 {width_pt:.2f} {height_pt:.2f}] "
+            f"/Resources << /XObject << {resources} >> >> "
+            f"/Contents {content_id} 0 R >>"
+        ).encode('ascii'))
+        self._page_ids.append(page_id)
+
+    def _write_image(self, page: EncodedPage, extra: str = "") -> int:
+        """Записать объект изображения; вернуть его номер"""
+        if page.color_space:
+            format_entries = f"/ColorSpace /{page.color_space} /BitsPerComponent {page.bits_per_component}"
+        else:
+            format_entries = "/ImageMask true"
+
+        image_id = self._next_id()
+        self._write_stream(
+            image_id,
+            f"/Type /XObject /Subtype /Image /Width {page.width} /Height {page.height} "
+            f"{format_entries} /Filter /{page.filter_name}"
+            + (f" /DecodeParms {page.decode_parms}" if page.decode_parms else "")
+            + extra,
+            page.data
+        )
+        return image_id
+
+    def add_page(self, image: Union[Image.Image, ScanBuffer], dpi: float) -> None:
+        """Сжать и дописать страницу (изображение или кадр из буфера)"""
+        if isinstance(image, ScanBuffer):
+            self.write_page(self.encode_buffer(image, dpi))
+        else:
+            self.write_page(self.encode_page(image, dpi))
+
+    def close(self) -> None:
+        """Записать дерево страниц, таблицу ссылок и закрыть поток"""
+        if self._closed:
+            return
+        self._closed = True
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(
+            self.PAGES_ID,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode('ascii')
+        )
+
+        xref_position = self._position
+        lines = [f"xref\n0 {len(self._offsets)}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{offset:010d} 00000 n \n" for offset in self._offsets[1:])
+        lines.append(
+            f"trailer\n<< /Size {len(self._offsets)} /Root {self.CATALOG_ID} 0 R >>\n"
+            f"startxref\n{xref_position}\n%%EOF\n"
+        )
+        self._write("".join(lines).encode('ascii'))
+
+        self._stream.flush()
+        if self._owns_stream:
+            self._stream.close()
+
+    def abort(self) -> None:
+        """Прервать запись без завершения документа"""
+        self._closed = True
+        if self._owns_stream:
+            self._stream.close()
+
+    def _next_id(self) -> int:
+        self._offsets.append(0)
+        return len(self._offsets) - 1
+
+    def _write(self, data: bytes) -> None:
+        self._stream.write(data)
+        self._position += len(data)
+
+    def _write_object(self, object_id: int, body: bytes) -> None:
+        self._offsets[object_id] = self._position
+        self._write(f"{object_id} 0 obj\n".encode('ascii') + body + b"\nendobj\n")
+
+    def _write_stream(self, object_id: int, dictionary: str, data: bytes) -> None:
+        self._offsets[object_id] = self._position
+        self._write(f"{object_id} 0 obj\n<< {dictionary} /Length {len(data)} >>\nstream\n".encode('ascii'))
+        self._write(data)
+        self._write(b"\nendstream\nendobj\n")
+
+
+class TiffWriter:
+    """Инкрементальная запись многостраничного TIFF
+
+    Страницы дописываются в файл по одной (TIFF требует seek, поэтому только файл).
+    Сжатие (encode_page) не зависит от файла и может идти в нескольких потоках.
+    """
+
+    def __init__(self, path: str, compression: str = "tiff_lzw"):
+        self._file = open(path, 'w+b')
+        self._writer = TiffImagePlugin.AppendingTiffWriter(self._file, new=True)
+        self._compression = compression
+        self._page_count = 0
+        self._closed = False
+
+    @property
+    def page_count(self) -> int:
+        return self._page_count
+
+    def encode_page(self, image: Image.Image, dpi: float) -> bytes:
+        """Сжать страницу в отдельный одностраничный TIFF (можно вызывать из нескольких потоков)"""
+        image = flatten_image(image)
+        compression = "group4" if image.mode == '1' else self._compression
+        buffer = BytesIO()
+        image.save(buffer, 'TIFF', compression=compression, dpi=(dpi, dpi))
+        return buffer.getvalue()
+
+    def write_page(self, data: bytes) -> None:
+        """Дописать сжатую страницу (смещения в её IFD поправит AppendingTiffWriter)"""
+        self._writer.write(data)
+        self._writer.newFrame()
+        self._page_count += 1
+
+    def add_page(self, image: Image.Image, dpi: float) -> None:
+        """Сжать и дописать страницу"""
+        self.write_page(self.encode_page(image, dpi))
+
+    def close(self) -> None:
+        """Завершить файл"""
+        if self._closed:
+            return
+        self._closed = True
+        self._writer.close()
+        self._file.close()
+
+    def abort(self) -> None:
+        """Прервать запись"""
+        self.close()
+
+
+def temp_sibling(path: str) -> str:
+    """Создать скрытый временный файл рядом с path (та же папка - тот же диск)"""
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".part", dir=directory or None)
+    os.close(fd)
+    return temp_path
+
+
+def commit_file(temp_path: str, path: str) -> None:
+    """Сбросить временный файл на диск и атомарно заменить им path
+
+    До переименования под именем path нет ничего или старая версия
+    целиком; недописанный файл в папке пользователя не появляется.
+    """
+    with open(temp_path, 'r+b') as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+    # Запись в каталоге о переименовании тоже должна дойти до диска
+    if platform.system() != "Windows":
+        directory_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+
+
+def remove_partial(path: Optional[str]) -> None:
+    """Удалить недописанный файл"""
+    if path and os.path.exists(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
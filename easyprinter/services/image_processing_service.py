@@ -4,9 +4,10 @@
 
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
-from typing import Union
+from typing import Iterator, Optional, Tuple, Union
 
-from ..models import ImageAdjustments
+from ..models import ImageAdjustments, ScanRegion
+from .scan_buffer import ScanBuffer
 
 
 class ImageProcessingService:
@@ -27,6 +28,55 @@ class ImageProcessingService:
 
         return result
 
+    def apply_adjustments_to_buffer(self, source: ScanBuffer, adjustments: ImageAdjustments) -> ScanBuffer:
+        """Применить настройки к кадру в буфере полосами; результат - новый буфер"""
+        result = ScanBuffer(source.mode, source.width, source.height)
+        try:
+            for top, band in self.adjusted_bands(source, adjustments):
+                result.write_band(top, band)
+        except BaseException:
+            result.close()
+            raise
+
+        return result
+
+    def adjusted_bands(self, source: ScanBuffer, adjustments: ImageAdjustments) -> Iterator[Tuple[int, Image.Image]]:
+        """Полосы кадра с применёнными настройками: (первая строка, изображение)
+
+        Результат совпадает с apply_adjustments: средняя яркость для контраста
+        считается по всему кадру, а полосы для резкости читаются с запасом
+        в строку сверху и снизу.
+        """
+        contrast_mean = None
+        if adjustments.contrast != 0:
+            # Контраст тянет к средней яркости кадра после изменения яркости
+            histogram = [0] * 256
+            for _, band in source.bands():
+                band = self.apply_brightness_contrast(band, adjustments.brightness, 0)
+                for level, count in enumerate(band.convert('L').histogram()):
+                    histogram[level] += count
+            contrast_mean = int(sum(level * count for level, count in enumerate(histogram)) / sum(histogram) + 0.5)
+
+        # Фильтр резкости 3x3 - на границе полосы нужны соседние строки
+        overlap = 1 if adjustments.sharpness > 0 else 0
+
+        for top in range(0, source.height, ScanBuffer.BAND_ROWS):
+            bottom = min(top + ScanBuffer.BAND_ROWS, source.height)
+            band_top = max(0, top - overlap)
+            band = source.band(band_top, bottom + overlap)
+
+            band = self.apply_brightness_contrast(band, adjustments.brightness, 0)
+            if contrast_mean is not None:
+                degenerate = Image.new('L', band.size, contrast_mean).convert(band.mode)
+                band = Image.blend(degenerate, band, 1.0 + adjustments.contrast / 100.0)
+            if abs(adjustments.gamma - 1.0) > 0.01:
+                band = self.apply_gamma(band, adjustments.gamma)
+            if adjustments.sharpness > 0:
+                band = self.apply_sharpness(band, adjustments.sharpness)
+
+            offset = top - band_top
+            yield top, band.crop((0, offset, band.width, offset + bottom - top))
+
     def apply_brightness_contrast(self, source: Image.Image, brightness: int, contrast: int) -> Image.Image:
         """Применить яркость и контрастность"""
         result = source
@@ -109,3 +159,38 @@ class ImageProcessingService:
     def rotate_image(self, source: Image.Image, angle: int) -> Image.Image:
         """Повернуть изображение на заданный угол"""
         return source.rotate(angle, expand=True)
+
+    def detect_content_region(self, source: Image.Image, dpi: float, margin_mm: float = 3.0,
+                              threshold: int = 32) -> Optional[ScanRegion]:
+        """Найти область с оригиналом на предварительном скане
+
+        Фон стекла оценивается по краям изображения; строки и столбцы, где
+        заметная доля пикселей отличается от фона, считаются содержимым.
+        Возвращает None, если оригинал не найден или занимает почти всё стекло.
+        """
+        gray = np.asarray(source.convert('L'), dtype=np.int16)
+        height, width = gray.shape
+        if height < 8 or width < 8:
+            return None
+
+        # Фон - медиана узкой рамки по краям
+        border = np.concatenate((gray[0], gray[-1], gray[:, 0], gray[:, -1]))
+        background = int(np.median(border))
+        mask = np.abs(gray - background) > threshold
+
+        # Отбрасываем одиночные пиксели шума: нужна доля не меньше 0.5% строки/столбца
+        rows = np.flatnonzero(mask.sum(axis=1) > max(1, width // 200))
+        cols = np.flatnonzero(mask.sum(axis=0) > max(1, height // 200))
+        if rows.size == 0 or cols.size == 0:
+            return None
+
+        margin = margin_mm * dpi / 25.4
+        left = max(0.0, float(cols[0]) - margin)
+        top = max(0.0, float(rows[0]) - margin)
+        right = min(float(width), float(cols[-1]) + 1 + margin)
+        bottom = min(float(height), float(rows[-1]) + 1 + margin)
+
+        if (right - left) * (bottom - top) > 0.9 * width * height:
+            return None
+
+        return ScanRegion.from_pixels(left, top, right - left, bottom - top, dpi)
@@ -0,0 +1,361 @@
+"""
+Метрики для систем мониторинга (текстовый формат Prometheus)
+"""
+
+import os
+import platform
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .logger_service import logger
+
+
+# Границы гистограмм по умолчанию (секунды)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape_label_value(value: str) -> str:
+    """Экранировать значение метки"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    """Сформировать строку меток {name="value",...}"""
+    pairs = list(labels)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Число в формате Prometheus"""
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """Базовый класс метрики с метками"""
+
+    TYPE = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    @abstractmethod
+    def _render_samples(self) -> List[str]:
+        """Строки отсчётов метрики в формате Prometheus"""
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик"""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Увеличить счётчик"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Текущее значение"""
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """Установить значение"""
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def remove(self, **labels: str) -> None:
+        """Удалить ряд с указанными метками"""
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Гистограмма длительностей"""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self._buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # Для каждого набора меток: счётчики по корзинам, сумма, количество
+        self._values: Dict[Tuple[Tuple[str, str], ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Записать наблюдение"""
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self._buckets), 0.0, 0))
+            for index, bound in enumerate(self._buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Измерить длительность блока кода"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self._buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Реестр метрик приложения"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = Lock()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        """Зарегистрировать счётчик"""
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        """Зарегистрировать значение"""
+        return self._register(Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Зарегистрировать гистограмму"""
+        return self._register(Histogram(name, help_text, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Добавить функцию, обновляющую метрики перед выгрузкой"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Выгрузить все метрики в текстовом формате"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                pass
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+
+# Глобальный реестр
+metrics = MetricsRegistry()
+
+STATUS_POLL_SECONDS = metrics.histogram(
+    "easyprinter_status_poll_seconds",
+    "Длительность одного опроса статуса принтеров"
+)
+SUBPROCESS_SPAWNS = metrics.counter(
+    "easyprinter_subprocess_spawns_total",
+    "Количество запущенных внешних процессов"
+)
+JOB_STAGE_SECONDS = metrics.histogram(
+    "easyprinter_job_stage_seconds",
+    "Длительность этапов печати, сканирования и копирования"
+)
+JOBS_TOTAL = metrics.counter(
+    "easyprinter_jobs_total",
+    "Количество заданий печати, сканирования и копирования"
+)
+PRINT_QUEUE_DEPTH = metrics.gauge(
+    "easyprinter_print_queue_depth",
+    "Количество заданий в очереди принтера"
+)
+PROCESS_MEMORY_BYTES = metrics.gauge(
+    "easyprinter_process_resident_memory_bytes",
+    "Занятая процессом физическая память"
+)
+PROCESS_PEAK_MEMORY_BYTES = metrics.gauge(
+    "easyprinter_process_peak_memory_bytes",
+    "Наибольшая физическая память процесса с момента запуска"
+)
+
+
+def track_subprocess(command: str) -> None:
+    """Учесть запуск внешнего процесса"""
+    SUBPROCESS_SPAWNS.inc(command=os.path.basename(command))
+
+
+def _collect_memory() -> None:
+    """Обновить метрику памяти процесса"""
+    system = platform.system()
+
+    if system == "Linux":
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        PROCESS_MEMORY_BYTES.set(resident_pages * os.sysconf("SC_PAGE_SIZE"))
+
+        import resource
+        # На Linux ru_maxrss в килобайтах
+        PROCESS_PEAK_MEMORY_BYTES.set(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+
+    elif system == "Darwin":
+        import resource
+        # Текущую память без сторонних модулей на macOS не узнать: ru_maxrss - только пик (в байтах)
+        PROCESS_PEAK_MEMORY_BYTES.set(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+    elif system == "Windows":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        )
+        PROCESS_MEMORY_BYTES.set(counters.WorkingSetSize)
+        PROCESS_PEAK_MEMORY_BYTES.set(counters.PeakWorkingSetSize)
+
+
+metrics.add_collector(_collect_memory)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Обработчик HTTP запросов /metrics"""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+
+        body = metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Не засоряем stderr запросами мониторинга
+        pass
+
+
+class MetricsServer:
+    """HTTP сервер метрик (только localhost)"""
+
+    DEFAULT_PORT = 9464
+
+    def __init__(self):
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._server is not None
+
+    def start(self, port: int = DEFAULT_PORT) -> bool:
+        """Запустить сервер; возвращает False, если порт занят"""
+        if self._server is not None:
+            return True
+
+        try:
+            self._server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+        except OSError as e:
+            logger.error(f"Не удалось запустить сервер метрик на порту {port}: {e}")
+            return False
+
+        self._server.daemon_threads = True
+        self._thread = Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Сервер метрик запущен: http://127.0.0.1:{port}/metrics")
+        return True
+
+    def stop(self) -> None:
+        """Остановить сервер"""
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+        logger.info("Сервер метрик остановлен")
+
+
+# Глобальный экземпляр
+metrics_server = MetricsServer()
@@ -0,0 +1,155 @@
+"""
+Чтение PNM (PBM/PGM/PPM) из потока вывода сканера
+"""
+
+from typing import BinaryIO, Callable, Optional
+from PIL import Image
+
+
+# Размер блока чтения из потока
+READ_CHUNK_SIZE = 1 << 20
+
+
+class PnmHeader:
+    """Заголовок кадра PNM"""
+
+    # Режим PIL и число каналов для каждого формата
+    FORMATS = {
+        b'P4': ('1', 1),
+        b'P5': ('L', 1),
+        b'P6': ('RGB', 3),
+    }
+
+    def __init__(self, magic: bytes, width: int, height: int, maxval: int):
+        if magic not in self.FORMATS:
+            raise ValueError(f"Неподдерживаемый формат PNM: {magic!r}")
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Некорректный размер изображения: {width}x{height}")
+
+        self.magic = magic
+        self.width = width
+        self.height = height
+        self.maxval = maxval
+        self.mode, self.channels = self.FORMATS[magic]
+
+    @property
+    def bytes_per_sample(self) -> int:
+        """Байт на отсчёт (2 для 16-битных данных)"""
+        return 2 if self.maxval > 255 else 1
+
+    @property
+    def row_size(self) -> int:
+        """Размер одной строки в байтах"""
+        if self.magic == b'P4':
+            return (self.width + 7) // 8
+        return self.width * self.channels * self.bytes_per_sample
+
+    @property
+    def frame_size(self) -> int:
+        """Размер данных кадра в байтах"""
+        return self.row_size * self.height
+
+    @property
+    def raw_mode(self) -> str:
+        """Режим распаковки PIL для 8-битных данных"""
+        # В PBM 1 - чёрный, а в PIL - белый, поэтому инвертируем
+        return '1;I' if self.magic == b'P4' else self.mode
+
+
+def _read_token(stream: BinaryIO) -> Optional[bytes]:
+    """Прочитать очередной токен заголовка (с пропуском комментариев)"""
+    token = bytearray()
+    while True:
+        char = stream.read(1)
+        if not char:
+            return bytes(token) if token else None
+        if char == b'#':
+            # Комментарий до конца строки
+            while char and char not in (b'\n', b'\r'):
+                char = stream.read(1)
+            if token:
+                return bytes(token)
+            continue
+        if char.isspace():
+            if token:
+                return bytes(token)
+            continue
+        token += char
+
+
+def read_pnm_header(stream: BinaryIO) -> Optional[PnmHeader]:
+    """Прочитать заголовок кадра; None - поток закончился до начала кадра"""
+    magic = _read_token(stream)
+    if magic is None:
+        return None
+
+    try:
+        width = int(_read_token(stream) or b'')
+        height = int(_read_token(stream) or b'')
+        # После maxval (или высоты для PBM) ровно один пробельный символ - он уже прочитан
+        maxval = 1 if magic == b'P4' else int(_read_token(stream) or b'')
+    except ValueError:
+        raise ValueError("Повреждённый заголовок PNM")
+
+    return PnmHeader(magic, width, height, maxval)
+
+
+def read_pnm_frame(stream: BinaryIO, header: PnmHeader,
+                   on_rows: Optional[Callable[[memoryview, int], None]] = None,
+                   buffer: Optional[memoryview] = None) -> memoryview:
+    """Прочитать данные кадра в заранее выделенный буфер
+
+    on_rows(buffer, rows_ready) вызывается после каждого прочитанного блока.
+    """
+    frame_size = header.frame_size
+    if buffer is None:
+        buffer = memoryview(bytearray(frame_size))
+    elif len(buffer) < frame_size:
+        raise ValueError("Буфер меньше кадра")
+
+    row_size = header.row_size
+    offset = 0
+    while offset < frame_size:
+        count = stream.readinto(buffer[offset:min(offset + READ_CHUNK_SIZE, frame_size)])
+        if not count:
+            raise EOFError(f"Поток сканера оборвался: получено {offset} из {frame_size} байт")
+        offset += count
+        if on_rows is not None:
+            on_rows(buffer, offset // row_size)
+
+    return buffer[:frame_size]
+
+
+def frame_to_image(header: PnmHeader, data) -> Image.Image:
+    """Собрать изображение PIL из данных кадра"""
+    if header.bytes_per_sample == 2:
+        # 16-битные отсчёты (big-endian) сокращаем до 8 бит
+        import numpy as np
+        samples = (np.frombuffer(data, dtype='>u2') >> 8).astype(np.uint8)
+        return Image.frombuffer(header.mode, (header.width, header.height), samples.tobytes(),
+                                'raw', header.mode, 0, 1)
+
+    return Image.frombuffer(header.mode, (header.width, header.height), data,
+                            'raw', header.raw_mode, 0, 1)
+
+
+def band_to_image(header: PnmHeader, buffer, start_row: int, end_row: int) -> Image.Image:
+    """Собрать изображение из полосы строк [start_row, end_row) частично прочитанного кадра"""
+    band_header = PnmHeader(header.magic, header.width, end_row - start_row, header.maxval)
+    row_size = header.row_size
+    return frame_to_image(band_header, buffer[start_row * row_size:end_row * row_size])
+
+
+def read_pnm_image(stream: BinaryIO,
+                   on_rows: Optional[Callable[[PnmHeader, memoryview, int], None]] = None) -> Image.Image:
+    """Прочитать одно изображение PNM из потока"""
+    header = read_pnm_header(stream)
+    if header is None:
+        raise EOFError("Сканер не передал изображение")
+
+    callback = None
+    if on_rows is not None:
+        callback = lambda buffer, rows: on_rows(header, buffer, rows)
+
+    data = read_pnm_frame(stream, header, callback)
+    return frame_to_image(header, data)
@@ -6,12 +6,98 @@ import os
 import platform
 import subprocess
 import tempfile
-from typing import Optional, Tuple
+from typing import BinaryIO, Callable, Optional, Tuple
 from PIL import Image
 
 from ..models import PrintSettings, PaperSize, PageOrientation
 from .status_service import StatusService
 from .image_processing_service import ImageProcessingService
+from .metrics_service import track_subprocess, JOB_STAGE_SECONDS, JOBS_TOTAL
+
+
+class PrintStream:
+    """Задание печати, документ которого пишется прямо в stdin спулера (lpr)
+
+    Спулер получает данные по мере записи, временный файл не нужен.
+    На Windows у спулера нет stdin - там документ собирается во временном
+    файле и отправляется на печать при закрытии.
+    """
+
+    def __init__(self, args: Optional[list], on_spool_file: Optional[Callable[[str], None]] = None,
+                 on_error: Optional[Callable[[], None]] = None):
+        self._on_spool_file = on_spool_file
+        self._on_error = on_error
+        self._process: Optional[subprocess.Popen] = None
+        self._temp_path: Optional[str] = None
+        self._closed = False
+
+        if args is not None:
+            track_subprocess(args[0])
+            self._process = subprocess.Popen(
+                args, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+            self._stream: BinaryIO = self._process.stdin
+        else:
+            fd, self._temp_path = tempfile.mkstemp(suffix='.pdf')
+            self._stream = os.fdopen(fd, 'wb')
+
+    @property
+    def stream(self) -> BinaryIO:
+        """Поток для записи документа"""
+        return self._stream
+
+    def close(self) -> None:
+        """Завершить документ и дождаться приёма задания спулером"""
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            if self._process is not None:
+                try:
+                    _, stderr = self._process.communicate(timeout=60)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+                    raise RuntimeError("Ошибка отправки на печать: спулер не отвечает")
+                if self._process.returncode != 0:
+                    error_msg = stderr.decode(errors='replace').strip() if stderr else "Неизвестная ошибка"
+                    raise RuntimeError(f"Ошибка отправки на печать: {error_msg}")
+            else:
+                self._stream.close()
+                if self._on_spool_file is not None:
+                    self._on_spool_file(self._temp_path)
+        except Exception:
+            if self._on_error is not None:
+                self._on_error()
+            raise
+        finally:
+            self._remove_temp()
+
+    def abort(self) -> None:
+        """Отменить задание: спулер не получит незаконченный документ"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._process is not None:
+            # lpr ставит задание в очередь только после конца ввода - убиваем до него
+            self._process.kill()
+            self._process.wait()
+            try:
+                self._stream.close()
+            except OSError:
+                pass
+        else:
+            self._stream.close()
+        self._remove_temp()
+
+    def _remove_temp(self) -> None:
+        if self._temp_path:
+            try:
+                os.unlink(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = None
 
 
 class PrinterService:
@@ -21,20 +107,38 @@ class PrinterService:
         self._status_service = status_service
         self._image_processing = image_processing
 
-    def print_pdf(self, file_path: str, settings: PrintSettings) -> None:
-        """Печать PDF файла"""
+    def _find_printer(self) -> str:
+        """Найти принтер для печати (обычно из кэша обнаружения)"""
         printer = self._status_service.find_hp_printer()
+        if not printer:
+            # В кэше принтера нет - проверяем ещё раз, вдруг его только что подключили
+            printer = self._status_service.find_hp_printer(force_refresh=True)
         if not printer:
             raise RuntimeError("HP принтер не найден")
+        return printer
 
-        system = platform.system()
+    def print_pdf(self, file_path: str, settings: PrintSettings) -> None:
+        """Печать PDF файла"""
+        try:
+            with JOB_STAGE_SECONDS.time(job="print", stage="discover"):
+                printer = self._find_printer()
 
-        if system == "Windows":
-            self._print_pdf_windows(file_path, printer, settings)
-        elif system == "Darwin":
-            self._print_pdf_macos(file_path, printer, settings)
-        else:
-            self._print_pdf_linux(file_path, printer, settings)
+            system = platform.system()
+
+            with JOB_STAGE_SECONDS.time(job="print", stage="spool"):
+                if system == "Windows":
+                    self._print_pdf_windows(file_path, printer, settings)
+                elif system == "Darwin":
+                    self._print_pdf_macos(file_path, printer, settings)
+                else:
+                    self._print_pdf_linux(file_path, printer, settings)
+        except Exception:
+            JOBS_TOTAL.inc(job="print", result="error")
+            # Принтер мог пропасть или смениться - следующий поиск пойдёт заново
+            self._status_service.invalidate_printer_cache()
+            raise
+
+        JOBS_TOTAL.inc(job="print", result="success")
 
     def _print_pdf_windows(self, file_path: str, printer: str, settings: PrintSettings) -> None:
         """Печать PDF на Windows"""
@@ -67,6 +171,7 @@ Start-Process -FilePath $file -Verb Print -WindowStyle Hidden
 Start-Sleep -Seconds 3
 '''
 
+        track_subprocess("powershell")
         subprocess.run(
             ["powershell", "-WindowStyle", "Hidden", "-Command", ps_command],
             startupinfo=startupinfo,
@@ -92,7 +197,8 @@ Start-Sleep -Seconds 3
             args.extend(["-o", f"page-ranges={page_from}-{page_to}"])
 
         args.append(file_path)
-        subprocess.run(args, timeout=60)
+        track_subprocess(args[0])
+        self._run_spooler(args)
 
     def _print_pdf_linux(self, file_path: str, printer: str, settings: PrintSettings) -> None:
         """Печать PDF на Linux"""
@@ -109,41 +215,56 @@ Start-Sleep -Seconds 3
             args.extend(["-o", f"page-ranges={page_from}-{page_to}"])
 
         args.append(file_path)
-        subprocess.run(args, timeout=60)
+        track_subprocess(args[0])
+        self._run_spooler(args)
 
     def print_image(self, file_path: str, settings: PrintSettings) -> None:
         """Печать изображения"""
-        printer = self._status_service.find_hp_printer()
-        if not printer:
-            raise RuntimeError("HP принтер не найден")
-
-        # Открываем и обрабатываем изображение
-        image = Image.open(file_path)
-
-        # Применяем настройки изображения если есть изменения
-        if settings.image_adjustments.has_changes:
-            image = self._image_processing.apply_adjustments(image, settings.image_adjustments)
-
-        # Применяем масштаб
-        if settings.scale != 100:
-            new_width = int(image.width * settings.scale / 100)
-            new_height = int(image.height * settings.scale / 100)
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        try:
+            self._print_image(file_path, settings)
+        except Exception:
+            JOBS_TOTAL.inc(job="print", result="error")
+            # Принтер мог пропасть или смениться - следующий поиск пойдёт заново
+            self._status_service.invalidate_printer_cache()
+            raise
+
+        JOBS_TOTAL.inc(job="print", result="success")
+
+    def _print_image(self, file_path: str, settings: PrintSettings) -> None:
+        """Обработка и отправка изображения на печать"""
+        with JOB_STAGE_SECONDS.time(job="print", stage="discover"):
+            printer = self._find_printer()
+
+        with JOB_STAGE_SECONDS.time(job="print", stage="process"):
+            # Открываем и обрабатываем изображение
+            image = Image.open(file_path)
+
+            # Применяем настройки изображения если есть изменения
+            if settings.image_adjustments.has_changes:
+                image = self._image_processing.apply_adjustments(image, settings.image_adjustments)
+
+            # Применяем масштаб
+            if settings.scale != 100:
+                new_width = int(image.width * settings.scale / 100)
+                new_height = int(image.height * settings.scale / 100)
+                image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
         # Сохраняем во временный файл
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-            tmp_path = tmp.name
-            image.save(tmp_path, 'PNG')
+        with JOB_STAGE_SECONDS.time(job="print", stage="encode"):
+            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
+                tmp_path = tmp.name
+                image.save(tmp_path, 'PNG')
 
         try:
             system = platform.system()
 
-            if system == "Windows":
-                self._print_image_windows(tmp_path, printer, settings)
-            elif system == "Darwin":
-                self._print_image_macos(tmp_path, printer, settings)
-            else:
-                self._print_image_linux(tmp_path, printer, settings)
+            with JOB_STAGE_SECONDS.time(job="print", stage="spool"):
+                if system == "Windows":
+                    self._print_image_windows(tmp_path, printer, settings)
+                elif system == "Darwin":
+                    self._print_image_macos(tmp_path, printer, settings)
+                else:
+                    self._print_image_linux(tmp_path, printer, settings)
         finally:
             # Удаляем временный файл
             try:
@@ -172,6 +293,7 @@ Start-Sleep -Seconds 3
 
         # Fallback: через rundll32 (без окна)
         for _ in range(settings.copies):
+            track_subprocess("rundll32")
             subprocess.run(
                 ["rundll32", "shimgvw.dll,ImageView_PrintTo", f"/pt", file_path, printer],
                 startupinfo=startupinfo,
@@ -193,7 +315,8 @@ Start-Sleep -Seconds 3
         args.extend(["-o", "fit-to-page"])
 
         args.append(file_path)
-        subprocess.run(args, timeout=60)
+        track_subprocess(args[0])
+        self._run_spooler(args)
 
     def _print_image_linux(self, file_path: str, printer: str, settings: PrintSettings) -> None:
         """Печать изображения на Linux"""
@@ -208,7 +331,8 @@ Start-Sleep -Seconds 3
         args.extend(["-o", "fit-to-page"])
 
         args.append(file_path)
-        subprocess.run(args, timeout=60)
+        track_subprocess(args[0])
+        self._run_spooler(args)
 
     def print_file(self, file_path: str, settings: PrintSettings) -> None:
         """Печать документа (определяет тип по расширению)"""
@@ -221,6 +345,37 @@ Start-Sleep -Seconds 3
         else:
             raise ValueError(f"Формат файла {extension} не поддерживается")
 
+    def open_stream(self, settings: PrintSettings, title: str = "EasyPrinter") -> PrintStream:
+        """Начать задание печати PDF, который будет записан в PrintStream.stream
+
+        Страницы должны совпадать с размером бумаги: спулер их не масштабирует.
+        """
+        printer = self._find_printer()
+
+        if platform.system() == "Windows":
+            return PrintStream(
+                None,
+                on_spool_file=lambda path: self._print_pdf_windows(path, printer, settings),
+                on_error=self._status_service.invalidate_printer_cache
+            )
+
+        args = ["lpr", "-P", printer, "-T", title]
+
+        if settings.copies > 1:
+            # Многостраничные копии - комплектами, как на копире
+            args.extend(["-#", str(settings.copies), "-o", "collate=true"])
+
+        args.extend(["-o", f"media={self.get_paper_size_name(settings.paper_size)}"])
+
+        return PrintStream(args, on_error=self._status_service.invalidate_printer_cache)
+
+    def _run_spooler(self, args: list) -> None:
+        """Запустить lpr и проверить результат"""
+        result = subprocess.run(args, capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            error_msg = result.stderr.strip() if result.stderr else "Неизвестная ошибка"
+            raise RuntimeError(f"Ошибка отправки на печать: {error_msg}")
+
     def get_available_printers(self) -> list:
         """Получить список доступных принтеров"""
         return self._status_service.get_available_printers()
@@ -0,0 +1,224 @@
+"""
+Постоянный сеанс SANE: устройство остаётся открытым между сканированиями
+"""
+
+import json
+import os
+import subprocess
+import sys
+from collections import deque
+from threading import Lock, Thread, Timer
+from typing import Callable, List, Optional, Union
+from PIL import Image
+
+from .logger_service import logger
+from .metrics_service import track_subprocess
+from .pnm_stream import PnmHeader, read_pnm_image
+from .scan_buffer import ScanBuffer
+
+# python-sane нужен только процессу-сканеру, здесь лишь проверяем наличие
+try:
+    import sane  # noqa: F401
+    SANE_SUPPORTED = not getattr(sys, 'frozen', False)
+except ImportError:
+    SANE_SUPPORTED = False
+
+
+# Скрипт процесса-сканера (запускается по пути, без импорта пакета)
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sane_worker.py")
+
+
+class SaneSessionError(RuntimeError):
+    """Сеанс SANE недоступен или оборвался (можно повторить через scanimage)"""
+    pass
+
+
+class SaneDeviceError(RuntimeError):
+    """Устройство отказалось сканировать: замятие, открыта крышка, пуст автоподатчик...
+
+    Сеанс при этом исправен; повторять скан другим способом нельзя -
+    сканер снова протянул бы лист, а пользователь не увидел бы причину.
+    """
+    pass
+
+
+class SaneSession:
+    """Долгоживущий процесс, держащий открытым устройство SANE
+
+    scanimage при каждом запуске загружает все бэкенды, ищет и открывает
+    устройство и прогревает лампу. Процесс-сканер делает это один раз и
+    принимает запросы по каналу, а кадры отдаёт в виде PNM. Если сеанс
+    простаивает дольше IDLE_TIMEOUT, устройство освобождается.
+    """
+
+    # Ожидание открытия устройства (секунды)
+    START_TIMEOUT = 30
+
+    # Максимальная длительность одного сканирования (секунды)
+    SCAN_TIMEOUT = 120
+
+    # Через сколько секунд простоя закрыть устройство
+    IDLE_TIMEOUT = 300
+
+    def __init__(self, device: Optional[str] = None):
+        self._device = device
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr_tail: deque = deque(maxlen=20)
+        self._lock = Lock()
+        self._idle_timer: Optional[Timer] = None
+
+    @property
+    def device(self) -> Optional[str]:
+        return self._device
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def scan(self, resolution: int, mode: str = "Color", source: str = "Flatbed",
+             region: Optional[List[float]] = None, max_area: Optional[List[float]] = None,
+             on_rows: Optional[Callable[[PnmHeader, memoryview, int], None]] = None,
+             to_buffer: bool = False, in_memory: bool = False) -> Union[Image.Image, ScanBuffer]:
+        """Отсканировать кадр через открытое устройство (to_buffer - в ScanBuffer, in_memory - без файла)"""
+        with self._lock:
+            self._cancel_idle_timer()
+            self._ensure_started()
+
+            # Источник передаётся всегда: устройство остаётся открытым
+            # и иначе помнило бы автоподатчик с прошлого скана
+            request = {"cmd": "scan", "resolution": resolution, "mode": mode, "source": source}
+            if region:
+                request["region"] = list(region)
+            if max_area:
+                request["max_area"] = list(max_area)
+
+            process = self._process
+            watchdog = Timer(self.SCAN_TIMEOUT, self._kill)
+            watchdog.daemon = True
+            watchdog.start()
+
+            try:
+                self._write(request)
+                response = self._read_message()
+                if not response.get("ok"):
+                    # Процесс жив и готов к следующему запросу
+                    self._start_idle_timer()
+                    raise SaneDeviceError(response.get("error") or "Неизвестная ошибка сканера")
+                for warning in response.get("warnings") or []:
+                    logger.warning(f"Сканер {self._device}: {warning}")
+
+                try:
+                    if to_buffer:
+                        image = ScanBuffer.read_pnm(process.stdout, on_rows, in_memory=in_memory)
+                    else:
+                        image = read_pnm_image(process.stdout, on_rows)
+                except (EOFError, ValueError) as e:
+                    self._kill()
+                    raise SaneSessionError(self._describe_failure(str(e)))
+            finally:
+                watchdog.cancel()
+
+            self._start_idle_timer()
+            return image
+
+    def cancel(self) -> None:
+        """Прервать сканирование (процесс перезапустится при следующем запросе)"""
+        self._kill()
+
+    def close(self) -> None:
+        """Закрыть устройство и завершить процесс"""
+        with self._lock:
+            self._cancel_idle_timer()
+            process = self._process
+            if process is None:
+                return
+
+            if process.poll() is None:
+                try:
+                    self._write({"cmd": "quit"})
+                    process.wait(timeout=5)
+                except (OSError, SaneSessionError, subprocess.TimeoutExpired):
+                    process.kill()
+                    process.wait()
+            self._process = None
+
+    def _ensure_started(self) -> None:
+        """Запустить процесс-сканер, если он не работает"""
+        if self.is_alive:
+            return
+
+        self._stderr_tail.clear()
+        track_subprocess("sane_worker")
+        try:
+            self._process = subprocess.Popen(
+                [sys.executable, WORKER_PATH, self._device or ""],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except OSError as e:
+            raise SaneSessionError(f"Не удалось запустить процесс сканера: {e}")
+
+        process = self._process
+        Thread(target=self._drain_stderr, args=(process,), name="sane-worker-stderr", daemon=True).start()
+
+        watchdog = Timer(self.START_TIMEOUT, self._kill)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            message = self._read_message()
+        finally:
+            watchdog.cancel()
+
+        if not message.get("ready"):
+            self._kill()
+            raise SaneSessionError(message.get("error") or "Сканер не открылся")
+
+        self._device = message.get("device") or self._device
+
+    def _drain_stderr(self, process: subprocess.Popen) -> None:
+        """Сохранять последние строки stderr процесса для сообщений об ошибках"""
+        for line in process.stderr:
+            self._stderr_tail.append(line.decode(errors='replace').rstrip())
+
+    def _write(self, message: dict) -> None:
+        """Отправить запрос процессу"""
+        try:
+            self._process.stdin.write(json.dumps(message).encode('utf-8') + b"\n")
+            self._process.stdin.flush()
+        except (OSError, ValueError) as e:
+            self._kill()
+            raise SaneSessionError(self._describe_failure(str(e)))
+
+    def _read_message(self) -> dict:
+        """Прочитать строку ответа процесса"""
+        line = self._process.stdout.readline()
+        if not line:
+            self._kill()
+            raise SaneSessionError(self._describe_failure("процесс сканера завершился"))
+        try:
+            return json.loads(line)
+        except ValueError:
+            self._kill()
+            raise SaneSessionError(self._describe_failure("некорректный ответ процесса сканера"))
+
+    def _describe_failure(self, reason: str) -> str:
+        """Текст ошибки с последними строками stderr процесса"""
+        details = "; ".join(line for line in self._stderr_tail if line)
+        return f"{reason}: {details}" if details else reason
+
+    def _kill(self) -> None:
+        """Принудительно завершить процесс"""
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _start_idle_timer(self) -> None:
+        self._idle_timer = Timer(self.IDLE_TIMEOUT, self.close)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle_timer(self) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
@@ -0,0 +1,199 @@
+"""
+Процесс-сканер: держит устройство SANE открытым и сканирует по запросам
+
+Запускается из SaneSession отдельным процессом (python sane_worker.py [устройство]).
+Файл не импортирует пакет easyprinter, чтобы процесс стартовал быстро.
+
+Протокол (stdin/stdout):
+  при запуске  -> {"ready": true, "device": "..."} или {"ready": false, "error": "..."}
+  запрос       <- {"cmd": "scan", "resolution": 300, "mode": "Color", "source": "Flatbed",
+                   "region": [left, top, width, height],   (мм, необязательно)
+                   "max_area": [width, height]}            (мм, размер стекла из кэша, необязательно)
+  ответ        -> {"ok": true, "warnings": [...]} и сразу кадр PNM (P4/P5/P6)
+               -> {"ok": false, "error": "..."}      (ошибка устройства или опции)
+  завершение   <- {"cmd": "quit"}
+
+Для проверки без сканера подходит встроенный бэкенд SANE: устройство "test".
+"""
+
+import json
+import sys
+
+
+def _send(stream, message: dict) -> None:
+    """Отправить строку ответа"""
+    stream.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n")
+    stream.flush()
+
+
+class OptionError(Exception):
+    """Опцию устройства не удалось установить"""
+    pass
+
+
+def _set_option(device, name: str, value) -> bool:
+    """Установить опцию устройства; False - у устройства такой опции нет
+
+    Значение, которое устройство отвергло, - OptionError: молча оставить
+    прежнее нельзя, устройство открыто между сканами и помнит его.
+    """
+    # python-sane не проверяет имя: неизвестная опция стала бы просто атрибутом объекта
+    if name not in device.opt:
+        return False
+    try:
+        setattr(device, name, value)
+    except Exception as e:
+        raise OptionError(f"опция {name}={value!r} не установлена: {e}")
+    return True
+
+
+def _write_pnm(stream, image) -> None:
+    """Записать изображение PIL в поток как PNM"""
+    if image.mode == '1':
+        # В PBM 1 - чёрный, в PIL - белый
+        header = b"P4\n%d %d\n" % image.size
+        data = image.tobytes('raw', '1;I')
+    elif image.mode == 'L':
+        header = b"P5\n%d %d\n255\n" % image.size
+        data = image.tobytes()
+    else:
+        image = image.convert('RGB')
+        header = b"P6\n%d %d\n255\n" % image.size
+        data = image.tobytes()
+
+    stream.write(header)
+    # Отдаём кадр кусками, чтобы клиент показывал строки по мере прихода
+    view = memoryview(data)
+    for offset in range(0, len(view), 1 << 20):
+        stream.write(view[offset:offset + (1 << 20)])
+    stream.flush()
+
+
+def _scan(device, request: dict, state: dict, warnings: list):
+    """Выполнить одно сканирование с параметрами запроса
+
+    Все опции выставляются при каждом скане: устройство остаётся открытым
+    и иначе сохранило бы значения прошлого запроса (источник, область).
+    """
+    if request.get('mode') and not _set_option(device, 'mode', request['mode']):
+        warnings.append("устройство не поддерживает выбор режима")
+    if request.get('resolution') and not _set_option(device, 'resolution', int(request['resolution'])):
+        warnings.append("устройство не поддерживает выбор разрешения")
+
+    source = request.get('source') or 'Flatbed'
+    if not _set_option(device, 'source', source):
+        if 'adf' in source.lower() or 'feeder' in source.lower():
+            raise OptionError("устройство не поддерживает выбор источника (автоподатчик)")
+
+    # Размер стекла - после источника: смена источника меняет допустимую область
+    region = request.get('region')
+    if region:
+        left, top, width, height = region
+    else:
+        left, top = 0.0, 0.0
+        max_area = request.get('max_area') or (None, None)
+        width = _option_max(device, 'br_x')
+        height = _option_max(device, 'br_y')
+        if width is None:
+            width = max_area[0]
+        if height is None:
+            height = max_area[1]
+
+    if width is None or height is None:
+        if state.get('region_set'):
+            raise OptionError("неизвестен размер стекла - область прошлого скана не сброшена")
+        if region is None and 'br_x' in device.opt:
+            warnings.append("неизвестен размер стекла, область сканирования не задана")
+    else:
+        # Сначала угол в 0: иначе новый правый край может оказаться левее старого левого
+        _set_option(device, 'tl_x', 0.0)
+        _set_option(device, 'tl_y', 0.0)
+        has_geometry = _set_option(device, 'br_x', float(left + width))
+        has_geometry = _set_option(device, 'br_y', float(top + height)) and has_geometry
+        _set_option(device, 'tl_x', float(left))
+        _set_option(device, 'tl_y', float(top))
+        if region and not has_geometry:
+            warnings.append("устройство не поддерживает выбор области, сканируется всё стекло")
+        state['region_set'] = bool(region) and has_geometry
+
+    device.start()
+    return device.snap()
+
+
+def _option_max(device, name: str):
+    """Максимум допустимых значений опции (None, если опции нет или ограничение не задано)"""
+    if name not in device.opt:
+        return None
+    constraint = device[name].constraint
+    if isinstance(constraint, tuple):
+        return constraint[1]
+    if isinstance(constraint, list) and constraint:
+        return max(constraint)
+    return None
+
+
+def main() -> int:
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
+    try:
+        import sane
+    except ImportError:
+        _send(stdout, {"ready": False, "error": "python-sane не установлен"})
+        return 1
+
+    device_name = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] else None
+
+    try:
+        sane.init()
+        if device_name is None:
+            devices = sane.get_devices()
+            if not devices:
+                _send(stdout, {"ready": False, "error": "Сканер не найден"})
+                return 1
+            device_name = devices[0][0]
+        device = sane.open(device_name)
+    except Exception as e:
+        _send(stdout, {"ready": False, "error": str(e)})
+        return 1
+
+    _send(stdout, {"ready": True, "device": device_name})
+
+    # Что устройство помнит с прошлых сканов
+    state = {}
+
+    try:
+        for line in stdin:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                _send(stdout, {"ok": False, "error": "Некорректный запрос"})
+                continue
+
+            command = request.get('cmd')
+            if command == 'quit':
+                break
+            if command != 'scan':
+                _send(stdout, {"ok": False, "error": f"Неизвестная команда: {command}"})
+                continue
+
+            warnings = []
+            try:
+                image = _scan(device, request, state, warnings)
+            except Exception as e:
+                _send(stdout, {"ok": False, "error": str(e)})
+                continue
+
+            _send(stdout, {"ok": True, "warnings": warnings})
+            _write_pnm(stdout, image)
+    finally:
+        try:
+            device.close()
+        finally:
+            sane.exit()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
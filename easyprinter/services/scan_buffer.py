@@ -0,0 +1,180 @@
+"""
+Кадр скана в файле, отображённом в память
+"""
+
+import math
+import mmap
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+from .pnm_stream import PnmHeader, read_pnm_header, read_pnm_frame, frame_to_image
+
+
+# Каталог для буферов. Не /tmp: там часто tmpfs, то есть та же оперативная память
+SCAN_BUFFER_DIR = Path.home() / ".easyprinter" / "buffers"
+
+
+class ScanBuffer:
+    """Несжатые пиксели кадра в файле, отображённом в память (mmap)
+
+    Кадр 1200 DPI занимает сотни мегабайт. Здесь он лежит в страничном
+    кэше файла, а не в памяти процесса: система может выгрузить его на диск.
+    Обработка и сжатие читают кадр полосами по BAND_ROWS строк, предпросмотр
+    собирается из полос без полноразмерной копии PIL. Файл удаляется при
+    закрытии буфера (или при сборке мусора).
+
+    in_memory=True - анонимное отображение без файла: для кадров, которые
+    и так невелики и сразу уходят дальше (копия на принтер).
+    """
+
+    # Число каналов для поддерживаемых режимов PIL
+    CHANNELS = {'L': 1, 'RGB': 3}
+
+    # Высота полосы (кратна 16 - границе блоков JPEG)
+    BAND_ROWS = 512
+
+    def __init__(self, mode: str, width: int, height: int, directory: Optional[str] = None,
+                 in_memory: bool = False):
+        if mode not in self.CHANNELS:
+            raise ValueError(f"Неподдерживаемый режим буфера: {mode}")
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Некорректный размер изображения: {width}x{height}")
+
+        self.mode = mode
+        self.width = width
+        self.height = height
+
+        if in_memory:
+            self._file: Optional[BinaryIO] = None
+            self._map = mmap.mmap(-1, self.frame_size)
+        else:
+            self._file = self._create_file(directory)
+            self._file.truncate(self.frame_size)
+            self._map = mmap.mmap(self._file.fileno(), self.frame_size)
+
+    @staticmethod
+    def _create_file(directory: Optional[str]) -> BinaryIO:
+        """Анонимный временный файл (удаляется системой при закрытии)"""
+        if directory is None:
+            try:
+                SCAN_BUFFER_DIR.mkdir(parents=True, exist_ok=True)
+                directory = str(SCAN_BUFFER_DIR)
+            except OSError:
+                directory = None
+        return tempfile.TemporaryFile(prefix="scan_", suffix=".raw", dir=directory)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def channels(self) -> int:
+        return self.CHANNELS[self.mode]
+
+    @property
+    def row_size(self) -> int:
+        return self.width * self.channels
+
+    @property
+    def frame_size(self) -> int:
+        return self.row_size * self.height
+
+    @classmethod
+    def from_image(cls, image: Image.Image, directory: Optional[str] = None,
+                   in_memory: bool = False) -> 'ScanBuffer':
+        """Скопировать изображение PIL в буфер (полосами)"""
+        if image.mode not in cls.CHANNELS:
+            image = image.convert('L' if image.mode in ('1', 'LA', 'I', 'F') else 'RGB')
+
+        buffer = cls(image.mode, image.width, image.height, directory, in_memory)
+        for top in range(0, image.height, cls.BAND_ROWS):
+            bottom = min(top + cls.BAND_ROWS, image.height)
+            buffer.write_band(top, image.crop((0, top, image.width, bottom)))
+        return buffer
+
+    @classmethod
+    def read_pnm(cls, stream: BinaryIO,
+                 on_rows: Optional[Callable[[PnmHeader, memoryview, int], None]] = None,
+                 directory: Optional[str] = None, in_memory: bool = False) -> 'ScanBuffer':
+        """Прочитать кадр PNM из потока сразу в буфер, минуя память процесса"""
+        header = read_pnm_header(stream)
+        if header is None:
+            raise EOFError("Сканер не передал изображение")
+
+        callback = None
+        if on_rows is not None:
+            callback = lambda data, rows: on_rows(header, data, rows)
+
+        if header.mode not in cls.CHANNELS or header.bytes_per_sample != 1:
+            # Штриховой и 16-битный кадры невелики или редки - через обычное чтение
+            image = frame_to_image(header, read_pnm_frame(stream, header, callback))
+            return cls.from_image(image, directory, in_memory)
+
+        buffer = cls(header.mode, header.width, header.height, directory, in_memory)
+        try:
+            read_pnm_frame(stream, header, callback, memoryview(buffer._map))
+        except BaseException:
+            buffer.close()
+            raise
+        return buffer
+
+    def array(self) -> np.ndarray:
+        """Пиксели как массив numpy (H, W) или (H, W, 3) без копирования"""
+        pixels = np.frombuffer(self._map, dtype=np.uint8)
+        if self.channels == 1:
+            return pixels.reshape(self.height, self.width)
+        return pixels.reshape(self.height, self.width, self.channels)
+
+    def band(self, top: int, bottom: int) -> Image.Image:
+        """Полоса строк [top, bottom) как изображение PIL"""
+        top = max(0, top)
+        bottom = min(self.height, bottom)
+        data = self._map[top * self.row_size:bottom * self.row_size]
+        return Image.frombytes(self.mode, (self.width, bottom - top), data)
+
+    def bands(self, rows: Optional[int] = None) -> Iterator[Tuple[int, Image.Image]]:
+        """Полосы кадра сверху вниз: (первая строка, изображение)"""
+        rows = rows or self.BAND_ROWS
+        for top in range(0, self.height, rows):
+            yield top, self.band(top, top + rows)
+
+    def write_band(self, top: int, image: Image.Image) -> None:
+        """Записать полосу начиная со строки top"""
+        if image.mode != self.mode:
+            image = image.convert(self.mode)
+        if image.width != self.width or top + image.height > self.height:
+            raise ValueError("Полоса не помещается в буфер")
+        start = top * self.row_size
+        self._map[start:start + image.height * self.row_size] = image.tobytes()
+
+    def sample(self, max_side: int = 1000) -> Image.Image:
+        """Прореженная копия (каждый n-й пиксель, без сглаживания) для анализа содержимого"""
+        step = max(1, max(self.width, self.height) // max_side)
+        return Image.fromarray(np.ascontiguousarray(self.array()[::step, ::step]), self.mode)
+
+    def thumbnail(self, max_width: int, max_height: int) -> Image.Image:
+        """Уменьшенная копия, собранная из полос (усреднение блоками)"""
+        factor = max(1, math.ceil(max(self.width / max_width, self.height / max_height)))
+        rows = factor * max(1, self.BAND_ROWS // factor)
+
+        result = Image.new(self.mode, (math.ceil(self.width / factor), math.ceil(self.height / factor)))
+        for top, band in self.bands(rows):
+            result.paste(band.reduce(factor), (0, top // factor))
+        return result
+
+    def to_image(self) -> Image.Image:
+        """Полноразмерное изображение PIL (только если формат не умеет писать полосами)"""
+        return Image.frombytes(self.mode, self.size, self._map)
+
+    def close(self) -> None:
+        """Освободить отображение и удалить файл"""
+        try:
+            self._map.close()
+        except BufferError:
+            # На память ещё ссылаются массивы numpy - закроется при сборке мусора
+            return
+        if self._file is not None:
+            self._file.close()
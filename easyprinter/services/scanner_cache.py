@@ -0,0 +1,176 @@
+"""
+Кэш найденных сканеров и их возможностей на диске
+"""
+
+import json
+import os
+import re
+import time
+from dataclasses import asdict
+from pathlib import Path
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from ..models import ScannerDevice
+
+
+# Стандартные разрешения, если сканер сообщает диапазон
+STANDARD_RESOLUTIONS = (75, 100, 150, 200, 300, 600, 1200, 2400)
+
+# device `hpaio:/usb/...' is a Hewlett-Packard HP_LaserJet_M1536dnf_MFP all-in-one
+_DEVICE_LINE = re.compile(r"device\s+[`'](?P<name>[^']+)'\s+is\s+an?\s+(?P<description>.*)")
+
+# --mode Lineart|Gray|Color [Color]
+_OPTION_LINE = re.compile(r"^\s*(?P<option>--?[\w-]+)\s+(?P<values>[^\[]+?)\s*(\[.*\])?\s*$")
+
+
+def parse_device_list(output: str) -> List[Tuple[str, str]]:
+    """Разобрать вывод scanimage -L: список (имя устройства, описание)"""
+    devices = []
+    for line in output.splitlines():
+        match = _DEVICE_LINE.search(line)
+        if match:
+            devices.append((match.group('name'), match.group('description').strip()))
+    return devices
+
+
+def _parse_range(values: str) -> Optional[Tuple[float, float]]:
+    """Диапазон вида 0..215.9mm"""
+    match = re.match(r"(-?[\d.]+)\.\.(-?[\d.]+)", values)
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2))
+
+
+def parse_capabilities(name: str, description: str, output: str) -> ScannerDevice:
+    """Разобрать вывод scanimage -A в описание возможностей сканера"""
+    device = ScannerDevice(name=name, description=description)
+
+    for line in output.splitlines():
+        match = _OPTION_LINE.match(line)
+        if not match:
+            continue
+
+        option = match.group('option')
+        values = match.group('values').strip()
+
+        if option == '--resolution':
+            if '..' in values:
+                bounds = _parse_range(values)
+                if bounds:
+                    device.resolutions = [dpi for dpi in STANDARD_RESOLUTIONS if bounds[0] <= dpi <= bounds[1]]
+            else:
+                device.resolutions = [int(value) for value in re.findall(r"\d+", values)]
+        elif option == '--mode':
+            device.modes = [value.strip() for value in values.split('|') if value.strip()]
+        elif option == '--source':
+            device.sources = [value.strip() for value in values.split('|') if value.strip()]
+        elif option == '-x':
+            bounds = _parse_range(values)
+            if bounds:
+                device.max_width_mm = bounds[1]
+        elif option == '-y':
+            bounds = _parse_range(values)
+            if bounds:
+                device.max_height_mm = bounds[1]
+
+    return device
+
+
+class ScannerCache:
+    """Кэш сканеров на диске
+
+    Опрос SANE (scanimage -L и -A) занимает секунды, поэтому список
+    устройств и их возможности сохраняются между запусками и обновляются
+    в фоне. Устройство, с которым сканирование не удалось, удаляется из кэша.
+    """
+
+    # Через сколько секунд кэш считается устаревшим
+    MAX_AGE = 24 * 3600
+
+    def __init__(self, cache_file: Optional[str] = None):
+        if cache_file:
+            self._cache_file = Path(cache_file)
+        else:
+            self._cache_file = Path.home() / ".easyprinter" / "scanners.json"
+
+        self._lock = Lock()
+        self._devices: List[ScannerDevice] = []
+        self._updated = 0.0
+        self._load()
+
+    @property
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not self._devices
+
+    @property
+    def is_stale(self) -> bool:
+        with self._lock:
+            return not self._devices or time.time() - self._updated > self.MAX_AGE
+
+    def get_devices(self) -> List[ScannerDevice]:
+        """Сканеры из кэша"""
+        with self._lock:
+            return list(self._devices)
+
+    def get_device(self, name: str) -> Optional[ScannerDevice]:
+        """Сканер по имени устройства"""
+        with self._lock:
+            for device in self._devices:
+                if device.name == name:
+                    return device
+        return None
+
+    def update(self, devices: List[ScannerDevice]) -> None:
+        """Заменить содержимое кэша результатом нового опроса"""
+        with self._lock:
+            self._devices = list(devices)
+            self._updated = time.time()
+        self._save()
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Удалить устройство из кэша (или весь кэш)"""
+        with self._lock:
+            if name is None:
+                self._devices = []
+            else:
+                self._devices = [device for device in self._devices if device.name != name]
+            self._updated = 0.0
+        self._save()
+
+    def _load(self) -> None:
+        """Загрузить кэш из файла"""
+        try:
+            if not self._cache_file.exists():
+                return
+            with open(self._cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            known_fields = set(ScannerDevice.__dataclass_fields__)
+            self._devices = [
+                ScannerDevice(**{k: v for k, v in item.items() if k in known_fields})
+                for item in data.get('devices', [])
+            ]
+            self._updated = float(data.get('updated', 0.0))
+        except Exception as e:
+            print(f"Не удалось загрузить кэш сканеров: {e}")
+            self._devices = []
+            self._updated = 0.0
+
+    def _save(self) -> None:
+        """Сохранить кэш в файл (через временный файл)"""
+        with self._lock:
+            data = {
+                'updated': self._updated,
+                'devices': [asdict(device) for device in self._devices]
+            }
+
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self._cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self._cache_file)
+        except Exception as e:
+            print(f"Не удалось сохранить кэш сканеров: {e}")
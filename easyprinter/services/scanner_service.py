@@ -2,17 +2,44 @@
 Сервис сканирования документов
 """
 
+import copy
+import math
 import os
 import platform
+import queue
+import shlex
 import subprocess
 import tempfile
+import time
 from datetime import datetime
-from typing import Optional, Callable, List
+from threading import Lock, Thread, Timer
+from typing import Optional, Callable, Iterable, List, Union
 from PIL import Image
 from io import BytesIO
 
-from ..models import ScanSettings, ScanFormat, ScanSource, ScanResolution
+from ..models import ScanSettings, ScanFormat, ScanSource, ScanResolution, ScannerDevice
 from .image_processing_service import ImageProcessingService
+from .metrics_service import track_subprocess, JOB_STAGE_SECONDS, JOBS_TOTAL
+from .pnm_stream import PnmHeader, read_pnm_image, band_to_image
+from .scanner_cache import ScannerCache, parse_device_list, parse_capabilities
+from .sane_session import SaneSession, SaneSessionError, SANE_SUPPORTED
+from .scan_buffer import ScanBuffer
+from .logger_service import logger
+from .batch_scan import BatchScanPipeline, BatchScanIncomplete, PageSink, ParallelPageEncoder, create_page_sink
+from .document_writer import PdfWriter, temp_sibling, commit_file, remove_partial
+
+
+# Переменная окружения с командой вместо scanimage (например, имитация сканера:
+# "python easyprinter/tools/fake_scanimage.py")
+SCANIMAGE_ENV = "EASYPRINTER_SCANIMAGE"
+
+
+def scanimage_command() -> List[str]:
+    """Команда запуска scanimage с учётом EASYPRINTER_SCANIMAGE"""
+    command = os.environ.get(SCANIMAGE_ENV, "").strip()
+    if not command:
+        return ["scanimage"]
+    return shlex.split(command, posix=platform.system() != "Windows")
 
 
 class ScanProgressEvent:
@@ -32,14 +59,87 @@ class ScanCompletedEvent:
         self.error = error
 
 
+class ScanPreviewEvent:
+    """Событие частичного предпросмотра во время сканирования"""
+
+    def __init__(self, image: Image.Image, rows_done: int, total_rows: int):
+        # Уменьшенная копия страницы; ещё не полученная часть - белая
+        self.image = image
+        self.rows_done = rows_done
+        self.total_rows = total_rows
+
+    @property
+    def fraction(self) -> float:
+        return self.rows_done / self.total_rows if self.total_rows else 0.0
+
+
+class _PreviewBuilder:
+    """Собирает уменьшенный предпросмотр из полос строк по мере их чтения"""
+
+    def __init__(self, header: PnmHeader, max_width: int):
+        self._header = header
+        # Целочисленный коэффициент уменьшения - быстрое усреднение блоками
+        self._factor = max(1, math.ceil(header.width / max_width))
+        self._canvas = Image.new('RGB', (
+            max(1, header.width // self._factor),
+            max(1, header.height // self._factor)
+        ), (255, 255, 255))
+        self._next_row = 0
+
+    def update(self, buffer, rows_ready: int) -> bool:
+        """Дорисовать новые строки; False - новых полных полос нет"""
+        end_row = rows_ready if rows_ready >= self._header.height else rows_ready - rows_ready % self._factor
+        if end_row <= self._next_row:
+            return False
+
+        band = band_to_image(self._header, buffer, self._next_row, end_row)
+        if band.mode not in ('RGB', 'L'):
+            band = band.convert('L')
+        band = band.reduce(self._factor)
+        self._canvas.paste(band.convert('RGB'), (0, self._next_row // self._factor))
+        self._next_row = end_row
+        return True
+
+    def snapshot(self) -> Image.Image:
+        return self._canvas.copy()
+
+
 class ScannerService:
     """Сервис сканирования документов"""
 
-    def __init__(self, image_processing: ImageProcessingService):
+    # Максимальная длительность одного сканирования (секунды)
+    SCAN_TIMEOUT = 120
+
+    # Ширина предпросмотра во время сканирования и минимальный интервал обновления
+    PREVIEW_MAX_WIDTH = 800
+    PREVIEW_INTERVAL = 0.25
+
+    # Разрешение предварительного скана для выбора области
+    PRESCAN_DPI = 75
+
+    # Сколько ждать незавершённых фоновых сохранений при закрытии (секунды)
+    SAVE_FLUSH_TIMEOUT = 60
+
+    def __init__(self, image_processing: ImageProcessingService, scanner_cache: Optional[ScannerCache] = None,
+                 scanimage: Optional[List[str]] = None):
         self._image_processing = image_processing
+        self._scanimage = list(scanimage) if scanimage else scanimage_command()
+        self._scanner_cache = scanner_cache or ScannerCache()
+        self._devices_callbacks: List[Callable[[List[ScannerDevice]], None]] = []
+        self._refresh_lock = Lock()
+        self._refreshing = False
         self._is_disposed = False
         self._progress_callbacks: List[Callable[[ScanProgressEvent], None]] = []
         self._completed_callbacks: List[Callable[[ScanCompletedEvent], None]] = []
+        self._preview_callbacks: List[Callable[[ScanPreviewEvent], None]] = []
+        self._batch: Optional[BatchScanPipeline] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._cancel_requested = False
+        self._session: Optional[SaneSession] = None
+        self._session_enabled = False
+        self._save_queue: "queue.Queue" = queue.Queue()
+        self._save_thread: Optional[Thread] = None
+        self._save_lock = Lock()
 
     def add_progress_callback(self, callback: Callable[[ScanProgressEvent], None]) -> None:
         """Добавить callback для события прогресса"""
@@ -49,6 +149,34 @@ class ScannerService:
         """Добавить callback для события завершения"""
         self._completed_callbacks.append(callback)
 
+    def add_preview_callback(self, callback: Callable[[ScanPreviewEvent], None]) -> None:
+        """Добавить callback частичного предпросмотра"""
+        self._preview_callbacks.append(callback)
+
+    def remove_preview_callback(self, callback: Callable[[ScanPreviewEvent], None]) -> None:
+        """Удалить callback частичного предпросмотра"""
+        if callback in self._preview_callbacks:
+            self._preview_callbacks.remove(callback)
+
+    def add_devices_callback(self, callback: Callable[[List[ScannerDevice]], None]) -> None:
+        """Добавить callback обновления списка сканеров"""
+        self._devices_callbacks.append(callback)
+
+    def remove_devices_callback(self, callback: Callable[[List[ScannerDevice]], None]) -> None:
+        """Удалить callback обновления списка сканеров"""
+        if callback in self._devices_callbacks:
+            self._devices_callbacks.remove(callback)
+
+    def remove_progress_callback(self, callback: Callable[[ScanProgressEvent], None]) -> None:
+        """Удалить callback прогресса"""
+        if callback in self._progress_callbacks:
+            self._progress_callbacks.remove(callback)
+
+    def remove_completed_callback(self, callback: Callable[[ScanCompletedEvent], None]) -> None:
+        """Удалить callback завершения"""
+        if callback in self._completed_callbacks:
+            self._completed_callbacks.remove(callback)
+
     def _notify_progress(self, message: str, progress: int) -> None:
         """Уведомить о прогрессе"""
         event = ScanProgressEvent(message, progress)
@@ -58,6 +186,22 @@ class ScannerService:
             except Exception:
                 pass
 
+    def _notify_preview(self, event: ScanPreviewEvent) -> None:
+        """Уведомить о новой части предпросмотра"""
+        for callback in self._preview_callbacks:
+            try:
+                callback(event)
+            except Exception:
+                pass
+
+    def _notify_devices(self, devices: List[ScannerDevice]) -> None:
+        """Уведомить об обновлении списка сканеров"""
+        for callback in self._devices_callbacks:
+            try:
+                callback(devices)
+            except Exception:
+                pass
+
     def _notify_completed(self, success: bool, file_path: Optional[str] = None, error: Optional[str] = None) -> None:
         """Уведомить о завершении"""
         event = ScanCompletedEvent(success, file_path, error)
@@ -69,17 +213,19 @@ class ScannerService:
 
     def scan(self, settings: ScanSettings) -> Optional[Image.Image]:
         """Выполнить сканирование"""
+        self._cancel_requested = False
         try:
             self._notify_progress("Поиск сканера...", 10)
 
             system = platform.system()
 
-            if system == "Windows":
-                image = self._scan_windows(settings)
-            elif system == "Darwin":
-                image = self._scan_macos(settings)
-            else:
-                image = self._scan_linux(settings)
+            with JOB_STAGE_SECONDS.time(job="scan", stage="acquire"):
+                if system == "Windows":
+                    image = self._scan_windows(settings)
+                elif system == "Darwin":
+                    image = self._scan_macos(settings)
+                else:
+                    image = self._scan_linux(settings)
 
             if image is None:
                 raise RuntimeError("Не удалось получить изображение от сканера")
@@ -88,16 +234,151 @@ class ScannerService:
 
             # Применяем настройки изображения если есть
             if settings.image_adjustments.has_changes:
-                image = self._image_processing.apply_adjustments(image, settings.image_adjustments)
+                with JOB_STAGE_SECONDS.time(job="scan", stage="adjust"):
+                    image = self._image_processing.apply_adjustments(image, settings.image_adjustments)
 
             self._notify_progress("Сканирование завершено", 100)
+            JOBS_TOTAL.inc(job="scan", result="success")
 
             return image
 
         except Exception as e:
+            JOBS_TOTAL.inc(job="scan", result="error")
+            self._forget_failed_device(settings.device)
             self._notify_completed(False, error=str(e))
             raise
 
+    def scan_to_buffer(self, settings: ScanSettings, in_memory: bool = False) -> ScanBuffer:
+        """Сканировать в ScanBuffer: пиксели в файле, отображённом в память
+
+        Для высоких разрешений: кадр не держится в памяти процесса.
+        in_memory - без файла, в памяти процесса (небольшой кадр, который
+        сразу уходит дальше). Настройки изображения не применяются -
+        это делается при сохранении.
+        """
+        self._cancel_requested = False
+        try:
+            self._notify_progress("Поиск сканера...", 10)
+
+            system = platform.system()
+
+            with JOB_STAGE_SECONDS.time(job="scan", stage="acquire"):
+                if system == "Windows":
+                    image = self._scan_windows(settings)
+                elif system == "Darwin":
+                    image = self._scan_macos(settings)
+                else:
+                    self._notify_progress("Запуск сканирования (Linux SANE)...", 30)
+                    image = self._acquire(settings, to_buffer=True, in_memory=in_memory)
+
+            if image is None:
+                raise RuntimeError("Не удалось получить изображение от сканера")
+
+            # WIA и macOS отдают готовое изображение - переносим его в буфер
+            buffer = image if isinstance(image, ScanBuffer) else ScanBuffer.from_image(image, in_memory=in_memory)
+            del image
+
+            self._notify_progress("Сканирование завершено", 100)
+            JOBS_TOTAL.inc(job="scan", result="success")
+
+            return buffer
+
+        except Exception as e:
+            JOBS_TOTAL.inc(job="scan", result="error")
+            self._forget_failed_device(settings.device)
+            self._notify_completed(False, error=str(e))
+            raise
+
+    def prescan(self, device: Optional[str] = None) -> Image.Image:
+        """Быстрый предварительный скан всего стекла с низким разрешением"""
+        if platform.system() == "Windows":
+            raise RuntimeError("Предварительный скан доступен только через SANE (Linux/macOS)")
+
+        self._cancel_requested = False
+        self._notify_progress("Предварительный скан...", 10)
+
+        prescan_settings = ScanSettings(source=ScanSource.FLATBED, device=device)
+        try:
+            with JOB_STAGE_SECONDS.time(job="prescan", stage="acquire"):
+                image = self._acquire(prescan_settings, self.PRESCAN_DPI)
+        except Exception:
+            self._forget_failed_device(device)
+            raise
+
+        self._notify_progress("Предварительный скан завершён", 100)
+        return image
+
+    def scan_batch(self, settings: ScanSettings, sink: Optional[PageSink] = None) -> List[str]:
+        """Пакетное сканирование из автоподатчика
+
+        Страницы обрабатываются и сохраняются по мере поступления,
+        пока следующий лист ещё протягивается. PDF и TIFF собираются в один
+        многостраничный файл. Возвращает пути сохранённых файлов.
+        Если сканер остановился посреди пакета, уже отсканированные страницы
+        сохраняются, а ошибка приходит как BatchScanIncomplete.
+        """
+        if platform.system() == "Windows":
+            raise RuntimeError("Пакетное сканирование доступно только через SANE (Linux/macOS)")
+
+        os.makedirs(settings.output_folder, exist_ok=True)
+        if sink is None:
+            sink = create_page_sink(settings, self.effective_resolution(settings))
+
+        if settings.source != ScanSource.ADF:
+            settings = copy.copy(settings)
+            settings.source = ScanSource.ADF
+        args = self._build_scanimage_args(settings)
+
+        pipeline = BatchScanPipeline(
+            settings, args, sink, self._image_processing,
+            on_page_scanned=lambda index: self._notify_progress(
+                f"Отсканирована страница {index + 1}...", min(90, 10 + index * 5)
+            ),
+            on_page_saved=lambda index: self._notify_progress(
+                f"Сохранена страница {index + 1}", min(95, 15 + index * 5)
+            )
+        )
+        self._batch = pipeline
+
+        try:
+            self._notify_progress("Сканирование из автоподатчика...", 5)
+            with JOB_STAGE_SECONDS.time(job="scan_batch", stage="total"):
+                paths = pipeline.run()
+
+            self._notify_progress(f"Готово, страниц: {len(paths)}", 100)
+            JOBS_TOTAL.inc(job="scan_batch", result="success")
+            self._notify_completed(True, paths[0] if paths else None)
+            return paths
+
+        except BatchScanIncomplete as e:
+            # Сканер на месте (замятие и т.п.), отсканированные страницы сохранены
+            JOBS_TOTAL.inc(job="scan_batch", result="error")
+            self._notify_completed(False, e.paths[0] if e.paths else None, str(e))
+            raise
+        except Exception as e:
+            JOBS_TOTAL.inc(job="scan_batch", result="error")
+            self._forget_failed_device(settings.device)
+            self._notify_completed(False, error=str(e))
+            raise
+        finally:
+            self._batch = None
+
+    def cancel_scan(self) -> None:
+        """Прервать текущее сканирование (одиночное или пакетное)"""
+        self._cancel_requested = True
+
+        pipeline = self._batch
+        if pipeline is not None:
+            pipeline.cancel()
+
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+        session = self._session
+        if session is not None:
+            session.cancel()
+
     def _scan_windows(self, settings: ScanSettings) -> Optional[Image.Image]:
         """Сканирование на Windows через WIA"""
         self._notify_progress("Запуск сканирования (Windows WIA)...", 30)
@@ -152,6 +433,7 @@ try {{
 }}
 '''
 
+            track_subprocess("powershell")
             result = subprocess.run(
                 ["powershell", "-WindowStyle", "Hidden", "-Command", ps_script],
                 capture_output=True,
@@ -181,79 +463,222 @@ try {{
         """Сканирование на macOS через Image Capture / SANE"""
         self._notify_progress("Запуск сканирования (macOS)...", 30)
 
-        # Используем sane-backends если установлен
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-            tmp_path = tmp.name
-
+        # Пробуем scanimage (SANE), если установлен
         try:
-            dpi = settings.resolution.value
-            mode = "Color"
-
-            # Пробуем scanimage (SANE)
-            args = [
-                "scanimage",
-                f"--resolution={dpi}",
-                f"--mode={mode}",
-                f"--format=png",
-                f"-o", tmp_path
-            ]
-
-            if settings.source == ScanSource.ADF:
-                args.append("--source=ADF")
-
-            result = subprocess.run(args, capture_output=True, text=True, timeout=120)
-
-            if result.returncode == 0 and os.path.exists(tmp_path):
-                return Image.open(tmp_path)
-            else:
-                # Открываем Image Capture
-                subprocess.run(["open", "-a", "Image Capture"], timeout=5)
-                raise RuntimeError("Автоматическое сканирование недоступно. Используйте Image Capture для сканирования.")
-
-        finally:
-            try:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-            except Exception:
-                pass
+            return self._acquire(settings)
+        except (RuntimeError, OSError):
+            if self._cancel_requested:
+                raise
+            # Открываем Image Capture
+            track_subprocess("open")
+            subprocess.run(["open", "-a", "Image Capture"], timeout=5)
+            raise RuntimeError("Автоматическое сканирование недоступно. Используйте Image Capture для сканирования.")
 
     def _scan_linux(self, settings: ScanSettings) -> Optional[Image.Image]:
         """Сканирование на Linux через SANE"""
         self._notify_progress("Запуск сканирования (Linux SANE)...", 30)
 
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-            tmp_path = tmp.name
+        return self._acquire(settings)
+
+    def set_session_enabled(self, enabled: bool) -> bool:
+        """Включить постоянный сеанс SANE (нужен python-sane); False - недоступен"""
+        if enabled and not SANE_SUPPORTED:
+            logger.warning("python-sane не установлен, постоянный сеанс сканера недоступен")
+            enabled = False
+
+        self._session_enabled = enabled
+        if not enabled:
+            self._close_session()
+        return enabled
+
+    def _close_session(self) -> None:
+        """Закрыть сеанс SANE"""
+        session = self._session
+        self._session = None
+        if session is not None:
+            session.close()
+
+    def _acquire(self, settings: ScanSettings, resolution: Optional[int] = None,
+                 to_buffer: bool = False, in_memory: bool = False) -> Union[Image.Image, ScanBuffer]:
+        """Получить кадр: через постоянный сеанс SANE, если включён, иначе через scanimage
+
+        to_buffer - читать кадр в ScanBuffer (файл в памяти) вместо изображения PIL,
+        in_memory - буфер без файла.
+        """
+        if self._session_enabled:
+            try:
+                return self._acquire_session(settings, resolution, to_buffer, in_memory)
+            except SaneSessionError as e:
+                # Сбой самого сеанса (процесс не запустился или оборвался) - повторяем через scanimage.
+                # Ошибка устройства (SaneDeviceError) уходит выше: второй скан лишь протянул бы лист снова
+                if self._cancel_requested:
+                    raise RuntimeError("Сканирование отменено")
+                logger.warning(f"Сеанс SANE недоступен, используем scanimage: {e}")
+                self._close_session()
+
+        return self._acquire_pnm(self._build_scanimage_args(settings, resolution), to_buffer, in_memory)
+
+    def _acquire_session(self, settings: ScanSettings, resolution: Optional[int] = None,
+                         to_buffer: bool = False, in_memory: bool = False) -> Union[Image.Image, ScanBuffer]:
+        """Сканировать через открытое устройство SANE"""
+        if self._session is None or (settings.device and self._session.device != settings.device):
+            self._close_session()
+            self._session = SaneSession(settings.device)
+
+        dpi = self.effective_resolution(settings, resolution)
+
+        region = None
+        if settings.source == ScanSource.FLATBED and settings.region and not settings.region.is_empty:
+            region = [settings.region.left, settings.region.top, settings.region.width, settings.region.height]
+
+        # Размер стекла из кэша - на случай, если устройство не сообщает границы области
+        max_area = None
+        device = self._scanner_cache.get_device(settings.device) if settings.device else None
+        if device is not None and device.max_width_mm > 0 and device.max_height_mm > 0:
+            max_area = [device.max_width_mm, device.max_height_mm]
+
+        return self._session.scan(
+            dpi,
+            mode=settings.color_mode.value,
+            source=self.source_name(settings),
+            region=region,
+            max_area=max_area,
+            on_rows=self._make_rows_handler(),
+            to_buffer=to_buffer,
+            in_memory=in_memory
+        )
+
+    def effective_resolution(self, settings: ScanSettings, resolution: Optional[int] = None) -> int:
+        """Разрешение, с которым сканер действительно отсканирует (ближайшее поддерживаемое)"""
+        dpi = resolution or settings.resolution.value
+        if settings.device:
+            device = self._scanner_cache.get_device(settings.device)
+            if device is not None:
+                dpi = device.nearest_resolution(dpi)
+        return dpi
+
+    def source_name(self, settings: ScanSettings) -> str:
+        """Имя источника так, как его называет бэкенд устройства (из кэша возможностей)"""
+        adf = settings.source == ScanSource.ADF
+        device = self._scanner_cache.get_device(settings.device) if settings.device else None
+        if device is not None:
+            return device.source_name(adf)
+        return "ADF" if adf else "Flatbed"
+
+    def _build_scanimage_args(self, settings: ScanSettings, resolution: Optional[int] = None) -> List[str]:
+        """Аргументы scanimage для вывода несжатого PNM в stdout"""
+        dpi = self.effective_resolution(settings, resolution)
+        args = list(self._scanimage)
+
+        # Явное устройство избавляет scanimage от повторного опроса всех бэкендов SANE
+        if settings.device:
+            args += ["-d", settings.device]
+
+        args += [
+            f"--resolution={dpi}",
+            f"--mode={settings.color_mode.value}",
+            "--format=pnm"
+        ]
+
+        if settings.source == ScanSource.ADF:
+            args.append(f"--source={self.source_name(settings)}")
+
+        # Сканируем только выбранную область стекла (миллиметры)
+        if settings.source == ScanSource.FLATBED and settings.region and not settings.region.is_empty:
+            region = settings.region
+            args += [
+                "-l", f"{region.left:.1f}",
+                "-t", f"{region.top:.1f}",
+                "-x", f"{region.width:.1f}",
+                "-y", f"{region.height:.1f}"
+            ]
 
-        try:
-            dpi = settings.resolution.value
+        return args
 
-            args = [
-                "scanimage",
-                f"--resolution={dpi}",
-                "--mode=Color",
-                "--format=png",
-                "-o", tmp_path
-            ]
+    def _acquire_pnm(self, args: List[str], to_buffer: bool = False,
+                     in_memory: bool = False) -> Union[Image.Image, ScanBuffer]:
+        """Запустить scanimage и прочитать PNM из stdout прямо в память
 
-            if settings.source == ScanSource.ADF:
-                args.append("--source=ADF")
+        Без временного файла и без сжатия/распаковки PNG. Пока сканер
+        движется, полученные строки отдаются в предпросмотр.
+        """
+        track_subprocess(args[0])
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._process = process
 
-            result = subprocess.run(args, capture_output=True, text=True, timeout=120)
+        # stderr читаем параллельно, чтобы scanimage не заблокировался на полном канале
+        stderr_chunks: List[bytes] = []
+        stderr_thread = Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+        stderr_thread.start()
 
-            if result.returncode == 0 and os.path.exists(tmp_path):
-                return Image.open(tmp_path)
-            else:
-                raise RuntimeError(f"Ошибка сканирования: {result.stderr}")
+        # Защита от зависания сканера
+        watchdog = Timer(self.SCAN_TIMEOUT, process.kill)
+        watchdog.daemon = True
+        watchdog.start()
 
-        finally:
+        image = None
+        read_error = None
+        try:
             try:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-            except Exception:
-                pass
+                if to_buffer:
+                    image = ScanBuffer.read_pnm(process.stdout, self._make_rows_handler(), in_memory=in_memory)
+                else:
+                    image = read_pnm_image(process.stdout, self._make_rows_handler())
+            except (EOFError, ValueError) as e:
+                read_error = e
+            process.wait()
+        finally:
+            watchdog.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            self._process = None
+
+        stderr_thread.join(timeout=1)
+
+        if self._cancel_requested:
+            raise RuntimeError("Сканирование отменено")
+
+        if image is None or process.returncode != 0:
+            error_msg = b"".join(stderr_chunks).decode(errors='replace').strip()
+            raise RuntimeError(f"Ошибка сканирования: {error_msg or read_error or 'Неизвестная ошибка'}")
+
+        return image
+
+    def _make_rows_handler(self) -> Callable[[PnmHeader, memoryview, int], None]:
+        """Обработчик прочитанных строк: прогресс и предпросмотр не чаще PREVIEW_INTERVAL"""
+        state = {'builder': None, 'last': 0.0}
+
+        def on_rows(header: PnmHeader, buffer: memoryview, rows_ready: int) -> None:
+            now = time.monotonic()
+            finished = rows_ready >= header.height
+            if not finished and now - state['last'] < self.PREVIEW_INTERVAL:
+                return
+            state['last'] = now
+
+            self._notify_progress(
+                f"Сканирование... {rows_ready * 100 // header.height}%",
+                30 + rows_ready * 40 // header.height
+            )
 
-    def save_scan(self, image: Image.Image, settings: ScanSettings) -> str:
-        """Сохранить отсканированное изображение"""
+            if not self._preview_callbacks:
+                return
+            if state['builder'] is None:
+                state['builder'] = _PreviewBuilder(header, self.PREVIEW_MAX_WIDTH)
+            if state['builder'].update(buffer, rows_ready):
+                self._notify_preview(ScanPreviewEvent(state['builder'].snapshot(), rows_ready, header.height))
+
+        return on_rows
+
+    def save_scan(self, image: Union[Image.Image, ScanBuffer], settings: ScanSettings) -> str:
+        """Сохранить отсканированное изображение (или кадр из ScanBuffer)
+
+        Файл пишется под временным именем рядом с целевым и после fsync
+        атомарно переименовывается: при сбое в папке не остаётся обрывков.
+        PDF из буфера сжимается полосами; JPEG, PNG и TIFF Pillow пишет
+        только целиком, для них кадр ненадолго собирается в память.
+        """
         output_path = settings.get_full_path()
 
         # Создаём директорию если не существует
@@ -261,32 +686,110 @@ try {{
         if directory and not os.path.exists(directory):
             os.makedirs(directory)
 
-        if settings.format == ScanFormat.PDF:
-            self._save_as_pdf(image, output_path)
-        elif settings.format == ScanFormat.JPEG:
-            # Конвертируем в RGB если есть альфа-канал
-            if image.mode == 'RGBA':
-                image = image.convert('RGB')
-            image.save(output_path, 'JPEG', quality=95)
-        elif settings.format == ScanFormat.PNG:
-            image.save(output_path, 'PNG')
-        elif settings.format == ScanFormat.TIFF:
-            image.save(output_path, 'TIFF')
+        temp_path = temp_sibling(output_path)
+        try:
+            with JOB_STAGE_SECONDS.time(job="scan", stage="save"):
+                if isinstance(image, ScanBuffer) and settings.format != ScanFormat.PDF:
+                    image = image.to_image()
+
+                if settings.format == ScanFormat.PDF:
+                    self._save_as_pdf(image, temp_path, settings)
+                elif settings.format == ScanFormat.JPEG:
+                    # Конвертируем в RGB если есть альфа-канал
+                    if image.mode == 'RGBA':
+                        image = image.convert('RGB')
+                    image.save(temp_path, 'JPEG', quality=95)
+                elif settings.format == ScanFormat.PNG:
+                    image.save(temp_path, 'PNG')
+                elif settings.format == ScanFormat.TIFF:
+                    image.save(temp_path, 'TIFF')
+
+                commit_file(temp_path, output_path)
+        except BaseException:
+            remove_partial(temp_path)
+            raise
 
         self._notify_completed(True, output_path)
         return output_path
 
-    def _save_as_pdf(self, image: Image.Image, output_path: str) -> None:
-        """Сохранить изображение как PDF"""
-        # Конвертируем в RGB если нужно
-        if image.mode == 'RGBA':
-            rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-            rgb_image.paste(image, mask=image.split()[3])
-            image = rgb_image
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
-
-        image.save(output_path, 'PDF', resolution=100.0)
+    def save_scan_async(self, image: Union[Image.Image, ScanBuffer], settings: ScanSettings) -> str:
+        """Поставить сохранение в очередь фонового потока; вернуть путь будущего файла
+
+        Коррекция изображения и сжатие выполняются в фоне, результат
+        (успех или ошибка с этим же путём) приходит через completed-callback.
+        Настройки копируются: вызывающий может сразу менять свои.
+        """
+        settings = copy.deepcopy(settings)
+
+        with self._save_lock:
+            if self._save_thread is None or not self._save_thread.is_alive():
+                self._save_thread = Thread(target=self._save_loop, name="scan-save", daemon=True)
+                self._save_thread.start()
+            self._save_queue.put((image, settings))
+
+        return settings.get_full_path()
+
+    def _save_loop(self) -> None:
+        """Фоновое сохранение сканов по очереди"""
+        while True:
+            item = self._save_queue.get()
+            if item is None:
+                break
+
+            image, settings = item
+            output_path = settings.get_full_path()
+            adjusted = None
+            try:
+                if settings.image_adjustments.has_changes:
+                    with JOB_STAGE_SECONDS.time(job="scan", stage="adjust"):
+                        if isinstance(image, ScanBuffer):
+                            adjusted = self._image_processing.apply_adjustments_to_buffer(
+                                image, settings.image_adjustments
+                            )
+                            image = adjusted
+                        else:
+                            image = self._image_processing.apply_adjustments(image, settings.image_adjustments)
+                self.save_scan(image, settings)
+            except Exception as e:
+                logger.exception(f"Ошибка сохранения скана: {e}")
+                self._notify_completed(False, output_path, str(e))
+            finally:
+                # Исправленная копия кадра больше не нужна - удаляем её файл сразу
+                if adjusted is not None:
+                    adjusted.close()
+            del image, item
+
+    def save_pages(self, images: Iterable[Image.Image], settings: ScanSettings) -> List[str]:
+        """Сохранить несколько страниц
+
+        Страницы сжимаются параллельно, PDF и TIFF собираются в один
+        многостраничный файл. Возвращает пути сохранённых файлов.
+        """
+        os.makedirs(settings.output_folder, exist_ok=True)
+
+        encoder = ParallelPageEncoder(
+            create_page_sink(settings, self.effective_resolution(settings)),
+            on_page_saved=lambda index: self._notify_progress(f"Сохранена страница {index + 1}", 95)
+        )
+        with JOB_STAGE_SECONDS.time(job="scan", stage="save"):
+            paths = encoder.run(images)
+
+        self._notify_completed(True, paths[0] if paths else None)
+        return paths
+
+    def _save_as_pdf(self, image: Union[Image.Image, ScanBuffer], output_path: str, settings: ScanSettings) -> None:
+        """Сохранить изображение как PDF
+
+        Сжатие выбирается по содержимому страницы, в PDF записывается
+        реальное разрешение скана - физический размер страницы верный.
+        """
+        writer = PdfWriter(output_path, settings.jpeg_quality, mrc=settings.pdf_mrc)
+        try:
+            writer.add_page(image, float(self.effective_resolution(settings)))
+        except Exception:
+            writer.abort()
+            raise
+        writer.close()
 
     def get_available_scanners(self) -> List[str]:
         """Получить список доступных сканеров"""
@@ -308,6 +811,7 @@ foreach ($d in $deviceManager.DeviceInfos) {
     }
 }
 '''
+                track_subprocess("powershell")
                 result = subprocess.run(
                     ["powershell", "-WindowStyle", "Hidden", "-Command", ps_script],
                     capture_output=True,
@@ -320,27 +824,86 @@ foreach ($d in $deviceManager.DeviceInfos) {
                     scanners = [s.strip() for s in result.stdout.strip().split('\n') if s.strip()]
 
             elif system in ("Darwin", "Linux"):
-                result = subprocess.run(
-                    ["scanimage", "-L"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if result.returncode == 0:
-                    for line in result.stdout.strip().split('\n'):
-                        if line.strip():
-                            if '`' in line and "'" in line:
-                                start = line.index('`') + 1
-                                end = line.index("'")
-                                scanners.append(line[start:end])
+                if self._scanner_cache.is_empty:
+                    self._refresh_devices()
+                elif self._scanner_cache.is_stale:
+                    self.refresh_scanners_async()
+                scanners = [device.name for device in self._scanner_cache.get_devices()]
 
         except Exception:
             pass
 
         return scanners
 
+    def get_scanner_devices(self) -> List[ScannerDevice]:
+        """Сканеры SANE из кэша (без ожидания); устаревший кэш обновляется в фоне"""
+        if platform.system() != "Windows" and self._scanner_cache.is_stale:
+            self.refresh_scanners_async()
+        return self._scanner_cache.get_devices()
+
+    def refresh_scanners_async(self) -> None:
+        """Обновить список сканеров в фоновом потоке"""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        Thread(target=self._refresh_devices, name="scanner-discovery", daemon=True).start()
+
+    def _refresh_devices(self) -> List[ScannerDevice]:
+        """Опросить SANE: список устройств и возможности каждого"""
+        with self._refresh_lock:
+            self._refreshing = True
+
+        try:
+            track_subprocess(self._scanimage[0])
+            result = subprocess.run(self._scanimage + ["-L"], capture_output=True, text=True, timeout=30)
+            if result.returncode != 0:
+                return self._scanner_cache.get_devices()
+
+            devices = []
+            for name, description in parse_device_list(result.stdout):
+                capabilities = ""
+                try:
+                    track_subprocess(self._scanimage[0])
+                    options = subprocess.run(
+                        self._scanimage + ["-d", name, "-A"], capture_output=True, text=True, timeout=15
+                    )
+                    if options.returncode == 0:
+                        capabilities = options.stdout
+                except (OSError, subprocess.SubprocessError):
+                    pass
+                devices.append(parse_capabilities(name, description, capabilities))
+
+            self._scanner_cache.update(devices)
+            self._notify_devices(devices)
+            return devices
+
+        except (OSError, subprocess.SubprocessError):
+            return self._scanner_cache.get_devices()
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    def _forget_failed_device(self, device: Optional[str]) -> None:
+        """Сканирование не удалось - устройство могло пропасть, обновляем кэш"""
+        if not device or self._cancel_requested:
+            return
+        self._scanner_cache.invalidate(device)
+        self.refresh_scanners_async()
+
     def dispose(self) -> None:
         """Освободить ресурсы"""
         self._is_disposed = True
+        self.cancel_scan()
+        self._close_session()
+
+        # Дожидаемся сохранений, поставленных в очередь (файлы пользователя важнее)
+        save_thread = self._save_thread
+        if save_thread is not None and save_thread.is_alive():
+            self._save_queue.put(None)
+            save_thread.join(timeout=self.SAVE_FLUSH_TIMEOUT)
         self._progress_callbacks.clear()
+        self._preview_callbacks.clear()
+        self._devices_callbacks.clear()
         self._completed_callbacks.clear()
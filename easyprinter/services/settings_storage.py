@@ -29,6 +29,13 @@ class UserPreferences:
     # Звуки
     sound_enabled: bool = True
 
+    # Держать сканер открытым между сканированиями (нужен python-sane)
+    scanner_session_enabled: bool = False
+
+    # Метрики для систем мониторинга (HTTP на localhost)
+    metrics_enabled: bool = False
+    metrics_port: int = 9464
+
 
 class SettingsStorage:
     """Хранилище настроек пользователя"""
@@ -0,0 +1,394 @@
+"""
+История статуса принтеров (кольцевой буфер в памяти + сжатый архив на диске)
+"""
+
+import os
+import re
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional, List, Tuple
+
+from ..models import PrinterStatus, PrinterState
+
+
+# Состояния, в которых принтер считается недоступным
+DOWN_STATE_VALUES = frozenset((PrinterState.OFFLINE.value, PrinterState.UNKNOWN.value))
+
+# Запись архива: начало интервала, отсчётов, отсчётов в сети,
+# максимум заданий, среднее заданий, минимум тонера, последнее состояние
+RECORD_FORMAT = '<dHHHfbB'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+
+class HistorySeries:
+    """Прореженный ряд истории статуса (массивы одинаковой длины)"""
+
+    def __init__(self, timestamps: array, jobs_mean: array, jobs_max: array, uptime: array, toner: array):
+        # Начало каждого интервала (Unix time)
+        self.timestamps = timestamps
+        # Средняя и максимальная длина очереди
+        self.jobs_mean = jobs_mean
+        self.jobs_max = jobs_max
+        # Доля времени в сети (0..1, -1 если данных нет)
+        self.uptime = uptime
+        # Минимальный уровень тонера (-1 если неизвестно)
+        self.toner = toner
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+class _SampleRing:
+    """Кольцевой буфер отсчётов одного принтера на массивах"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.states = array('B', bytes(capacity))
+        self.jobs = array('H', bytes(2 * capacity))
+        self.toner = array('b', bytes(capacity))
+        self.start = 0
+        self.count = 0
+
+    def append(self, timestamp: float, state: int, jobs: int, toner: int) -> None:
+        """Добавить отсчёт (старейший перезаписывается при переполнении)"""
+        index = (self.start + self.count) % self.capacity
+        self.timestamps[index] = timestamp
+        self.states[index] = state
+        self.jobs[index] = min(max(jobs, 0), 0xFFFF)
+        self.toner[index] = min(max(toner, -1), 100)
+
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def first_index_at(self, timestamp: float) -> int:
+        """Логический индекс первого отсчёта не раньше timestamp"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamps[(self.start + middle) % self.capacity] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def sample(self, position: int) -> Tuple[float, int, int, int]:
+        """Отсчёт по логическому индексу (0 - самый старый)"""
+        index = (self.start + position) % self.capacity
+        return self.timestamps[index], self.states[index], self.jobs[index], self.toner[index]
+
+
+class _Bucket:
+    """Накопитель агрегатов одного интервала"""
+
+    __slots__ = ('samples', 'online', 'jobs_max', 'jobs_sum', 'toner_min', 'state')
+
+    def __init__(self):
+        self.samples = 0
+        self.online = 0
+        self.jobs_max = 0
+        self.jobs_sum = 0.0
+        self.toner_min = -1
+        self.state = 0
+
+    def add(self, samples: int, online: int, jobs_max: int, jobs_sum: float, toner: int, state: int) -> None:
+        self.samples += samples
+        self.online += online
+        self.jobs_max = max(self.jobs_max, jobs_max)
+        self.jobs_sum += jobs_sum
+        if toner >= 0:
+            self.toner_min = toner if self.toner_min < 0 else min(self.toner_min, toner)
+        self.state = state
+
+
+class StatusHistory:
+    """История статуса принтеров
+
+    Свежие отсчёты хранятся в кольцевом буфере фиксированного размера.
+    Периодически они сжимаются в поминутные агрегаты и дописываются в файл,
+    поэтому память не растёт, а графики можно строить за несколько дней.
+    """
+
+    # Размер кольцевого буфера (1 час при опросе раз в 5 секунд)
+    RING_CAPACITY = 720
+
+    # Длина интервала агрегации в архиве (секунды)
+    BUCKET_SECONDS = 60
+
+    # Как часто сжимать буфер на диск (секунды)
+    COMPACT_INTERVAL = 600
+
+    # Сколько дней хранить архив
+    RETENTION_DAYS = 30
+
+    def __init__(self, history_dir: Optional[str] = None):
+        if history_dir:
+            self._history_dir = Path(history_dir)
+        else:
+            self._history_dir = Path.home() / ".easyprinter" / "history"
+
+        self._rings: Dict[str, _SampleRing] = {}
+        self._compacted_until: Dict[str, float] = {}
+        self._last_compact = time.time()
+        # Под _lock - только память; файлы архива пишет одно сжатие за раз под _io_lock
+        self._lock = Lock()
+        self._io_lock = Lock()
+
+    def record(self, status: PrinterStatus) -> None:
+        """Добавить отсчёт статуса принтера"""
+        if not status.printer_name:
+            return
+
+        timestamp = status.last_updated.timestamp()
+        name = status.printer_name
+
+        with self._lock:
+            known = name in self._rings
+        # Граница архива читается с диска - без блокировки
+        archived_until = 0.0 if known else self._read_last_bucket_end(name)
+
+        with self._lock:
+            ring = self._rings.get(name)
+            if ring is None:
+                ring = _SampleRing(self.RING_CAPACITY)
+                self._rings[name] = ring
+                self._compacted_until[name] = archived_until
+
+            ring.append(timestamp, status.state.value, status.jobs_in_queue, status.toner_level)
+
+            compact_due = time.time() - self._last_compact >= self.COMPACT_INTERVAL
+            if compact_due:
+                self._last_compact = time.time()
+
+        if compact_due:
+            # Уже идёт сжатие - следующее будет через COMPACT_INTERVAL
+            self._compact_all(time.time(), blocking=False)
+
+    def flush(self) -> None:
+        """Сжать на диск все завершённые интервалы
+
+        Текущая неполная минута в архив не пишется: запись архива считается
+        закрытой, и отсчёты, пришедшие в ту же минуту после перезапуска,
+        оказались бы раньше границы архива и потерялись.
+        """
+        self._compact_all(time.time())
+
+    def get_printers(self) -> List[str]:
+        """Принтеры, для которых есть история в памяти"""
+        with self._lock:
+            return list(self._rings.keys())
+
+    def query(self, printer_name: str, start: float, end: float, points: int = 200) -> HistorySeries:
+        """Получить историю за интервал [start, end), прореженную до points точек"""
+        points = max(1, points)
+        step = max((end - start) / points, 1e-6)
+        buckets = [_Bucket() for _ in range(points)]
+
+        def bucket_at(timestamp: float) -> Optional[_Bucket]:
+            index = int((timestamp - start) / step)
+            return buckets[index] if 0 <= index < points else None
+
+        # Под блокировкой только снимок буфера: архив читается с диска,
+        # а record() из потоков опроса не должен ждать ввода-вывода
+        with self._lock:
+            ring = self._rings.get(printer_name)
+            compacted_until = self._compacted_until.get(printer_name)
+            samples = []
+            if ring is not None:
+                position = ring.first_index_at(max(start, compacted_until or 0.0))
+                while position < ring.count:
+                    sample = ring.sample(position)
+                    if sample[0] >= end:
+                        break
+                    samples.append(sample)
+                    position += 1
+
+        if compacted_until is None:
+            compacted_until = self._read_last_bucket_end(printer_name)
+
+        # Старые данные - из архива на диске
+        if start < compacted_until:
+            for record in self._read_records(printer_name, start, min(end, compacted_until)):
+                bucket_start, count, online, jobs_max, jobs_mean, toner, state = record
+                bucket = bucket_at(bucket_start)
+                if bucket is not None:
+                    bucket.add(count, online, jobs_max, jobs_mean * count, toner, state)
+
+        # Свежие данные - из снимка кольцевого буфера
+        for timestamp, state, jobs, toner in samples:
+            bucket = bucket_at(timestamp)
+            if bucket is not None:
+                bucket.add(1, int(self._is_up(state)), jobs, float(jobs), toner, state)
+
+        series = HistorySeries(array('d'), array('f'), array('H'), array('f'), array('b'))
+        for index, bucket in enumerate(buckets):
+            series.timestamps.append(start + index * step)
+            if bucket.samples:
+                series.jobs_mean.append(bucket.jobs_sum / bucket.samples)
+                series.jobs_max.append(bucket.jobs_max)
+                series.uptime.append(bucket.online / bucket.samples)
+            else:
+                series.jobs_mean.append(0.0)
+                series.jobs_max.append(0)
+                series.uptime.append(-1.0)
+            series.toner.append(bucket.toner_min)
+
+        return series
+
+    def _is_up(self, state_value: int) -> bool:
+        """Считается ли состояние работоспособным"""
+        return state_value not in DOWN_STATE_VALUES
+
+    def _compact_all(self, now: float, blocking: bool = True) -> None:
+        """Сжать завершённые интервалы всех принтеров на диск
+
+        Записи собираются в памяти под _lock, файлы пишутся уже без неё:
+        record() из потоков опроса и query() из GUI не ждут диск. Граница
+        архива сдвигается только после записи - до тех пор query() берёт
+        эти отсчёты из кольцевого буфера.
+        """
+        if not self._io_lock.acquire(blocking=blocking):
+            return
+
+        try:
+            boundary = now - now % self.BUCKET_SECONDS
+            with self._lock:
+                self._last_compact = time.time()
+                pending = [
+                    (printer_name, self._pack_ring(ring, self._compacted_until.get(printer_name, 0.0), boundary))
+                    for printer_name, ring in self._rings.items()
+                ]
+
+            for printer_name, records in pending:
+                if not records:
+                    continue
+                path = self._get_path(printer_name)
+                try:
+                    self._history_dir.mkdir(parents=True, exist_ok=True)
+                    with open(path, 'ab') as f:
+                        f.write(records)
+                except OSError:
+                    continue
+                with self._lock:
+                    self._compacted_until[printer_name] = boundary
+
+                try:
+                    self._trim(path, boundary)
+                except OSError:
+                    pass
+        finally:
+            self._io_lock.release()
+
+    def _pack_ring(self, ring: _SampleRing, compacted_until: float, boundary: float) -> bytes:
+        """Поминутные записи архива из отсчётов [compacted_until, boundary) (вызывать под _lock)"""
+        position = ring.first_index_at(compacted_until)
+
+        records = bytearray()
+        current_start: Optional[float] = None
+        bucket = _Bucket()
+
+        while position < ring.count:
+            timestamp, state, jobs, toner = ring.sample(position)
+            if timestamp >= boundary:
+                break
+
+            bucket_start = timestamp - timestamp % self.BUCKET_SECONDS
+            if current_start is not None and bucket_start != current_start:
+                records += self._pack(current_start, bucket)
+                bucket = _Bucket()
+            current_start = bucket_start
+            bucket.add(1, int(self._is_up(state)), jobs, float(jobs), toner, state)
+            position += 1
+
+        if current_start is not None:
+            records += self._pack(current_start, bucket)
+        return bytes(records)
+
+    def _pack(self, bucket_start: float, bucket: _Bucket) -> bytes:
+        """Упаковать агрегат интервала в запись архива"""
+        return struct.pack(
+            RECORD_FORMAT,
+            bucket_start,
+            min(bucket.samples, 0xFFFF),
+            min(bucket.online, 0xFFFF),
+            bucket.jobs_max,
+            bucket.jobs_sum / bucket.samples,
+            bucket.toner_min,
+            bucket.state
+        )
+
+    def _trim(self, path: Path, now: float) -> None:
+        """Удалить из архива записи старше срока хранения"""
+        max_records = self.RETENTION_DAYS * 86400 // self.BUCKET_SECONDS
+        size = path.stat().st_size
+        # Переписываем файл с запасом в 10%, а не при каждом добавлении
+        if size <= RECORD_SIZE * max_records * 1.1:
+            return
+
+        cutoff = now - self.RETENTION_DAYS * 86400
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        timestamps = [struct.unpack_from('<d', data, offset)[0] for offset in range(0, len(data), RECORD_SIZE)]
+        keep_from = bisect_left(timestamps, cutoff) * RECORD_SIZE
+
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data[keep_from:])
+        os.replace(tmp_path, path)
+
+    def _read_records(self, printer_name: str, start: float, end: float) -> List[tuple]:
+        """Прочитать записи архива за интервал (поиск делением пополам по файлу)"""
+        path = self._get_path(printer_name)
+        if not path.exists():
+            return []
+
+        records = []
+        with open(path, 'rb') as f:
+            count = os.fstat(f.fileno()).st_size // RECORD_SIZE
+
+            low, high = 0, count
+            while low < high:
+                middle = (low + high) // 2
+                f.seek(middle * RECORD_SIZE)
+                timestamp = struct.unpack('<d', f.read(8))[0]
+                if timestamp < start:
+                    low = middle + 1
+                else:
+                    high = middle
+
+            f.seek(low * RECORD_SIZE)
+            while True:
+                chunk = f.read(RECORD_SIZE)
+                if len(chunk) < RECORD_SIZE:
+                    break
+                record = struct.unpack(RECORD_FORMAT, chunk)
+                if record[0] >= end:
+                    break
+                records.append(record)
+
+        return records
+
+    def _read_last_bucket_end(self, printer_name: str) -> float:
+        """Конец последнего интервала, уже записанного в архив"""
+        path = self._get_path(printer_name)
+        try:
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < RECORD_SIZE:
+                    return 0.0
+                f.seek((size // RECORD_SIZE - 1) * RECORD_SIZE)
+                return struct.unpack('<d', f.read(8))[0] + self.BUCKET_SECONDS
+        except OSError:
+            return 0.0
+
+    def _get_path(self, printer_name: str) -> Path:
+        """Путь к файлу архива принтера"""
+        safe_name = re.sub(r'[^\w.-]', '_', printer_name)
+        return self._history_dir / f"{safe_name}.bin"
@@ -4,23 +4,66 @@
 
 import platform
 import subprocess
+import time
 from datetime import datetime
-from typing import Optional, Callable, List
-from threading import Timer
+from typing import Optional, Callable, List, Dict, Set, Tuple
+from threading import Timer, Lock, Thread, Event
 
-from ..models import PrinterStatus, PrinterState
+from ..models import PrinterStatus, PrinterState, FleetSummary
+from .status_history import StatusHistory
+from .metrics_service import track_subprocess, STATUS_POLL_SECONDS, PRINT_QUEUE_DEPTH
+
+
+# Состояния, которые считаются ошибками при подсчёте сводки
+ERROR_STATES = (PrinterState.PAPER_JAM, PrinterState.PAPER_OUT, PrinterState.ERROR)
 
 
 class StatusService:
-    """Сервис мониторинга статуса принтера"""
+    """Сервис мониторинга статуса принтеров (основного HP и всего парка)"""
 
     TARGET_PRINTER_NAME = "HP LaserJet M1536dnf"
 
-    def __init__(self):
+    # Интервал опроса (секунды)
+    UPDATE_INTERVAL = 5.0
+
+    # Время жизни кэша списка принтеров (секунды)
+    DISCOVERY_TTL = 60.0
+
+    # Время жизни пустого списка принтеров (секунды)
+    DISCOVERY_EMPTY_TTL = 5.0
+
+    # Сколько ждать чужой поиск принтеров (секунды)
+    DISCOVERY_WAIT_TIMEOUT = 15.0
+
+    def __init__(self, history: Optional[StatusHistory] = None):
         self._timer: Optional[Timer] = None
         self._last_status: PrinterStatus = PrinterStatus()
         self._is_disposed: bool = False
         self._status_changed_callbacks: List[Callable[[PrinterStatus], None]] = []
+        self._fleet_status_callbacks: List[Callable[[PrinterStatus], None]] = []
+
+        # Статусы всех отслеживаемых принтеров
+        self._fleet: Dict[str, PrinterStatus] = {}
+        self._fleet_lock = Lock()
+        self._primary_printer: Optional[str] = None
+
+        # None - отслеживать все найденные принтеры
+        self._monitored_printers: Optional[List[str]] = None
+
+        # Занят, пока идёт опрос парка: опросы таймера и refresh() не накладываются
+        self._poll_lock = Lock()
+
+        # Принтеры текущего опроса: статусы остальных в парк не попадают
+        self._targets: Set[str] = set()
+
+        # Кэш списка принтеров; одновременные запросы ждут один общий поиск
+        self._discovery_lock = Lock()
+        self._discovery_cache: Optional[List[str]] = None
+        self._discovery_time: float = 0.0
+        self._discovery_in_flight: Optional[Event] = None
+
+        # История статусов для графиков
+        self._history = history if history is not None else StatusHistory()
 
     def add_status_changed_callback(self, callback: Callable[[PrinterStatus], None]) -> None:
         """Добавить callback для события изменения статуса"""
@@ -31,6 +74,15 @@ class StatusService:
         if callback in self._status_changed_callbacks:
             self._status_changed_callbacks.remove(callback)
 
+    def add_fleet_status_callback(self, callback: Callable[[PrinterStatus], None]) -> None:
+        """Добавить callback для изменения статуса любого принтера парка"""
+        self._fleet_status_callbacks.append(callback)
+
+    def remove_fleet_status_callback(self, callback: Callable[[PrinterStatus], None]) -> None:
+        """Удалить callback парка"""
+        if callback in self._fleet_status_callbacks:
+            self._fleet_status_callbacks.remove(callback)
+
     def _notify_status_changed(self, status: PrinterStatus) -> None:
         """Уведомить всех слушателей об изменении статуса"""
         for callback in self._status_changed_callbacks:
@@ -39,6 +91,14 @@ class StatusService:
             except Exception:
                 pass
 
+    def _notify_fleet_status_changed(self, status: PrinterStatus) -> None:
+        """Уведомить слушателей парка об изменении статуса принтера"""
+        for callback in self._fleet_status_callbacks:
+            try:
+                callback(status)
+            except Exception:
+                pass
+
     def start_monitoring(self) -> None:
         """Запустить мониторинг статуса"""
         self._update_status()
@@ -50,10 +110,18 @@ class StatusService:
             self._timer.cancel()
             self._timer = None
 
+    def refresh(self) -> None:
+        """Обновить статус немедленно в фоновом потоке (результат придёт через callbacks)
+
+        Если опрос уже идёт, новый не запускается - его результат и так придёт.
+        """
+        if not self._is_disposed and not self._poll_lock.locked():
+            Thread(target=self._update_status, name="printer-status-refresh", daemon=True).start()
+
     def _schedule_next_update(self) -> None:
         """Запланировать следующее обновление"""
         if not self._is_disposed:
-            self._timer = Timer(5.0, self._timer_callback)
+            self._timer = Timer(self.UPDATE_INTERVAL, self._timer_callback)
             self._timer.daemon = True
             self._timer.start()
 
@@ -66,24 +134,124 @@ class StatusService:
         """Получить текущий статус принтера"""
         return self._last_status
 
-    def find_hp_printer(self) -> Optional[str]:
+    def get_history(self) -> StatusHistory:
+        """Получить историю статусов принтеров"""
+        return self._history
+
+    def set_monitored_printers(self, printers: Optional[List[str]]) -> None:
+        """Задать список отслеживаемых принтеров (None - все найденные)"""
+        self._monitored_printers = list(printers) if printers is not None else None
+        if printers is not None:
+            # Идущий опрос не должен вернуть в парк убранные принтеры
+            with self._fleet_lock:
+                self._targets = {
+                    name for name in self._targets if name in printers or name == self._primary_printer
+                }
+
+    def get_monitored_printers(self) -> List[str]:
+        """Получить имена принтеров, статус которых известен"""
+        with self._fleet_lock:
+            return list(self._fleet.keys())
+
+    def get_printer_status(self, printer_name: str) -> Optional[PrinterStatus]:
+        """Получить статус конкретного принтера парка"""
+        with self._fleet_lock:
+            return self._fleet.get(printer_name)
+
+    def get_fleet_status(self) -> Dict[str, PrinterStatus]:
+        """Получить статусы всех отслеживаемых принтеров"""
+        with self._fleet_lock:
+            return dict(self._fleet)
+
+    def get_printers_by_state(self, *states: PrinterState) -> List[PrinterStatus]:
+        """Получить принтеры парка, находящиеся в указанных состояниях"""
+        with self._fleet_lock:
+            return [status for status in self._fleet.values() if status.state in states]
+
+    def get_fleet_summary(self) -> FleetSummary:
+        """Получить сводку по всему парку принтеров"""
+        with self._fleet_lock:
+            statuses = list(self._fleet.values())
+
+        online = sum(1 for status in statuses if status.is_online)
+        return FleetSummary(
+            total=len(statuses),
+            online=online,
+            offline=len(statuses) - online,
+            with_errors=sum(1 for status in statuses if status.state in ERROR_STATES),
+            jobs_in_queue=sum(status.jobs_in_queue for status in statuses),
+            last_updated=datetime.now()
+        )
+
+    def find_hp_printer(self, force_refresh: bool = False) -> Optional[str]:
         """Найти HP принтер в системе"""
         try:
-            printers = self.get_available_printers()
-            for printer in printers:
-                if "HP" in printer.upper() and ("1536" in printer or "LASERJET" in printer.upper()):
-                    return printer
-
-            # Если конкретный HP не найден, возвращаем первый доступный
-            if printers:
-                return printers[0]
-
-            return None
+            return self._select_hp_printer(self.get_available_printers(force_refresh))
         except Exception:
             return None
 
-    def get_available_printers(self) -> List[str]:
-        """Получить список доступных принтеров"""
+    def _select_hp_printer(self, printers: List[str]) -> Optional[str]:
+        """Выбрать HP принтер из списка"""
+        for printer in printers:
+            if "HP" in printer.upper() and ("1536" in printer or "LASERJET" in printer.upper()):
+                return printer
+
+        # Если конкретный HP не найден, возвращаем первый доступный
+        if printers:
+            return printers[0]
+
+        return None
+
+    def get_available_printers(self, force_refresh: bool = False) -> List[str]:
+        """Получить список доступных принтеров (из кэша, если он свежий)"""
+        with self._discovery_lock:
+            if not force_refresh and self._is_discovery_fresh():
+                return list(self._discovery_cache)
+
+            # Если поиск уже идёт - ждём его результат, а не запускаем второй
+            in_flight = self._discovery_in_flight
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = Event()
+                self._discovery_in_flight = in_flight
+
+        if not is_leader:
+            in_flight.wait(self.DISCOVERY_WAIT_TIMEOUT)
+            with self._discovery_lock:
+                return list(self._discovery_cache) if self._discovery_cache is not None else []
+
+        printers = None
+        try:
+            printers = self._query_printers()
+        finally:
+            with self._discovery_lock:
+                if printers is not None:
+                    self._discovery_cache = printers
+                    self._discovery_time = time.monotonic()
+                else:
+                    # Ошибка поиска - кэш больше не доверяем
+                    self._discovery_cache = None
+                self._discovery_in_flight = None
+            in_flight.set()
+
+        return list(printers) if printers is not None else []
+
+    def invalidate_printer_cache(self) -> None:
+        """Сбросить кэш списка принтеров (например, после ошибки печати)"""
+        with self._discovery_lock:
+            self._discovery_cache = None
+            self._discovery_time = 0.0
+
+    def _is_discovery_fresh(self, ttl: Optional[float] = None) -> bool:
+        """Свежий ли кэш списка принтеров (вызывать под _discovery_lock)"""
+        if self._discovery_cache is None:
+            return False
+        if ttl is None:
+            ttl = self.DISCOVERY_TTL if self._discovery_cache else self.DISCOVERY_EMPTY_TTL
+        return time.monotonic() - self._discovery_time < ttl
+
+    def _query_printers(self) -> Optional[List[str]]:
+        """Запросить список принтеров у системы (None - запрос не удался)"""
         system = platform.system()
         printers = []
 
@@ -94,6 +262,7 @@ class StatusService:
                 startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
                 startupinfo.wShowWindow = subprocess.SW_HIDE
 
+                track_subprocess("powershell")
                 result = subprocess.run(
                     ["powershell", "-WindowStyle", "Hidden", "-Command",
                      "Get-Printer | Select-Object -ExpandProperty Name"],
@@ -103,70 +272,74 @@ class StatusService:
                     startupinfo=startupinfo,
                     creationflags=subprocess.CREATE_NO_WINDOW
                 )
-                if result.returncode == 0:
-                    printers = [p.strip() for p in result.stdout.strip().split('\n') if p.strip()]
+                if result.returncode != 0:
+                    return None
+                printers = [p.strip() for p in result.stdout.strip().split('\n') if p.strip()]
 
             elif system == "Darwin":  # macOS
+                track_subprocess("lpstat")
                 result = subprocess.run(
                     ["lpstat", "-a"],
                     capture_output=True,
                     text=True,
                     timeout=10
                 )
-                if result.returncode == 0:
-                    for line in result.stdout.strip().split('\n'):
-                        if line:
-                            # Формат: "printer_name accepting requests..."
-                            parts = line.split()
-                            if parts:
-                                printers.append(parts[0])
+                if result.returncode != 0:
+                    return None
+                for line in result.stdout.strip().split('\n'):
+                    if line:
+                        # Формат: "printer_name accepting requests..."
+                        parts = line.split()
+                        if parts:
+                            printers.append(parts[0])
 
             elif system == "Linux":
+                track_subprocess("lpstat")
                 result = subprocess.run(
                     ["lpstat", "-a"],
                     capture_output=True,
                     text=True,
                     timeout=10
                 )
-                if result.returncode == 0:
-                    for line in result.stdout.strip().split('\n'):
-                        if line:
-                            parts = line.split()
-                            if parts:
-                                printers.append(parts[0])
+                if result.returncode != 0:
+                    return None
+                for line in result.stdout.strip().split('\n'):
+                    if line:
+                        parts = line.split()
+                        if parts:
+                            printers.append(parts[0])
 
         except Exception:
-            pass
+            return None
 
         return printers
 
     def _update_status(self) -> None:
-        """Обновить статус принтера"""
+        """Обновить статус всех отслеживаемых принтеров (пропускается, если опрос уже идёт)"""
+        if not self._poll_lock.acquire(blocking=False):
+            return
         try:
-            printer_name = self.find_hp_printer()
-
-            if printer_name:
-                status = PrinterStatus(
-                    printer_name=printer_name,
-                    is_online=True,
-                    state=PrinterState.READY,
-                    status_message="Готов к работе",
-                    jobs_in_queue=self._get_jobs_count(printer_name),
-                    toner_level=self._get_toner_level(printer_name),
-                    last_updated=datetime.now()
-                )
-
-                # Проверяем реальный статус принтера
-                printer_status = self._get_printer_status(printer_name)
-                if printer_status:
-                    status.state = printer_status['state']
-                    status.status_message = printer_status['message']
-                    status.is_online = printer_status['is_online']
-
-                self._last_status = status
-                self._notify_status_changed(status)
+            with STATUS_POLL_SECONDS.time():
+                self._poll_fleet()
+        finally:
+            self._poll_lock.release()
 
-            else:
+    def _poll_fleet(self) -> None:
+        """Опросить все отслеживаемые принтеры"""
+        try:
+            # Обновляем кэш заранее, чтобы печать не ждала поиска принтера
+            with self._discovery_lock:
+                # Пустой список проверяем так же часто, как get_available_printers()
+                ttl = self.DISCOVERY_TTL / 2 if self._discovery_cache else self.DISCOVERY_EMPTY_TTL
+                refresh = not self._is_discovery_fresh(ttl)
+            printers = self.get_available_printers(force_refresh=refresh)
+            printer_name = self._select_hp_printer(printers)
+            self._primary_printer = printer_name
+
+            targets = self._get_targets(printers, printer_name)
+            self._drop_unmonitored(targets)
+
+            if not printer_name:
                 self._last_status = PrinterStatus(
                     printer_name=None,
                     is_online=False,
@@ -177,6 +350,35 @@ class StatusService:
                 )
                 self._notify_status_changed(self._last_status)
 
+            # Общие запросы сразу по всем принтерам: стоимость опроса не растёт с их числом
+            states, jobs = self._query_fleet(targets)
+
+            # Все запросы идут к локальному спулеру, а не к устройствам: отключённый
+            # принтер не отвечает медленнее остальных, поэтому опрос последовательный
+            for name in targets:
+                if name not in printers:
+                    self._publish_status(PrinterStatus(
+                        printer_name=name,
+                        is_online=False,
+                        state=PrinterState.OFFLINE,
+                        status_message="Принтер не найден",
+                        toner_level=-1,
+                        last_updated=datetime.now()
+                    ))
+                    continue
+
+                try:
+                    status = self._poll_printer(name, states, jobs)
+                except Exception as e:
+                    status = PrinterStatus(
+                        printer_name=name,
+                        is_online=False,
+                        state=PrinterState.ERROR,
+                        status_message=f"Ошибка: {str(e)}",
+                        last_updated=datetime.now()
+                    )
+                self._publish_status(status)
+
         except Exception as e:
             self._last_status = PrinterStatus(
                 is_online=False,
@@ -186,6 +388,169 @@ class StatusService:
             )
             self._notify_status_changed(self._last_status)
 
+    def _get_targets(self, printers: List[str], primary: Optional[str]) -> List[str]:
+        """Получить список принтеров для опроса"""
+        targets = list(self._monitored_printers) if self._monitored_printers is not None else list(printers)
+        if primary and primary not in targets:
+            targets.insert(0, primary)
+        return targets
+
+    def _drop_unmonitored(self, targets: List[str]) -> None:
+        """Убрать из парка принтеры, которые больше не отслеживаются"""
+        with self._fleet_lock:
+            self._targets = set(targets)
+            for name in list(self._fleet.keys()):
+                if name not in targets:
+                    del self._fleet[name]
+                    PRINT_QUEUE_DEPTH.remove(printer=name)
+
+    def _publish_status(self, status: PrinterStatus) -> None:
+        """Сохранить статус принтера и уведомить слушателей"""
+        with self._fleet_lock:
+            # Принтер успели убрать из отслеживаемых, пока шёл опрос
+            if status.printer_name not in self._targets:
+                return
+            self._fleet[status.printer_name] = status
+
+        self._history.record(status)
+        PRINT_QUEUE_DEPTH.set(status.jobs_in_queue, printer=status.printer_name)
+
+        if status.printer_name == self._primary_printer:
+            self._last_status = status
+            self._notify_status_changed(status)
+
+        self._notify_fleet_status_changed(status)
+
+    def _poll_printer(self, printer_name: str, states: Optional[Dict[str, dict]],
+                      jobs: Optional[Dict[str, int]]) -> PrinterStatus:
+        """Опросить один принтер (данные общих запросов используются, если есть)"""
+        status = PrinterStatus(
+            printer_name=printer_name,
+            is_online=True,
+            state=PrinterState.READY,
+            status_message="Готов к работе",
+            jobs_in_queue=jobs.get(printer_name, 0) if jobs is not None else self._get_jobs_count(printer_name),
+            toner_level=self._get_toner_level(printer_name),
+            last_updated=datetime.now()
+        )
+
+        # Проверяем реальный статус принтера
+        printer_status = states.get(printer_name) if states is not None else None
+        if printer_status is None:
+            printer_status = self._get_printer_status(printer_name)
+        if printer_status:
+            status.state = printer_status['state']
+            status.status_message = printer_status['message']
+            status.is_online = printer_status['is_online']
+
+        return status
+
+    def _query_fleet(self, printers: List[str]) -> Tuple[Optional[Dict[str, dict]], Optional[Dict[str, int]]]:
+        """Получить состояние и очереди всех принтеров одним запросом
+
+        Возвращает (состояния, количество заданий); None - запрос не удался,
+        тогда принтеры опрашиваются по отдельности.
+        """
+        if not printers:
+            return None, None
+
+        system = platform.system()
+
+        try:
+            if system == "Windows":
+                startupinfo = subprocess.STARTUPINFO()
+                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+                startupinfo.wShowWindow = subprocess.SW_HIDE
+
+                track_subprocess("powershell")
+                result = subprocess.run(
+                    ["powershell", "-WindowStyle", "Hidden", "-Command",
+                     "Get-Printer | ForEach-Object { \"$($_.Name)`t$($_.PrinterStatus)`t$($_.JobCount)\" }"],
+                    capture_output=True,
+                    text=True,
+                    timeout=10,
+                    startupinfo=startupinfo,
+                    creationflags=subprocess.CREATE_NO_WINDOW
+                )
+                if result.returncode == 0:
+                    return self._parse_windows_fleet(result.stdout)
+
+            elif system in ("Darwin", "Linux"):
+                states = None
+                jobs = None
+
+                track_subprocess("lpstat")
+                result = subprocess.run(
+                    ["lpstat", "-p"],
+                    capture_output=True,
+                    text=True,
+                    timeout=10
+                )
+                if result.returncode == 0:
+                    states = self._parse_unix_fleet_status(result.stdout)
+
+                track_subprocess("lpstat")
+                result = subprocess.run(
+                    ["lpstat", "-o"],
+                    capture_output=True,
+                    text=True,
+                    timeout=10
+                )
+                if result.returncode == 0:
+                    jobs = self._parse_unix_fleet_jobs(result.stdout, printers)
+
+                return states, jobs
+
+        except Exception:
+            pass
+
+        return None, None
+
+    def _parse_windows_fleet(self, output: str) -> Tuple[Dict[str, dict], Dict[str, int]]:
+        """Парсинг общего статуса принтеров Windows (имя, статус, задания через табуляцию)"""
+        states = {}
+        jobs = {}
+        for line in output.strip().split('\n'):
+            parts = line.strip().split('\t')
+            if len(parts) < 3 or not parts[0]:
+                continue
+            name = parts[0]
+            states[name] = self._parse_windows_status(parts[1].lower())
+            jobs[name] = int(parts[2]) if parts[2].isdigit() else 0
+        return states, jobs
+
+    def _parse_unix_fleet_status(self, output: str) -> Dict[str, dict]:
+        """Парсинг вывода `lpstat -p` сразу для всех принтеров"""
+        blocks: Dict[str, List[str]] = {}
+        current: Optional[str] = None
+
+        for line in output.split('\n'):
+            if not line.strip():
+                continue
+            # Блок принтера начинается без отступа: "printer NAME is idle..."
+            if not line[0].isspace():
+                parts = line.split()
+                current = parts[1] if len(parts) > 1 else None
+                if current:
+                    blocks[current] = [line]
+            elif current:
+                blocks[current].append(line)
+
+        return {name: self._parse_unix_status('\n'.join(lines)) for name, lines in blocks.items()}
+
+    def _parse_unix_fleet_jobs(self, output: str, printers: List[str]) -> Dict[str, int]:
+        """Парсинг вывода `lpstat -o` сразу для всех принтеров"""
+        jobs = {name: 0 for name in printers}
+        for line in output.strip().split('\n'):
+            parts = line.split()
+            if not parts:
+                continue
+            # Идентификатор задания имеет вид "ИМЯ_ПРИНТЕРА-123"
+            name = parts[0].rsplit('-', 1)[0]
+            if name in jobs:
+                jobs[name] += 1
+        return jobs
+
     def _get_printer_status(self, printer_name: str) -> Optional[dict]:
         """Получить детальный статус принтера"""
         system = platform.system()
@@ -196,6 +561,7 @@ class StatusService:
                 startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
                 startupinfo.wShowWindow = subprocess.SW_HIDE
 
+                track_subprocess("powershell")
                 result = subprocess.run(
                     ["powershell", "-WindowStyle", "Hidden", "-Command",
                      f"Get-Printer -Name '{printer_name}' | Select-Object -ExpandProperty PrinterStatus"],
@@ -210,6 +576,7 @@ class StatusService:
                     return self._parse_windows_status(status_str)
 
             elif system in ("Darwin", "Linux"):
+                track_subprocess("lpstat")
                 result = subprocess.run(
                     ["lpstat", "-p", printer_name],
                     capture_output=True,
@@ -266,6 +633,7 @@ class StatusService:
                 startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
                 startupinfo.wShowWindow = subprocess.SW_HIDE
 
+                track_subprocess("powershell")
                 result = subprocess.run(
                     ["powershell", "-WindowStyle", "Hidden", "-Command",
                      f"(Get-PrintJob -PrinterName '{printer_name}' -ErrorAction SilentlyContinue | Measure-Object).Count"],
@@ -279,6 +647,7 @@ class StatusService:
                     return int(result.stdout.strip())
 
             elif system in ("Darwin", "Linux"):
+                track_subprocess("lpstat")
                 result = subprocess.run(
                     ["lpstat", "-o", printer_name],
                     capture_output=True,
@@ -305,3 +674,4 @@ class StatusService:
         if not self._is_disposed:
             self.stop_monitoring()
             self._is_disposed = True
+            self._history.flush()
@@ -0,0 +1,3 @@
+"""
+Вспомогательные инструменты для проверки без оборудования
+"""
@@ -0,0 +1,464 @@
+"""
+Имитация scanimage для проверки и замеров без сканера
+
+Понимает те же аргументы, что ScannerService передаёт настоящему scanimage:
+  -L, -A, -d, --resolution, --mode Color|Gray|Lineart, --format pnm|png|tiff|jpeg,
+  --source, -l/-t/-x/-y (мм), --batch[=шаблон], --batch-print, --batch-count,
+  --batch-start, -o/--output-file.
+
+Страницы синтетические и детерминированные: поля, строки «текста»,
+полутоновый блок и метка с номером страницы - при любом разрешении.
+
+Поведение настраивается переменными окружения:
+  EASYPRINTER_FAKE_RATE       скорость выдачи данных, МБ/с (0 - без ограничения)
+  EASYPRINTER_FAKE_WARMUP     задержка перед первой строкой, с (прогрев лампы)
+  EASYPRINTER_FAKE_DISCOVERY  задержка ответа на -L, с
+  EASYPRINTER_FAKE_PAGES      листов в автоподатчике для --batch (по умолчанию 3)
+  EASYPRINTER_FAKE_SEED       зерно генератора содержимого (по умолчанию 0)
+  EASYPRINTER_FAKE_FAIL       внедрение сбоя:
+                                busy        - устройство занято при открытии
+                                jam:N       - замятие на листе N
+                                truncate:F  - обрыв после доли F кадра (0..1)
+                                hang:F      - зависание после доли F кадра
+
+Скрипт не импортирует пакет easyprinter (тот тянет PyQt и PyMuPDF, а они
+могут писать предупреждения в stdout поверх кадра), поэтому запускается по пути:
+  python easyprinter/tools/fake_scanimage.py [аргументы scanimage]
+Чтобы ScannerService использовал имитацию:
+  EASYPRINTER_SCANIMAGE="python /путь/к/easyprinter/tools/fake_scanimage.py"
+"""
+
+import os
+import random
+import sys
+import time
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+
+# Имя единственного устройства имитации
+DEVICE_NAME = "fake:easyprinter"
+
+# Область стекла (мм), как у HP LaserJet M1536dnf
+MAX_WIDTH_MM = 215.9
+MAX_HEIGHT_MM = 297.011
+
+RESOLUTIONS = (75, 100, 150, 200, 300, 600, 1200)
+
+# Коды завершения по SANE_Status
+EXIT_JAMMED = 6
+EXIT_NO_DOCS = 7
+EXIT_IO_ERROR = 9
+
+# Цвета содержимого (RGB)
+PAPER = (255, 255, 255)
+INK = (20, 20, 90)
+MARK = (170, 25, 25)
+
+
+class FakeScanError(Exception):
+    """Сбой, который нужно сообщить как scanimage: текст и код завершения"""
+
+    def __init__(self, message: str, exit_code: int = 1):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+class Options:
+    """Разобранные аргументы командной строки"""
+
+    def __init__(self):
+        self.list_devices = False
+        self.all_options = False
+        self.device: Optional[str] = None
+        self.resolution = 75
+        self.mode = "Lineart"
+        self.format = "pnm"
+        self.source = "Flatbed"
+        self.left = 0.0
+        self.top = 0.0
+        self.width = MAX_WIDTH_MM
+        self.height = MAX_HEIGHT_MM
+        self.batch: Optional[str] = None
+        self.batch_print = False
+        self.batch_count = -1
+        self.batch_start = 1
+        self.output_file: Optional[str] = None
+
+
+def parse_args(argv: List[str]) -> Options:
+    """Разобрать аргументы в стиле scanimage (--opt=value и --opt value)"""
+    options = Options()
+    args = list(argv)
+
+    def value(name: str, inline: Optional[str]) -> str:
+        if inline is not None:
+            return inline
+        if not args:
+            raise FakeScanError(f"option '{name}' requires an argument")
+        return args.pop(0)
+
+    while args:
+        arg = args.pop(0)
+        name, _, inline = arg.partition('=')
+        inline = inline if '=' in arg else None
+
+        if name in ('-L', '--list-devices'):
+            options.list_devices = True
+        elif name in ('-A', '--all-options'):
+            options.all_options = True
+        elif name in ('-d', '--device-name'):
+            options.device = value(name, inline)
+        elif name == '--resolution':
+            options.resolution = int(value(name, inline).lower().replace('dpi', ''))
+        elif name == '--mode':
+            options.mode = value(name, inline)
+        elif name == '--format':
+            options.format = value(name, inline).lower()
+        elif name == '--source':
+            options.source = value(name, inline)
+        elif name == '-l':
+            options.left = float(value(name, inline))
+        elif name == '-t':
+            options.top = float(value(name, inline))
+        elif name == '-x':
+            options.width = float(value(name, inline))
+        elif name == '-y':
+            options.height = float(value(name, inline))
+        elif name == '--batch' or name == '-b':
+            options.batch = inline or f"out%d.{options.format}"
+        elif name == '--batch-print':
+            options.batch_print = True
+        elif name == '--batch-count':
+            options.batch_count = int(value(name, inline))
+        elif name == '--batch-start':
+            options.batch_start = int(value(name, inline))
+        elif name in ('-o', '--output-file'):
+            options.output_file = value(name, inline)
+        else:
+            raise FakeScanError(f"unrecognized option '{arg}'")
+
+    if options.resolution not in RESOLUTIONS:
+        raise FakeScanError(f"setting of option --resolution failed (Invalid argument)")
+    if options.mode not in ("Color", "Gray", "Lineart"):
+        raise FakeScanError(f"setting of option --mode failed (Invalid argument)")
+    return options
+
+
+class FaultPlan:
+    """Сбой, заданный в EASYPRINTER_FAKE_FAIL"""
+
+    def __init__(self, spec: str):
+        self.kind, _, argument = spec.partition(':')
+        self.kind = self.kind.strip().lower()
+        self.page = int(argument) if self.kind == 'jam' and argument else 0
+        self.fraction = float(argument) if self.kind in ('truncate', 'hang') and argument else 0.5
+
+    def stop_row(self, page: int, height: int) -> Optional[int]:
+        """Строка, на которой оборвать кадр (None - кадр целиком)"""
+        if self.kind in ('truncate', 'hang'):
+            return int(height * min(max(self.fraction, 0.0), 1.0))
+        if self.kind == 'jam' and page == self.page:
+            return height // 3
+        return None
+
+
+class PageGenerator:
+    """Детерминированная синтетическая страница в координатах стекла (мм)
+
+    Строка кадра зависит только от того, в какую полосу страницы она
+    попадает, поэтому готовые строки кэшируются и любая страница при
+    любом разрешении выдаётся быстро.
+    """
+
+    # Поля и разметка страницы (мм)
+    MARGIN = 20.0
+    TEXT_TOP = 25.0
+    TEXT_BOTTOM = 125.0
+    LINE_PITCH = 6.0
+    LINE_HEIGHT = 3.0
+    PHOTO_TOP = 135.0
+    PHOTO_BOTTOM = 235.0
+    PHOTO_BAND = 10.0
+    MARK_TOP = 255.0
+    MARK_BOTTOM = 265.0
+
+    def __init__(self, options: Options, page: int, seed: int):
+        self._options = options
+        self._page = page
+        self._seed = seed
+        self._dpi = options.resolution
+        self.width = max(1, self._px(options.width))
+        self.height = max(1, self._px(options.height))
+        self._rows: Dict[Tuple, bytes] = {}
+
+    def _px(self, mm: float) -> int:
+        return int(round(mm * self._dpi / 25.4))
+
+    @property
+    def channels(self) -> int:
+        return 3 if self._options.mode == "Color" else 1
+
+    @property
+    def row_size(self) -> int:
+        if self._options.mode == "Lineart":
+            return (self.width + 7) // 8
+        return self.width * self.channels
+
+    def header(self) -> bytes:
+        """Заголовок PNM"""
+        magic = {"Color": b"P6", "Gray": b"P5", "Lineart": b"P4"}[self._options.mode]
+        maxval = b"" if self._options.mode == "Lineart" else b"255\n"
+        return magic + b"\n%d %d\n" % (self.width, self.height) + maxval
+
+    def rows(self) -> Iterator[bytes]:
+        """Строки кадра сверху вниз"""
+        for y in range(self.height):
+            y_mm = self._options.top + (y + 0.5) * 25.4 / self._dpi
+            key = self._row_key(y_mm)
+            row = self._rows.get(key)
+            if row is None:
+                row = self._encode(self._render(key))
+                self._rows[key] = row
+            yield row
+
+    def _row_key(self, y_mm: float) -> Tuple:
+        """Какая полоса страницы на высоте y_mm"""
+        if self.TEXT_TOP <= y_mm < self.TEXT_BOTTOM:
+            line, offset = divmod(y_mm - self.TEXT_TOP, self.LINE_PITCH)
+            if offset < self.LINE_HEIGHT:
+                return ('text', int(line))
+        elif self.PHOTO_TOP <= y_mm < self.PHOTO_BOTTOM:
+            return ('photo', int((y_mm - self.PHOTO_TOP) // self.PHOTO_BAND))
+        elif self.MARK_TOP <= y_mm < self.MARK_BOTTOM:
+            return ('mark',)
+        return ('paper',)
+
+    def _render(self, key: Tuple) -> List[Tuple[int, int, int]]:
+        """Цвета пикселей строки"""
+        left = self._options.left
+        row = [PAPER] * self.width
+
+        def fill(start_mm: float, end_mm: float, color: Tuple[int, int, int]) -> None:
+            start = max(0, self._px(start_mm - left))
+            end = min(self.width, self._px(end_mm - left))
+            if end > start:
+                row[start:end] = [color] * (end - start)
+
+        if key[0] == 'text':
+            # Слова случайной длины, одинаковые для той же страницы и зерна
+            rng = random.Random(f"{self._seed}:{self._page}:{key[1]}")
+            x = self.MARGIN
+            line_end = MAX_WIDTH_MM - self.MARGIN - (rng.random() * 60 if key[1] % 5 == 4 else 0)
+            while x < line_end:
+                word = 3.0 + rng.random() * 15.0
+                fill(x, min(x + word, line_end), INK)
+                x += word + 2.0
+        elif key[0] == 'photo':
+            # Горизонтальный градиент с оттенком, меняющимся по полосам
+            start = max(0, self._px(self.MARGIN - left))
+            end = min(self.width, self._px(MAX_WIDTH_MM - self.MARGIN - left))
+            span = max(1, end - start)
+            tint = (key[1] * 37 + self._page * 53) % 256
+            for x in range(start, end):
+                level = 40 + 200 * (x - start) // span
+                row[x] = (level, (level + tint) // 2, 255 - level)
+        elif key[0] == 'mark':
+            # Номер страницы - число квадратов
+            for index in range(self._page):
+                x = self.MARGIN + index * 12.0
+                fill(x, x + 10.0, MARK)
+
+        return row
+
+    def _encode(self, pixels: List[Tuple[int, int, int]]) -> bytes:
+        """Строка в формате PNM текущего режима"""
+        if self._options.mode == "Color":
+            return bytes(value for pixel in pixels for value in pixel)
+
+        gray = [(r * 299 + g * 587 + b * 114) // 1000 for r, g, b in pixels]
+        if self._options.mode == "Gray":
+            return bytes(gray)
+
+        # PBM: 1 - чёрный, 8 пикселей в байте
+        packed = bytearray(self.row_size)
+        for x, level in enumerate(gray):
+            if level < 128:
+                packed[x >> 3] |= 0x80 >> (x & 7)
+        return bytes(packed)
+
+
+class Throttle:
+    """Ограничение скорости выдачи данных"""
+
+    def __init__(self, rate_mb: float):
+        self._rate = rate_mb * 1024 * 1024
+        self._start = time.monotonic()
+        self._sent = 0
+
+    def sent(self, count: int) -> None:
+        if self._rate <= 0:
+            return
+        self._sent += count
+        delay = self._start + self._sent / self._rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def write_frame(stream: BinaryIO, generator: PageGenerator, options: Options,
+                fault: Optional[FaultPlan], page: int) -> None:
+    """Выдать один кадр в поток в запрошенном формате"""
+    stop_row = fault.stop_row(page, generator.height) if fault else None
+
+    if options.format != "pnm":
+        if stop_row is not None:
+            _fail_at(fault, stop_row)
+        _write_encoded(stream, generator, options.format)
+        return
+
+    throttle = Throttle(_env_float("EASYPRINTER_FAKE_RATE", 0.0))
+    stream.write(generator.header())
+
+    chunk = []
+    chunk_size = 0
+    for y, row in enumerate(generator.rows()):
+        if y == stop_row:
+            break
+        chunk.append(row)
+        chunk_size += len(row)
+        if chunk_size >= 1 << 18:
+            stream.write(b"".join(chunk))
+            stream.flush()
+            throttle.sent(chunk_size)
+            chunk, chunk_size = [], 0
+
+    stream.write(b"".join(chunk))
+    stream.flush()
+
+    if stop_row is not None:
+        _fail_at(fault, stop_row)
+
+
+def _fail_at(fault: FaultPlan, row: int) -> None:
+    """Сработать заданному сбою посреди кадра"""
+    if fault.kind == 'hang':
+        while True:
+            time.sleep(3600)
+    if fault.kind == 'jam':
+        raise FakeScanError("sane_read: Document feeder jammed", EXIT_JAMMED)
+    raise FakeScanError(f"sane_read: Error during device I/O (row {row})", EXIT_IO_ERROR)
+
+
+def _write_encoded(stream: BinaryIO, generator: PageGenerator, fmt: str) -> None:
+    """PNG/TIFF/JPEG через Pillow (собирается весь кадр)"""
+    from PIL import Image
+
+    mode = {"P6": "RGB", "P5": "L", "P4": "1"}[generator.header()[:2].decode()]
+    raw_mode = "1;I" if mode == "1" else mode
+    image = Image.frombytes(mode, (generator.width, generator.height), b"".join(generator.rows()),
+                            "raw", raw_mode)
+    pil_format = {"png": "PNG", "tiff": "TIFF", "jpeg": "JPEG"}.get(fmt)
+    if pil_format is None:
+        raise FakeScanError(f"unsupported output format '{fmt}'")
+    image.save(stream, pil_format)
+    stream.flush()
+
+
+def list_devices() -> None:
+    time.sleep(_env_float("EASYPRINTER_FAKE_DISCOVERY", 0.0))
+    print(f"device `{DEVICE_NAME}' is a EasyPrinter virtual scanner")
+
+
+def print_options() -> None:
+    resolutions = "|".join(str(dpi) for dpi in RESOLUTIONS)
+    print(f"""
+All options specific to device `{DEVICE_NAME}':
+  Scan mode:
+    --mode Lineart|Gray|Color [Lineart]
+        Selects the scan mode.
+    --resolution {resolutions}dpi [75]
+        Sets the resolution of the scanned image.
+    --source Flatbed|ADF [Flatbed]
+        Selects the scan source.
+  Geometry:
+    -l 0..{MAX_WIDTH_MM}mm [0]
+        Top-left x position of scan area.
+    -t 0..{MAX_HEIGHT_MM}mm [0]
+        Top-left y position of scan area.
+    -x 0..{MAX_WIDTH_MM}mm [{MAX_WIDTH_MM}]
+        Width of scan-area.
+    -y 0..{MAX_HEIGHT_MM}mm [{MAX_HEIGHT_MM}]
+        Height of scan-area.""")
+
+
+def run(argv: List[str]) -> int:
+    options = parse_args(argv)
+
+    if options.list_devices:
+        list_devices()
+        return 0
+
+    if options.device and options.device != DEVICE_NAME:
+        raise FakeScanError(f"open of device {options.device} failed: Invalid argument")
+
+    if options.all_options:
+        print_options()
+        return 0
+
+    fault_spec = os.environ.get("EASYPRINTER_FAKE_FAIL", "").strip()
+    fault = FaultPlan(fault_spec) if fault_spec else None
+    if fault and fault.kind == 'busy':
+        raise FakeScanError(f"open of device {DEVICE_NAME} failed: Device busy")
+
+    seed = int(_env_float("EASYPRINTER_FAKE_SEED", 0))
+    time.sleep(_env_float("EASYPRINTER_FAKE_WARMUP", 0.0))
+
+    if options.batch is None:
+        generator = PageGenerator(options, 1, seed)
+        if options.output_file:
+            with open(options.output_file, 'wb') as f:
+                write_frame(f, generator, options, fault, 1)
+        else:
+            write_frame(sys.stdout.buffer, generator, options, fault, 1)
+        return 0
+
+    # Пакет из автоподатчика: по файлу на лист, имя печатается после записи
+    pages = int(_env_float("EASYPRINTER_FAKE_PAGES", 3))
+    if options.batch_count >= 0:
+        pages = min(pages, options.batch_count)
+
+    for number in range(options.batch_start, options.batch_start + pages):
+        page = number - options.batch_start + 1
+        path = options.batch % number if '%' in options.batch else options.batch
+        with open(path, 'wb') as f:
+            write_frame(f, PageGenerator(options, page, seed), options, fault, page)
+        if options.batch_print:
+            print(path, flush=True)
+        else:
+            sys.stderr.write(f"Scanned page {number}. (scanner status = 5)\n")
+
+    if options.batch_count >= 0 and pages >= options.batch_count:
+        return 0
+    sys.stderr.write("scanimage: sane_start: Document feeder out of documents\n")
+    return EXIT_NO_DOCS
+
+
+def main() -> int:
+    try:
+        return run(sys.argv[1:])
+    except FakeScanError as e:
+        sys.stderr.write(f"scanimage: {e}\n")
+        return e.exit_code
+    except BrokenPipeError:
+        # Читатель закрыл канал (отмена сканирования)
+        return EXIT_IO_ERROR
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Замер сканирования на имитации сканера: время и пиковая память
+
+Запуск: python -m easyprinter.tools.scan_benchmark --resolution 600 --repeat 3
+Параметры имитации (скорость, сбои) передаются через EASYPRINTER_FAKE_*.
+"""
+
+import argparse
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from ..models import ScanSettings, ScanResolution, ScanFormat, ScanSource
+from ..services.scanner_service import ScannerService, SCANIMAGE_ENV
+from ..services.scanner_cache import ScannerCache
+from ..services.image_processing_service import ImageProcessingService
+from .fake_scanimage import DEVICE_NAME
+
+
+FAKE_SCANIMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_scanimage.py")
+
+
+def peak_memory_mb() -> float:
+    """Пиковый размер резидентной памяти процесса (МБ)"""
+    if platform.system() == "Windows":
+        return 0.0
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS - байты
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def run_benchmark(resolution: int, file_format: str, adf: bool, repeat: int) -> List[Dict[str, float]]:
+    """Отсканировать и сохранить repeat раз; время этапов в секундах"""
+    os.environ.setdefault(SCANIMAGE_ENV, f'"{sys.executable}" "{FAKE_SCANIMAGE}"')
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="scan_benchmark_") as folder:
+        service = ScannerService(ImageProcessingService(), ScannerCache(os.path.join(folder, "scanners.json")))
+        try:
+            for index in range(repeat):
+                settings = ScanSettings(
+                    resolution=ScanResolution(resolution),
+                    format=ScanFormat[file_format.upper()],
+                    output_folder=folder,
+                    file_name=f"bench_{index}",
+                    source=ScanSource.ADF if adf else ScanSource.FLATBED,
+                    device=DEVICE_NAME
+                )
+
+                start = time.perf_counter()
+                if adf:
+                    service.scan_batch(settings)
+                    scanned = saved = time.perf_counter()
+                else:
+                    buffer = service.scan_to_buffer(settings)
+                    scanned = time.perf_counter()
+                    service.save_scan(buffer, settings)
+                    buffer.close()
+                    saved = time.perf_counter()
+
+                results.append({
+                    "scan": scanned - start,
+                    "save": saved - scanned,
+                    "total": saved - start,
+                    "peak_mb": peak_memory_mb()
+                })
+        finally:
+            service.dispose()
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Замер сканирования на имитации сканера")
+    parser.add_argument("--resolution", type=int, default=300, choices=[r.value for r in ScanResolution])
+    parser.add_argument("--format", default="pdf", choices=[f.name.lower() for f in ScanFormat])
+    parser.add_argument("--adf", action="store_true", help="пакетное сканирование из автоподатчика")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.resolution, args.format, args.adf, args.repeat)
+    for index, result in enumerate(results, 1):
+        print(f"#{index}: скан {result['scan']:.2f} с, сохранение {result['save']:.2f} с, "
+              f"всего {result['total']:.2f} с, пик памяти {result['peak_mb']:.0f} МБ")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
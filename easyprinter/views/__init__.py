@@ -13,6 +13,7 @@ from .styles import Styles
 from .file_picker_dialog import FilePickerDialog
 from .print_settings_dialog import PrintSettingsDialog
 from .print_confirmation_dialog import PrintConfirmationDialog
+from .service_bridge import ServiceBridge
 
 __all__ = [
     'MainWindow',
@@ -25,5 +26,6 @@ __all__ = [
     'Styles',
     'FilePickerDialog',
     'PrintSettingsDialog',
-    'PrintConfirmationDialog'
+    'PrintConfirmationDialog',
+    'ServiceBridge'
 ]
@@ -13,8 +13,8 @@ from PyQt6.QtGui import QPixmap, QImage, QFont
 from PIL import Image
 
 from .styles import Styles
-from ..models import ScanSettings, ScanResolution, ScanSource, PrintSettings
-from ..services import ScannerService, PrinterService, ImageProcessingService
+from ..models import ScanSettings, ScanSource, PrintSettings
+from ..services import CopyService
 from ..services.sound_service import sound_service
 
 
@@ -23,50 +23,29 @@ class CopyWorker(QThread):
     progress = pyqtSignal(str, int)
     finished = pyqtSignal(bool, str)
 
-    def __init__(self, scanner_service: ScannerService, printer_service: PrinterService,
-                 scan_settings: ScanSettings, print_settings: PrintSettings, copies: int):
+    def __init__(self, copy_service: CopyService, scan_settings: Optional[ScanSettings],
+                 print_settings: Optional[PrintSettings], copies: int):
         super().__init__()
-        self.scanner_service = scanner_service
-        self.printer_service = printer_service
+        self.copy_service = copy_service
         self.scan_settings = scan_settings
         self.print_settings = print_settings
         self.copies = copies
 
     def run(self):
         try:
-            # Шаг 1: Сканирование
-            self.progress.emit("Сканирование документа...", 20)
-            image = self.scanner_service.scan(self.scan_settings)
-
-            if image is None:
-                self.finished.emit(False, "Не удалось отсканировать документ")
+            if self.scan_settings is None:
+                # Повторная печать последней копии, без сканера
+                self.copy_service.print_again(self.copies, self.progress.emit)
+                self.finished.emit(True, f"Успешно создано копий: {self.copies}")
                 return
 
-            # Шаг 2: Сохранение во временный файл
-            self.progress.emit("Подготовка к печати...", 50)
-            import tempfile
-            import os
-
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                tmp_path = tmp.name
-                image.save(tmp_path, 'PNG')
-
-            try:
-                # Шаг 3: Печать
-                self.progress.emit("Печать копии...", 80)
-                self.print_settings.copies = self.copies
-                self.printer_service.print_file(tmp_path, self.print_settings)
-
-                self.progress.emit("Копирование завершено", 100)
+            self.print_settings.copies = self.copies
+            if self.scan_settings.source == ScanSource.ADF:
+                pages = self.copy_service.copy_batch(self.scan_settings, self.print_settings, self.progress.emit)
+                self.finished.emit(True, f"Скопировано страниц: {pages}, копий: {self.copies}")
+            else:
+                self.copy_service.copy(self.scan_settings, self.print_settings, self.progress.emit)
                 self.finished.emit(True, f"Успешно создано копий: {self.copies}")
-
-            finally:
-                # Удаляем временный файл
-                try:
-                    os.unlink(tmp_path)
-                except:
-                    pass
-
         except Exception as e:
             self.finished.emit(False, str(e))
 
@@ -76,12 +55,9 @@ class CopyView(QWidget):
 
     navigate_back = pyqtSignal()
 
-    def __init__(self, scanner_service: ScannerService, printer_service: PrinterService,
-                 image_processing: ImageProcessingService, parent=None):
+    def __init__(self, copy_service: CopyService, parent=None):
         super().__init__(parent)
-        self._scanner_service = scanner_service
-        self._printer_service = printer_service
-        self._image_processing = image_processing
+        self._copy_service = copy_service
         self._copy_worker: Optional[CopyWorker] = None
 
         self._init_ui()
@@ -214,7 +190,31 @@ class CopyView(QWidget):
             }}
         """)
         self._copy_btn.clicked.connect(self._on_copy_clicked)
-        main_layout.addWidget(self._copy_btn)
+
+        # Повтор последней копии без сканирования
+        self._again_btn = QPushButton("ЕЩЁ РАЗ")
+        self._again_btn.setFixedHeight(80)
+        self._again_btn.setFixedWidth(220)
+        self._again_btn.setToolTip("Напечатать последнюю копию ещё раз, не сканируя оригинал")
+        self._again_btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {Styles.PRIMARY_COLOR};
+                color: white;
+                font-size: 20px;
+                font-weight: bold;
+                border-radius: 12px;
+            }}
+            QPushButton:disabled {{
+                background-color: #BDBDBD;
+            }}
+        """)
+        self._again_btn.setEnabled(False)
+        self._again_btn.clicked.connect(self._on_again_clicked)
+
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addWidget(self._copy_btn, stretch=1)
+        buttons_layout.addWidget(self._again_btn)
+        main_layout.addLayout(buttons_layout)
 
     def _on_scale_changed(self, value: int):
         """Обработчик изменения масштаба"""
@@ -222,26 +222,39 @@ class CopyView(QWidget):
 
     def _on_copy_clicked(self):
         """Обработчик нажатия кнопки копирования"""
-        # Настройки сканирования
-        scan_settings = ScanSettings()
-        scan_settings.resolution = ScanResolution.DPI_300
-        sources = [ScanSource.FLATBED, ScanSource.ADF]
-        scan_settings.source = sources[self._source_combo.currentIndex()]
-
         # Настройки печати
         print_settings = PrintSettings()
         print_settings.scale = self._scale_slider.value()
         print_settings.copies = self._copies_spin.value()
 
+        # Настройки сканирования - под разрешение и бумагу принтера
+        sources = [ScanSource.FLATBED, ScanSource.ADF]
+        scan_settings = self._copy_service.scan_settings_for(
+            print_settings, sources[self._source_combo.currentIndex()]
+        )
+
+        self._start_worker(scan_settings, print_settings)
+
+    def _on_again_clicked(self):
+        """Обработчик нажатия кнопки повторной копии"""
+        if self._copy_service.last_copy is None:
+            self._again_btn.setEnabled(False)
+            QMessageBox.information(self, "Копия устарела", "Сохранённой копии больше нет - нажмите 'Копировать'")
+            return
+
+        self._start_worker(None, None)
+
+    def _start_worker(self, scan_settings: Optional[ScanSettings], print_settings: Optional[PrintSettings]):
+        """Запустить копирование (без настроек - повтор последней копии)"""
         # Показываем прогресс
         self._progress_widget.setVisible(True)
         self._progress_bar.setValue(0)
         self._copy_btn.setEnabled(False)
+        self._again_btn.setEnabled(False)
 
         # Запускаем копирование
         self._copy_worker = CopyWorker(
-            self._scanner_service,
-            self._printer_service,
+            self._copy_service,
             scan_settings,
             print_settings,
             self._copies_spin.value()
@@ -250,6 +263,15 @@ class CopyView(QWidget):
         self._copy_worker.finished.connect(self._on_finished)
         self._copy_worker.start()
 
+    def showEvent(self, event):
+        """Сохранённая копия могла устареть, пока страница была скрыта"""
+        super().showEvent(event)
+        self._update_again_button()
+
+    def _update_again_button(self):
+        """Кнопка повтора доступна, пока есть сохранённая копия"""
+        self._again_btn.setEnabled(self._copy_service.last_copy is not None)
+
     @pyqtSlot(str, int)
     def _on_progress(self, message: str, progress: int):
         """Обработчик прогресса"""
@@ -260,6 +282,7 @@ class CopyView(QWidget):
     def _on_finished(self, success: bool, message: str):
         """Обработчик завершения"""
         self._copy_btn.setEnabled(True)
+        self._update_again_button()
         self._progress_widget.setVisible(False)
 
         if success:
@@ -16,7 +16,9 @@ from .scan_view import ScanView
 from .copy_view import CopyView
 from .status_view import StatusView
 from .settings_view import SettingsView
-from ..services import StatusService, PrinterService, ScannerService, ImageProcessingService
+from .service_bridge import ServiceBridge
+from ..services import StatusService, PrinterService, ScannerService, CopyService, ImageProcessingService, metrics_server
+from ..services.settings_storage import settings_storage
 from ..models import PrinterStatus
 
 
@@ -31,15 +33,25 @@ class MainWindow(QMainWindow):
         self._status_service = StatusService()
         self._printer_service = PrinterService(self._status_service, self._image_processing)
         self._scanner_service = ScannerService(self._image_processing)
+        self._copy_service = CopyService(self._scanner_service, self._printer_service, self._image_processing)
+        self._scanner_session_unavailable = (
+            settings_storage.preferences.scanner_session_enabled
+            and not self._scanner_service.set_session_enabled(True)
+        )
 
-        # Подписываемся на обновления статуса
-        self._status_service.add_status_changed_callback(self._on_status_changed)
+        # События сервисов приходят из их потоков - переносим в GUI-поток
+        self._service_bridge = ServiceBridge(self._status_service, self._scanner_service, self)
+        self._service_bridge.status_changed.connect(self._on_status_changed)
 
         self._init_ui()
 
         # Запускаем мониторинг статуса
         self._status_service.start_monitoring()
 
+        # Метрики для внешнего мониторинга (выключены по умолчанию)
+        if settings_storage.preferences.metrics_enabled:
+            metrics_server.start(settings_storage.preferences.metrics_port)
+
     def _init_ui(self):
         """Инициализация интерфейса"""
         self.setWindowTitle("EasyPrinter - HP LaserJet M1536dnf")
@@ -72,17 +84,20 @@ class MainWindow(QMainWindow):
         self._print_view = PrintView(self._printer_service, self._image_processing)
         self._print_view.navigate_back.connect(lambda: self._show_page(0))
 
-        self._scan_view = ScanView(self._scanner_service, self._image_processing)
+        self._scan_view = ScanView(self._scanner_service, self._image_processing, self._service_bridge)
         self._scan_view.navigate_back.connect(lambda: self._show_page(0))
 
-        self._copy_view = CopyView(self._scanner_service, self._printer_service, self._image_processing)
+        self._copy_view = CopyView(self._copy_service)
         self._copy_view.navigate_back.connect(lambda: self._show_page(0))
 
-        self._status_view = StatusView(self._status_service)
+        self._status_view = StatusView(self._status_service, self._service_bridge)
         self._status_view.navigate_back.connect(lambda: self._show_page(0))
 
         self._settings_view = SettingsView()
         self._settings_view.navigate_back.connect(lambda: self._show_page(0))
+        self._settings_view.scanner_session_changed.connect(self._on_scanner_session_changed)
+        if self._scanner_session_unavailable:
+            self._settings_view.set_scanner_session_unavailable()
 
         # Добавляем страницы в стек
         self._stack.addWidget(self._home_page)      # 0
@@ -174,6 +189,12 @@ class MainWindow(QMainWindow):
         self._show_page(1)  # Переключаемся на страницу печати
         self._print_view.load_file_for_print(file_path)
 
+    def _on_scanner_session_changed(self, enabled: bool):
+        """Включение постоянного сеанса сканера из настроек"""
+        if not self._scanner_service.set_session_enabled(enabled) and enabled:
+            self._settings_view.set_scanner_session_unavailable()
+
+    @pyqtSlot(object)
     def _on_status_changed(self, status: PrinterStatus):
         """Обработчик изменения статуса принтера"""
         # Обновляем индикатор
@@ -222,8 +243,10 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Обработчик закрытия окна"""
         # Останавливаем мониторинг
+        self._service_bridge.dispose()
         self._status_service.stop_monitoring()
         self._status_service.dispose()
         self._scanner_service.dispose()
+        metrics_server.stop()
 
         super().closeEvent(event)
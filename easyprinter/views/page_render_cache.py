@@ -0,0 +1,159 @@
+"""
+Кэш отрисованных страниц PDF и фоновая отрисовка соседних страниц
+"""
+
+from collections import OrderedDict
+from threading import Condition, Lock, Thread
+from typing import Hashable, Optional, Tuple
+from PyQt6.QtGui import QImage
+import fitz
+
+from ..services import logger
+
+
+# Ключ страницы: (документ, номер страницы, ширина, высота в физических пикселях)
+PageKey = Tuple[Hashable, int, int, int]
+
+
+def render_pdf_page(page: 'fitz.Page', width: int, height: int) -> QImage:
+    """Отрисовать страницу сразу в размере, вписанном в width x height пикселей
+
+    Масштаб считается по размеру страницы (с учётом поворота), поэтому
+    растр не приходится рисовать крупнее и потом уменьшать.
+    Можно вызывать не из GUI-потока.
+    """
+    rect = page.rect
+    zoom = min(width / rect.width, height / rect.height) if rect.width > 0 and rect.height > 0 else 1.0
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
+
+    # QImage ссылается на буфер pixmap - копируем, пока он жив
+    return image.copy()
+
+
+class PageRenderCache:
+    """LRU-кэш отрисованных страниц с ограничением по памяти
+
+    Хранятся QImage: их можно создавать в фоновом потоке, а QPixmap
+    из них собирается в GUI-потоке уже при показе.
+    """
+
+    # Предел памяти под изображения (байты)
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self._max_bytes = max_bytes or self.MAX_BYTES
+        self._images: "OrderedDict[PageKey, QImage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, key: PageKey) -> Optional[QImage]:
+        """Изображение страницы (None - не в кэше)"""
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def contains(self, key: PageKey) -> bool:
+        with self._lock:
+            return key in self._images
+
+    def put(self, key: PageKey, image: QImage) -> None:
+        """Запомнить изображение, вытеснив давно не показанные"""
+        size = image.sizeInBytes()
+        if size > self._max_bytes:
+            return
+
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.sizeInBytes()
+
+            self._images[key] = image
+            self._bytes += size
+
+            while self._bytes > self._max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= evicted.sizeInBytes()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+
+class PagePrefetcher:
+    """Фоновая отрисовка соседних страниц в кэш
+
+    Поток открывает документ отдельно: объект fitz.Document нельзя
+    использовать из двух потоков одновременно. Важен только последний
+    запрос - при быстром листании устаревшие страницы не рисуются.
+    """
+
+    # Смещения соседних страниц в порядке отрисовки
+    NEIGHBOURS = (1, -1, 2)
+
+    def __init__(self, cache: PageRenderCache):
+        self._cache = cache
+        self._condition = Condition()
+        self._request: Optional[Tuple[str, Hashable, int, int, int]] = None
+        self._stopped = False
+        self._thread: Optional[Thread] = None
+
+    def request(self, path: str, document_key: Hashable, page: int, width: int, height: int) -> None:
+        """Отрисовать соседей страницы page заданного размера"""
+        with self._condition:
+            if self._stopped:
+                return
+            self._request = (path, document_key, page, width, height)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._prefetch_loop, name="pdf-prefetch", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def stop(self) -> None:
+        """Остановить поток"""
+        with self._condition:
+            self._stopped = True
+            self._request = None
+            self._condition.notify()
+
+    def _prefetch_loop(self) -> None:
+        document = None
+        opened_key = None
+
+        try:
+            while True:
+                with self._condition:
+                    while self._request is None and not self._stopped:
+                        self._condition.wait()
+                    if self._stopped:
+                        return
+                    path, document_key, center, width, height = self._request
+                    self._request = None
+
+                try:
+                    if document_key != opened_key:
+                        if document is not None:
+                            document.close()
+                        document = fitz.open(path)
+                        opened_key = document_key
+
+                    for offset in self.NEIGHBOURS:
+                        index = center + offset
+                        if not 0 <= index < len(document):
+                            continue
+                        with self._condition:
+                            if self._request is not None or self._stopped:
+                                break  # Пользователь уже перелистнул - начинаем заново
+
+                        key = (document_key, index, width, height)
+                        if not self._cache.contains(key):
+                            self._cache.put(key, render_pdf_page(document[index], width, height))
+                except Exception as e:
+                    logger.warning(f"Не удалось подготовить страницы PDF: {e}")
+                    document, opened_key = None, None
+        finally:
+            if document is not None:
+                document.close()
@@ -17,6 +17,8 @@ from .styles import Styles
 from .file_picker_dialog import FilePickerDialog
 from .print_settings_dialog import PrintSettingsDialog
 from .print_confirmation_dialog import PrintConfirmationDialog
+from .page_render_cache import PageRenderCache, PagePrefetcher, render_pdf_page
+from .thumbnail_strip import ThumbnailStrip
 from ..models import PrintSettings
 from ..services import PrinterService, ImageProcessingService, logger
 from ..services.sound_service import sound_service
@@ -61,6 +63,9 @@ class PrintView(QWidget):
         self._image_processing = image_processing
         self._current_file: Optional[str] = None
         self._pdf_document = None
+        self._document_key = None
+        self._page_cache = PageRenderCache()
+        self._prefetcher = PagePrefetcher(self._page_cache)
         self._current_page = 0
         self._total_pages = 1
         self._original_image: Optional[Image.Image] = None
@@ -196,6 +201,12 @@ class PrintView(QWidget):
 
         layout.addWidget(preview_container, stretch=1)
 
+        # Миниатюры страниц многостраничного PDF
+        self._thumbnail_strip = ThumbnailStrip()
+        self._thumbnail_strip.page_selected.connect(self._go_to_page)
+        self._thumbnail_strip.setVisible(False)
+        layout.addWidget(self._thumbnail_strip)
+
         # Навигация по страницам
         self._nav_widget = QWidget()
         nav_layout = QHBoxLayout(self._nav_widget)
@@ -362,11 +373,15 @@ class PrintView(QWidget):
             if self._pdf_document:
                 self._pdf_document.close()
             self._pdf_document = fitz.open(file_path)
+            # Изменённый на диске файл - другой документ для кэша страниц
+            self._document_key = (file_path, os.path.getmtime(file_path))
             self._total_pages = len(self._pdf_document)
             self._current_page = 0
             self._docx_text = None
             self._original_image = None
             self._nav_widget.setVisible(self._total_pages > 1)
+            self._thumbnail_strip.set_document(file_path, self._document_key, self._total_pages)
+            self._thumbnail_strip.setVisible(self._total_pages > 1)
             self._preview_label.setVisible(True)
             self._update_page_info()
             self._render_pdf_page()
@@ -391,6 +406,8 @@ class PrintView(QWidget):
             self._pdf_document = None
             self._original_image = None
             self._nav_widget.setVisible(False)
+            self._thumbnail_strip.set_document(None, None, 0)
+            self._thumbnail_strip.setVisible(False)
 
             # Извлекаем текст
             full_text = []
@@ -426,6 +443,8 @@ class PrintView(QWidget):
             self._total_pages = 1
             self._current_page = 0
             self._nav_widget.setVisible(False)
+            self._thumbnail_strip.set_document(None, None, 0)
+            self._thumbnail_strip.setVisible(False)
             self._preview_label.setVisible(True)
             self._update_preview_image()
             logger.info(f"Изображение загружено: {self._original_image.size}")
@@ -439,19 +458,23 @@ class PrintView(QWidget):
         if not self._pdf_document:
             return
 
-        page = self._pdf_document[self._current_page]
-        mat = fitz.Matrix(2, 2)
-        pix = page.get_pixmap(matrix=mat)
+        # Размер области в физических пикселях экрана (с учётом масштаба HiDPI)
+        ratio = self._preview_label.devicePixelRatioF()
+        width = max(1, round(self._preview_label.width() * ratio))
+        height = max(1, round(self._preview_label.height() * ratio))
+        key = (self._document_key, self._current_page, width, height)
 
-        img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
-        pixmap = QPixmap.fromImage(img)
+        image = self._page_cache.get(key)
+        if image is None:
+            image = render_pdf_page(self._pdf_document[self._current_page], width, height)
+            self._page_cache.put(key, image)
 
-        scaled = pixmap.scaled(
-            self._preview_label.size(),
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        self._preview_label.setPixmap(scaled)
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(ratio)
+        self._preview_label.setPixmap(pixmap)
+
+        # Пока пользователь смотрит страницу, соседние рисуются в фоне
+        self._prefetcher.request(self._current_file, self._document_key, self._current_page, width, height)
 
     def _update_preview_image(self):
         """Обновить предпросмотр изображения"""
@@ -489,11 +512,19 @@ class PrintView(QWidget):
             self._update_page_info()
             self._render_pdf_page()
 
+    def _go_to_page(self, page: int):
+        """Перейти к странице (выбор миниатюры)"""
+        if page != self._current_page and 0 <= page < self._total_pages:
+            self._current_page = page
+            self._update_page_info()
+            self._render_pdf_page()
+
     def _update_page_info(self):
         """Обновить информацию о страницах"""
         self._page_label.setText(f"Страница {self._current_page + 1} из {self._total_pages}")
         self._prev_btn.setEnabled(self._current_page > 0)
         self._next_btn.setEnabled(self._current_page < self._total_pages - 1)
+        self._thumbnail_strip.set_current_page(self._current_page)
 
     def _on_print_clicked(self):
         """Обработчик нажатия кнопки печати"""
@@ -578,6 +609,8 @@ class PrintView(QWidget):
 
     def closeEvent(self, event):
         """Очистка ресурсов"""
+        self._prefetcher.stop()
+        self._thumbnail_strip.stop()
         if self._pdf_document:
             self._pdf_document.close()
         super().closeEvent(event)
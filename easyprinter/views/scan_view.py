@@ -3,28 +3,50 @@
 """
 
 import os
-from typing import Optional
+from typing import Optional, List
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QComboBox, QSlider,
     QFileDialog, QScrollArea, QFrame, QMessageBox,
-    QProgressBar, QGroupBox
+    QProgressBar, QGroupBox, QCheckBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread, pyqtSlot
-from PyQt6.QtGui import QPixmap, QImage, QFont
+from PyQt6.QtCore import Qt, pyqtSignal, QThread, pyqtSlot, QRectF, QPointF
+from PyQt6.QtGui import QPixmap, QImage, QFont, QPainter, QPen, QColor
 from PIL import Image
 from datetime import datetime
 
 from .styles import Styles
-from ..models import ScanSettings, ScanResolution, ScanFormat, ScanSource
-from ..services import ScannerService, ImageProcessingService, logger
+from ..models import ScanSettings, ScanResolution, ScanFormat, ScanSource, ScanRegion, ScannerDevice
+from ..services import ScannerService, ImageProcessingService, ScanBuffer, logger
 from ..services.sound_service import sound_service
+from .service_bridge import ServiceBridge
 
 
 class ScanWorker(QThread):
     """Рабочий поток для сканирования"""
-    finished = pyqtSignal(object)  # Image or None
-    progress = pyqtSignal(str, int)
+    finished = pyqtSignal(object, object)  # ScanBuffer, уменьшенная копия для экрана
+    error = pyqtSignal(str)
+
+    def __init__(self, scanner_service: ScannerService, settings: ScanSettings, preview_size: int):
+        super().__init__()
+        self.scanner_service = scanner_service
+        self.settings = settings
+        self.preview_size = preview_size
+
+    def run(self):
+        # Прогресс приходит в GUI через ServiceBridge
+        try:
+            buffer = self.scanner_service.scan_to_buffer(self.settings)
+            # Предпросмотр собирается из полос здесь, а не в GUI-потоке
+            self.finished.emit(buffer, buffer.thumbnail(self.preview_size, self.preview_size))
+        except Exception as e:
+            logger.exception(f"Ошибка сканирования: {e}")
+            self.error.emit(str(e))
+
+
+class BatchScanWorker(QThread):
+    """Рабочий поток пакетного сканирования из автоподатчика"""
+    finished = pyqtSignal(list)  # Пути сохранённых файлов
     error = pyqtSignal(str)
 
     def __init__(self, scanner_service: ScannerService, settings: ScanSettings):
@@ -34,23 +56,132 @@ class ScanWorker(QThread):
 
     def run(self):
         try:
-            # Подключаем callback для прогресса
-            def on_progress(event):
-                self.progress.emit(event.message, event.progress)
+            paths = self.scanner_service.scan_batch(self.settings)
+            self.finished.emit(paths)
+        except Exception as e:
+            logger.exception(f"Ошибка пакетного сканирования: {e}")
+            self.error.emit(str(e))
+
 
-            self.scanner_service.add_progress_callback(on_progress)
+class PrescanWorker(QThread):
+    """Рабочий поток предварительного скана"""
+    finished = pyqtSignal(object)  # Image
+    error = pyqtSignal(str)
+
+    def __init__(self, scanner_service: ScannerService, device: Optional[str] = None):
+        super().__init__()
+        self.scanner_service = scanner_service
+        self.device = device
 
-            image = self.scanner_service.scan(self.settings)
-            self.finished.emit(image)
+    def run(self):
+        try:
+            self.finished.emit(self.scanner_service.prescan(self.device))
         except Exception as e:
-            logger.exception(f"Ошибка сканирования: {e}")
+            logger.exception(f"Ошибка предварительного скана: {e}")
             self.error.emit(str(e))
-        finally:
-            # Удаляем callback
-            try:
-                self.scanner_service._progress_callbacks.clear()
-            except:
-                pass
+
+
+class RegionPreviewLabel(QLabel):
+    """Предпросмотр с выделением области мышью"""
+
+    # Выделенная область в пикселях изображения (x, y, w, h) или None
+    selection_changed = pyqtSignal(object)
+
+    # Минимальный размер выделения (пиксели экрана)
+    MIN_SELECTION = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._image_size: Optional[tuple] = None
+        self._selection: Optional[QRectF] = None
+        self._drag_start: Optional[QPointF] = None
+
+    def set_selectable(self, image_size: Optional[tuple]):
+        """Включить выделение для изображения указанного размера (None - выключить)"""
+        self._image_size = image_size
+        self._selection = None
+        self._drag_start = None
+        self.setCursor(Qt.CursorShape.CrossCursor if image_size else Qt.CursorShape.ArrowCursor)
+        self.update()
+
+    def set_selection(self, rect: Optional[tuple]):
+        """Установить выделение в пикселях изображения"""
+        self._selection = QRectF(*rect) if rect else None
+        self.update()
+
+    def _pixmap_rect(self) -> Optional[QRectF]:
+        """Где на виджете нарисовано изображение"""
+        pixmap = self.pixmap()
+        if pixmap is None or pixmap.isNull():
+            return None
+        x = (self.width() - pixmap.width()) / 2
+        y = (self.height() - pixmap.height()) / 2
+        return QRectF(x, y, pixmap.width(), pixmap.height())
+
+    def _to_image(self, point: QPointF) -> Optional[QPointF]:
+        """Перевести точку виджета в пиксели изображения"""
+        area = self._pixmap_rect()
+        if area is None or not self._image_size:
+            return None
+        scale = self._image_size[0] / area.width()
+        x = min(max(point.x() - area.x(), 0.0), area.width()) * scale
+        y = min(max(point.y() - area.y(), 0.0), area.height()) * scale
+        return QPointF(x, y)
+
+    def mousePressEvent(self, event):
+        if self._image_size and event.button() == Qt.MouseButton.LeftButton:
+            self._drag_start = self._to_image(event.position())
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._drag_start is not None:
+            current = self._to_image(event.position())
+            if current is not None:
+                self._selection = QRectF(self._drag_start, current).normalized()
+                self.update()
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self._drag_start is not None:
+            self._drag_start = None
+            area = self._pixmap_rect()
+            selection = self._selection
+            min_size = self.MIN_SELECTION * self._image_size[0] / area.width() if area else 0
+            if selection is None or selection.width() < min_size or selection.height() < min_size:
+                self._selection = None
+                self.selection_changed.emit(None)
+            else:
+                self.selection_changed.emit(
+                    (selection.x(), selection.y(), selection.width(), selection.height())
+                )
+            self.update()
+        super().mouseReleaseEvent(event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        area = self._pixmap_rect()
+        if self._selection is None or area is None or not self._image_size:
+            return
+
+        scale = area.width() / self._image_size[0]
+        rect = QRectF(
+            area.x() + self._selection.x() * scale,
+            area.y() + self._selection.y() * scale,
+            self._selection.width() * scale,
+            self._selection.height() * scale
+        )
+
+        painter = QPainter(self)
+        # Затемняем всё вне выделения
+        shade = QColor(0, 0, 0, 90)
+        painter.fillRect(QRectF(area.x(), area.y(), area.width(), rect.y() - area.y()), shade)
+        painter.fillRect(QRectF(area.x(), rect.bottom(), area.width(), area.bottom() - rect.bottom()), shade)
+        painter.fillRect(QRectF(area.x(), rect.y(), rect.x() - area.x(), rect.height()), shade)
+        painter.fillRect(QRectF(rect.right(), rect.y(), area.right() - rect.right(), rect.height()), shade)
+
+        painter.setPen(QPen(QColor(Styles.PRIMARY_COLOR), 2))
+        painter.drawRect(rect)
+        painter.end()
 
 
 class ScanView(QWidget):
@@ -66,15 +197,33 @@ class ScanView(QWidget):
         1200: "Максимальное качество"
     }
 
-    def __init__(self, scanner_service: ScannerService, image_processing: ImageProcessingService, parent=None):
+    # Наибольшая сторона предпросмотра скана (коррекция показывается на нём)
+    PREVIEW_MAX_SIZE = 1600
+
+    def __init__(self, scanner_service: ScannerService, image_processing: ImageProcessingService,
+                 service_bridge: ServiceBridge, parent=None):
         super().__init__(parent)
         self._scanner_service = scanner_service
         self._image_processing = image_processing
-        self._scanned_image: Optional[Image.Image] = None
+        # Кадр скана в файле, отображённом в память, и его уменьшенная копия для экрана
+        self._scan_buffer: Optional[ScanBuffer] = None
+        self._preview_image: Optional[Image.Image] = None
+        self._prescan_image: Optional[Image.Image] = None
         self._settings = ScanSettings()
-        self._scan_worker: Optional[ScanWorker] = None
+        self._scan_worker: Optional[QThread] = None
+        self._cancel_requested = False
+        self._pending_saves = set()  # Пути файлов, которые сохраняются в фоне
 
         self._init_ui()
+
+        # Прогресс сканирования приходит в GUI-поток через мост (не чаще раза за кадр)
+        service_bridge.scan_progress.connect(self._on_scan_progress)
+        service_bridge.scan_preview.connect(self._on_scan_preview)
+        service_bridge.scanners_changed.connect(self._populate_devices)
+        service_bridge.scan_completed.connect(self._on_scan_completed)
+
+        # Список сканеров - сразу из кэша, свежий придёт через мост
+        self._populate_devices(self._scanner_service.get_scanner_devices())
         logger.info("Открыта страница сканирования")
 
     def _init_ui(self):
@@ -144,6 +293,24 @@ class ScanView(QWidget):
         self._scan_btn.clicked.connect(self._on_scan_clicked)
         actions_layout.addWidget(self._scan_btn)
 
+        self._cancel_btn = QPushButton("ОТМЕНА")
+        self._cancel_btn.setFixedHeight(80)
+        self._cancel_btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {Styles.DANGER_COLOR};
+                color: white;
+                font-size: 20px;
+                font-weight: bold;
+                border-radius: 12px;
+            }}
+            QPushButton:disabled {{
+                background-color: #BDBDBD;
+            }}
+        """)
+        self._cancel_btn.setVisible(False)
+        self._cancel_btn.clicked.connect(self._on_cancel_clicked)
+        actions_layout.addWidget(self._cancel_btn)
+
         self._save_btn = QPushButton("СОХРАНИТЬ")
         self._save_btn.setFixedHeight(80)
         self._save_btn.setStyleSheet(f"""
@@ -217,7 +384,8 @@ class ScanView(QWidget):
         preview_layout.addWidget(self._progress_widget)
 
         # Превью изображения
-        self._preview_label = QLabel()
+        self._preview_label = RegionPreviewLabel()
+        self._preview_label.selection_changed.connect(self._on_region_selected)
         self._preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self._preview_label.setMinimumSize(400, 400)
         self._preview_label.setVisible(False)
@@ -242,6 +410,13 @@ class ScanView(QWidget):
         scan_group = QGroupBox("Настройки сканирования")
         scan_layout = QVBoxLayout(scan_group)
 
+        # Сканер
+        scan_layout.addWidget(QLabel("Сканер:"))
+        self._device_combo = QComboBox()
+        self._device_combo.addItem("Автоматически", None)
+        self._device_combo.currentIndexChanged.connect(self._update_settings)
+        scan_layout.addWidget(self._device_combo)
+
         # Источник
         scan_layout.addWidget(QLabel("Источник:"))
         self._source_combo = QComboBox()
@@ -275,6 +450,27 @@ class ScanView(QWidget):
 
         layout.addWidget(scan_group)
 
+        # Область сканирования
+        region_group = QGroupBox("Область сканирования")
+        region_layout = QVBoxLayout(region_group)
+
+        self._prescan_btn = QPushButton("Предварительный скан")
+        self._prescan_btn.clicked.connect(self._on_prescan_clicked)
+        region_layout.addWidget(self._prescan_btn)
+
+        self._region_label = QLabel("Всё стекло")
+        self._region_label.setStyleSheet(f"color: {Styles.TEXT_SECONDARY}; font-size: 11px;")
+        self._region_label.setWordWrap(True)
+        region_layout.addWidget(self._region_label)
+
+        self._reset_region_btn = QPushButton("Сканировать всё стекло")
+        self._reset_region_btn.setStyleSheet(f"background-color: {Styles.TEXT_SECONDARY};")
+        self._reset_region_btn.setEnabled(False)
+        self._reset_region_btn.clicked.connect(self._on_reset_region)
+        region_layout.addWidget(self._reset_region_btn)
+
+        layout.addWidget(region_group)
+
         # Настройки сохранения
         save_group = QGroupBox("Сохранение")
         save_layout = QVBoxLayout(save_group)
@@ -291,6 +487,26 @@ class ScanView(QWidget):
         self._format_combo.currentIndexChanged.connect(self._update_settings)
         save_layout.addWidget(self._format_combo)
 
+        # Качество фото внутри PDF (текст всегда сжимается без потерь)
+        save_layout.addWidget(QLabel("Сжатие фото в PDF:"))
+        self._pdf_quality_combo = QComboBox()
+        self._pdf_quality_combo.addItems([
+            "Компактно",
+            "Стандартно",
+            "Максимальное качество"
+        ])
+        self._pdf_quality_combo.setCurrentIndex(1)
+        self._pdf_quality_combo.currentIndexChanged.connect(self._update_settings)
+        save_layout.addWidget(self._pdf_quality_combo)
+
+        self._pdf_mrc_check = QCheckBox("Отделять текст от фона (PDF меньше)")
+        self._pdf_mrc_check.setToolTip(
+            "Текст сохраняется в полном разрешении, цветной фон - в уменьшенном.\n"
+            "Подходит для цветных документов с текстом."
+        )
+        self._pdf_mrc_check.stateChanged.connect(self._update_settings)
+        save_layout.addWidget(self._pdf_mrc_check)
+
         # Имя файла
         save_layout.addWidget(QLabel("Имя файла:"))
         self._filename_edit = QLineEdit()
@@ -388,7 +604,28 @@ class ScanView(QWidget):
         formats = [ScanFormat.PDF, ScanFormat.JPEG, ScanFormat.PNG, ScanFormat.TIFF]
         self._settings.format = formats[self._format_combo.currentIndex()]
 
+        jpeg_qualities = [70, 85, 95]
+        self._settings.jpeg_quality = jpeg_qualities[self._pdf_quality_combo.currentIndex()]
+        self._settings.pdf_mrc = self._pdf_mrc_check.isChecked()
+
         self._settings.file_name = self._filename_edit.text()
+        self._settings.device = self._device_combo.currentData()
+
+    @pyqtSlot(object)
+    def _populate_devices(self, devices: List[ScannerDevice]):
+        """Заполнить список сканеров, сохранив выбор"""
+        current = self._device_combo.currentData()
+
+        self._device_combo.blockSignals(True)
+        self._device_combo.clear()
+        self._device_combo.addItem("Автоматически", None)
+        for device in devices:
+            self._device_combo.addItem(device.description or device.name, device.name)
+        index = self._device_combo.findData(current)
+        self._device_combo.setCurrentIndex(max(index, 0))
+        self._device_combo.blockSignals(False)
+
+        self._settings.device = self._device_combo.currentData()
 
     def _on_browse_folder(self):
         """Выбор папки для сохранения"""
@@ -413,7 +650,7 @@ class ScanView(QWidget):
         self._settings.image_adjustments.sharpness = self._sharpness_slider.value()
 
         # Обновляем предпросмотр если есть отсканированное изображение
-        if self._scanned_image:
+        if self._preview_image:
             self._update_preview()
 
     def _reset_image_settings(self):
@@ -423,7 +660,7 @@ class ScanView(QWidget):
         self._sharpness_slider.setValue(0)
         self._settings.image_adjustments.reset()
 
-        if self._scanned_image:
+        if self._preview_image:
             self._update_preview()
 
     def _on_scan_clicked(self):
@@ -431,36 +668,128 @@ class ScanView(QWidget):
         self._update_settings()
         logger.info(f"Начато сканирование: {self._settings.resolution.value} DPI, формат {self._settings.format.value}")
 
-        # Показываем прогресс
-        self._placeholder_widget.setVisible(False)
-        self._preview_label.setVisible(False)
-        self._progress_widget.setVisible(True)
-        self._progress_bar.setValue(0)
-
-        self._scan_btn.setEnabled(False)
-        self._save_btn.setEnabled(False)
+        self._start_scan_ui()
 
         # Запускаем сканирование в отдельном потоке
-        self._scan_worker = ScanWorker(self._scanner_service, self._settings)
-        self._scan_worker.progress.connect(self._on_scan_progress)
-        self._scan_worker.finished.connect(self._on_scan_finished)
+        if self._settings.source == ScanSource.ADF:
+            # Из автоподатчика - пакетом, страницы сохраняются сразу
+            self._scan_worker = BatchScanWorker(self._scanner_service, self._settings)
+            self._scan_worker.finished.connect(self._on_batch_finished)
+        else:
+            self._scan_worker = ScanWorker(self._scanner_service, self._settings, self.PREVIEW_MAX_SIZE)
+            self._scan_worker.finished.connect(self._on_scan_finished)
+        self._scan_worker.error.connect(self._on_scan_error)
+        self._scan_worker.start()
+
+    def _on_prescan_clicked(self):
+        """Быстрый скан всего стекла для выбора области"""
+        if self._source_combo.currentIndex() != 0:
+            self._source_combo.setCurrentIndex(0)
+        self._update_settings()
+        logger.info("Начат предварительный скан")
+
+        self._start_scan_ui()
+
+        self._scan_worker = PrescanWorker(self._scanner_service, self._settings.device)
+        self._scan_worker.finished.connect(self._on_prescan_finished)
         self._scan_worker.error.connect(self._on_scan_error)
         self._scan_worker.start()
 
+    @pyqtSlot(object)
+    def _on_prescan_finished(self, image):
+        """Показать предварительный скан и предложить область"""
+        self._finish_scan_ui()
+        self._prescan_image = image
+        self._set_scan_buffer(None)
+
+        self._show_image(image)
+        self._preview_label.set_selectable(image.size)
+
+        # Автоматически находим оригинал на стекле
+        region = self._image_processing.detect_content_region(image, ScannerService.PRESCAN_DPI)
+        if region is not None:
+            self._preview_label.set_selection(region.to_pixels(ScannerService.PRESCAN_DPI))
+        self._set_region(region)
+
+    @pyqtSlot(object)
+    def _on_region_selected(self, rect):
+        """Пользователь выделил область на предварительном скане"""
+        if rect is None:
+            self._set_region(None)
+            return
+        self._set_region(ScanRegion.from_pixels(*rect, ScannerService.PRESCAN_DPI))
+
+    def _on_reset_region(self):
+        """Сканировать всё стекло"""
+        self._preview_label.set_selection(None)
+        self._set_region(None)
+
+    def _set_region(self, region: Optional[ScanRegion]):
+        """Запомнить область сканирования"""
+        self._settings.region = region
+        self._reset_region_btn.setEnabled(region is not None)
+        if region is None:
+            self._region_label.setText("Всё стекло")
+        else:
+            self._region_label.setText(
+                f"Область: {region.width:.0f} × {region.height:.0f} мм "
+                f"(отступ {region.left:.0f} мм слева, {region.top:.0f} мм сверху)"
+            )
+            logger.info(f"Выбрана область сканирования: {region}")
+
     @pyqtSlot(str, int)
     def _on_scan_progress(self, message: str, progress: int):
         """Обработчик прогресса сканирования"""
+        # Сервис сканера общий с копированием - показываем только свой прогресс
+        if not self._scan_worker or not self._scan_worker.isRunning():
+            return
         self._progress_bar.setValue(progress)
         self._progress_label.setText(message)
 
     @pyqtSlot(object)
-    def _on_scan_finished(self, image):
-        """Обработчик завершения сканирования"""
+    def _on_scan_preview(self, event):
+        """Показать уже полученную часть страницы"""
+        if not self._scan_worker or not self._scan_worker.isRunning():
+            return
+        self._show_image(event.image)
+
+    def _on_cancel_clicked(self):
+        """Обработчик нажатия кнопки отмены"""
+        self._cancel_requested = True
+        self._cancel_btn.setEnabled(False)
+        self._progress_label.setText("Отмена...")
+        logger.info("Сканирование отменено пользователем")
+        self._scanner_service.cancel_scan()
+
+    def _start_scan_ui(self):
+        """Показать прогресс и заблокировать кнопки на время сканирования"""
+        self._placeholder_widget.setVisible(False)
+        self._preview_label.setVisible(False)
+        self._preview_label.set_selectable(None)
+        self._progress_widget.setVisible(True)
+        self._progress_bar.setValue(0)
+
+        self._scan_btn.setEnabled(False)
+        self._save_btn.setEnabled(False)
+        self._prescan_btn.setEnabled(False)
+        self._cancel_requested = False
+        self._cancel_btn.setEnabled(True)
+        self._cancel_btn.setVisible(True)
+
+    def _finish_scan_ui(self):
+        """Вернуть кнопки в исходное состояние после сканирования"""
         self._scan_btn.setEnabled(True)
+        self._prescan_btn.setEnabled(True)
+        self._cancel_btn.setVisible(False)
         self._progress_widget.setVisible(False)
 
-        if image:
-            self._scanned_image = image
+    @pyqtSlot(object, object)
+    def _on_scan_finished(self, buffer, preview):
+        """Обработчик завершения сканирования"""
+        self._finish_scan_ui()
+
+        if buffer:
+            self._set_scan_buffer(buffer, preview)
             self._save_btn.setEnabled(True)
             self._update_preview()
             logger.info("Сканирование успешно завершено")
@@ -469,34 +798,70 @@ class ScanView(QWidget):
             logger.warning("Сканирование не вернуло изображение")
             QMessageBox.warning(self, "Ошибка", "Не удалось получить изображение от сканера")
 
+    @pyqtSlot(list)
+    def _on_batch_finished(self, paths: List[str]):
+        """Обработчик завершения пакетного сканирования"""
+        self._finish_scan_ui()
+        self._preview_label.setVisible(False)
+        self._placeholder_widget.setVisible(True)
+        self._set_scan_buffer(None)
+
+        logger.info(f"Пакетное сканирование завершено, файлов: {len(paths)}")
+        sound_service.play_success()
+        if len(paths) == 1:
+            message = f"Скан сохранён:\n{paths[0]}"
+        else:
+            message = f"Сохранено файлов: {len(paths)}\nПапка: {self._settings.output_folder}"
+        QMessageBox.information(self, "Готово!", message)
+
+        # Генерируем новое имя для следующего пакета
+        self._filename_edit.setText(f"Скан_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}")
+
     @pyqtSlot(str)
     def _on_scan_error(self, error: str):
         """Обработчик ошибки сканирования"""
-        self._scan_btn.setEnabled(True)
-        self._progress_widget.setVisible(False)
+        self._finish_scan_ui()
+        self._preview_label.setVisible(False)
         self._placeholder_widget.setVisible(True)
+
+        if self._cancel_requested:
+            return
+
         logger.error(f"Ошибка сканирования: {error}")
         sound_service.play_error()
         QMessageBox.warning(self, "Ошибка сканирования", error)
 
+    def _set_scan_buffer(self, buffer: Optional[ScanBuffer], preview: Optional[Image.Image] = None):
+        """Запомнить новый кадр и его уменьшенную копию
+
+        Старый буфер не закрываем явно: его может ещё сохранять фоновый
+        поток, файл удалится, когда на буфер не останется ссылок.
+        """
+        self._scan_buffer = buffer
+        self._preview_image = preview
+
     def _update_preview(self):
         """Обновить предпросмотр"""
-        if not self._scanned_image:
+        if not self._preview_image:
             return
 
-        # Применяем настройки изображения
-        image = self._scanned_image
+        # Применяем настройки изображения к уменьшенной копии
+        image = self._preview_image
         if self._settings.image_adjustments.has_changes:
             image = self._image_processing.apply_adjustments(image, self._settings.image_adjustments)
 
+        self._show_image(image)
+
+    def _show_image(self, image: Image.Image):
+        """Показать изображение в области предпросмотра"""
         # Конвертируем в QPixmap
         if image.mode == 'RGBA':
             data = image.tobytes('raw', 'RGBA')
-            qimg = QImage(data, image.width, image.height, QImage.Format.Format_RGBA8888)
+            qimg = QImage(data, image.width, image.height, image.width * 4, QImage.Format.Format_RGBA8888)
         else:
             image_rgb = image.convert('RGB')
             data = image_rgb.tobytes('raw', 'RGB')
-            qimg = QImage(data, image_rgb.width, image_rgb.height, QImage.Format.Format_RGB888)
+            qimg = QImage(data, image_rgb.width, image_rgb.height, image_rgb.width * 3, QImage.Format.Format_RGB888)
 
         pixmap = QPixmap.fromImage(qimg)
         scaled = pixmap.scaled(
@@ -509,31 +874,35 @@ class ScanView(QWidget):
 
     def _on_save_clicked(self):
         """Обработчик нажатия кнопки сохранения"""
-        if not self._scanned_image:
+        if not self._scan_buffer:
             return
 
         self._update_settings()
 
-        try:
-            # Применяем настройки перед сохранением
-            image_to_save = self._scanned_image
-            if self._settings.image_adjustments.has_changes:
-                image_to_save = self._image_processing.apply_adjustments(
-                    self._scanned_image, self._settings.image_adjustments
-                )
+        # Коррекция и запись идут в фоне, результат придёт через мост
+        output_path = self._scanner_service.save_scan_async(self._scan_buffer, self._settings)
+        self._pending_saves.add(output_path)
+        self._save_btn.setText("СОХРАНЕНИЕ...")
+
+        # Генерируем новое имя для следующего скана
+        self._filename_edit.setText(f"Скан_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}")
+
+    def _on_scan_completed(self, event):
+        """Завершение фонового сохранения (события сканирования обрабатывают рабочие потоки)"""
+        if event.file_path not in self._pending_saves:
+            return
+        self._pending_saves.discard(event.file_path)
+
+        if not self._pending_saves:
+            self._save_btn.setText("СОХРАНИТЬ")
 
-            output_path = self._scanner_service.save_scan(image_to_save, self._settings)
-            logger.info(f"Скан сохранён: {output_path}")
+        if event.success:
+            logger.info(f"Скан сохранён: {event.file_path}")
             sound_service.play_success()
             QMessageBox.information(
                 self, "Готово!",
-                f"Скан сохранён:\n{output_path}"
+                f"Скан сохранён:\n{event.file_path}"
             )
-
-            # Генерируем новое имя для следующего скана
-            self._filename_edit.setText(f"Скан_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}")
-
-        except Exception as e:
-            logger.exception(f"Ошибка сохранения скана: {e}")
+        else:
             sound_service.play_error()
-            QMessageBox.warning(self, "Ошибка", f"Не удалось сохранить скан: {e}")
+            QMessageBox.warning(self, "Ошибка", f"Не удалось сохранить скан: {event.error}")
@@ -0,0 +1,164 @@
+"""
+Мост между сервисами и GUI-потоком
+"""
+
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from PyQt6.QtCore import QObject, Qt, pyqtSignal, QTimer
+
+from ..models import PrinterStatus, ScannerDevice
+from ..services import StatusService, ScannerService
+from ..services.scanner_service import ScanProgressEvent, ScanCompletedEvent, ScanPreviewEvent
+
+
+class ServiceBridge(QObject):
+    """Переносит события сервисов в GUI-поток
+
+    Сервисы вызывают callbacks из своих потоков (таймер статуса, поток
+    сканирования). Мост запоминает последние значения и выдаёт их сигналами
+    уже в GUI-потоке, не чаще одного раза за кадр: частые события
+    (прогресс, предпросмотр, статус) схлопываются, завершения доставляются все.
+    """
+
+    # Статус основного принтера
+    status_changed = pyqtSignal(object)  # PrinterStatus
+
+    # Статус любого принтера парка
+    fleet_status_changed = pyqtSignal(object)  # PrinterStatus
+
+    # Прогресс сканирования
+    scan_progress = pyqtSignal(str, int)
+
+    # Частичный предпросмотр во время сканирования
+    scan_preview = pyqtSignal(object)  # ScanPreviewEvent
+
+    # Обновился список сканеров
+    scanners_changed = pyqtSignal(object)  # List[ScannerDevice]
+
+    # Завершение сканирования/сохранения
+    scan_completed = pyqtSignal(object)  # ScanCompletedEvent
+
+    # Внутренний сигнал: разбудить GUI-поток для доставки
+    _wake = pyqtSignal()
+
+    # Интервал доставки (один кадр при 60 Гц)
+    FRAME_INTERVAL_MS = 16
+
+    def __init__(self, status_service: StatusService, scanner_service: ScannerService, parent=None):
+        super().__init__(parent)
+        self._status_service = status_service
+        self._scanner_service = scanner_service
+
+        self._lock = Lock()
+        self._flush_scheduled = False
+        self._pending_status: Optional[PrinterStatus] = None
+        self._pending_fleet: Dict[str, PrinterStatus] = {}
+        self._pending_progress: Optional[Tuple[str, int]] = None
+        self._pending_preview: Optional[ScanPreviewEvent] = None
+        self._pending_devices: Optional[List[ScannerDevice]] = None
+        self._pending_completed: List[ScanCompletedEvent] = []
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FRAME_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush)
+
+        self._wake.connect(self._on_wake, Qt.ConnectionType.QueuedConnection)
+
+        self._status_service.add_status_changed_callback(self._on_status_changed)
+        self._status_service.add_fleet_status_callback(self._on_fleet_status_changed)
+        self._scanner_service.add_progress_callback(self._on_scan_progress)
+        self._scanner_service.add_preview_callback(self._on_scan_preview)
+        self._scanner_service.add_devices_callback(self._on_scanners_changed)
+        self._scanner_service.add_completed_callback(self._on_scan_completed)
+
+    def _on_status_changed(self, status: PrinterStatus) -> None:
+        """Callback сервиса статуса (поток таймера)"""
+        with self._lock:
+            self._pending_status = status
+        self._schedule_flush()
+
+    def _on_fleet_status_changed(self, status: PrinterStatus) -> None:
+        """Callback статуса принтера парка (поток опроса)"""
+        with self._lock:
+            self._pending_fleet[status.printer_name] = status
+        self._schedule_flush()
+
+    def _on_scan_progress(self, event: ScanProgressEvent) -> None:
+        """Callback прогресса сканирования (поток сканирования)"""
+        with self._lock:
+            self._pending_progress = (event.message, event.progress)
+        self._schedule_flush()
+
+    def _on_scan_preview(self, event: ScanPreviewEvent) -> None:
+        """Callback частичного предпросмотра (поток сканирования)"""
+        with self._lock:
+            self._pending_preview = event
+        self._schedule_flush()
+
+    def _on_scanners_changed(self, devices: List[ScannerDevice]) -> None:
+        """Callback обновления списка сканеров (фоновый поток опроса)"""
+        with self._lock:
+            self._pending_devices = list(devices)
+        self._schedule_flush()
+
+    def _on_scan_completed(self, event: ScanCompletedEvent) -> None:
+        """Callback завершения сканирования"""
+        with self._lock:
+            self._pending_completed.append(event)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Запланировать доставку, если она ещё не запланирована"""
+        with self._lock:
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        # Сигнал в объект GUI-потока из другого потока ставится в очередь
+        self._wake.emit()
+
+    def _on_wake(self) -> None:
+        """Запустить таймер доставки (GUI-поток)"""
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self) -> None:
+        """Доставить накопленные события (GUI-поток)"""
+        with self._lock:
+            status = self._pending_status
+            fleet = list(self._pending_fleet.values())
+            progress = self._pending_progress
+            preview = self._pending_preview
+            devices = self._pending_devices
+            completed = self._pending_completed
+
+            self._pending_status = None
+            self._pending_fleet = {}
+            self._pending_progress = None
+            self._pending_preview = None
+            self._pending_devices = None
+            self._pending_completed = []
+            self._flush_scheduled = False
+
+        for fleet_status in fleet:
+            self.fleet_status_changed.emit(fleet_status)
+        if status is not None:
+            self.status_changed.emit(status)
+        if progress is not None:
+            self.scan_progress.emit(*progress)
+        if preview is not None:
+            self.scan_preview.emit(preview)
+        if devices is not None:
+            self.scanners_changed.emit(devices)
+        for event in completed:
+            self.scan_completed.emit(event)
+
+    def dispose(self) -> None:
+        """Отписаться от сервисов"""
+        self._flush_timer.stop()
+        self._status_service.remove_status_changed_callback(self._on_status_changed)
+        self._status_service.remove_fleet_status_callback(self._on_fleet_status_changed)
+        self._scanner_service.remove_progress_callback(self._on_scan_progress)
+        self._scanner_service.remove_preview_callback(self._on_scan_preview)
+        self._scanner_service.remove_devices_callback(self._on_scanners_changed)
+        self._scanner_service.remove_completed_callback(self._on_scan_completed)
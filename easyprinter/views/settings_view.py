@@ -40,6 +40,9 @@ class SettingsView(QWidget):
 
     navigate_back = pyqtSignal()
 
+    # Включён/выключен постоянный сеанс сканера
+    scanner_session_changed = pyqtSignal(bool)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._update_service = UpdateService()
@@ -150,6 +153,43 @@ class SettingsView(QWidget):
         sound_layout.addWidget(sound_hint)
 
         layout.addWidget(sound_group)
+
+        # Мониторинг
+        metrics_group = QGroupBox("Мониторинг")
+        metrics_layout = QVBoxLayout(metrics_group)
+
+        self._metrics_check = QCheckBox("Передавать метрики системе мониторинга")
+        self._metrics_check.setChecked(settings_storage.preferences.metrics_enabled)
+        self._metrics_check.setStyleSheet(f"font-size: {Styles.FONT_SIZE_LARGE}px;")
+        self._metrics_check.stateChanged.connect(self._on_metrics_changed)
+        metrics_layout.addWidget(self._metrics_check)
+
+        metrics_hint = QLabel(
+            f"Адрес: http://127.0.0.1:{settings_storage.preferences.metrics_port}/metrics"
+        )
+        metrics_hint.setStyleSheet(f"color: {Styles.TEXT_SECONDARY}; font-size: {Styles.FONT_SIZE_NORMAL}px;")
+        metrics_layout.addWidget(metrics_hint)
+
+        layout.addWidget(metrics_group)
+
+        # Сканер
+        scanner_group = QGroupBox("Сканер")
+        scanner_layout = QVBoxLayout(scanner_group)
+
+        self._scanner_session_check = QCheckBox("Держать сканер готовым между сканированиями")
+        self._scanner_session_check.setChecked(settings_storage.preferences.scanner_session_enabled)
+        self._scanner_session_check.setStyleSheet(f"font-size: {Styles.FONT_SIZE_LARGE}px;")
+        self._scanner_session_check.stateChanged.connect(self._on_scanner_session_changed)
+        scanner_layout.addWidget(self._scanner_session_check)
+
+        self._scanner_session_hint = QLabel("Ускоряет повторные сканы и копии. Нужен пакет python-sane (Linux/macOS)")
+        self._scanner_session_hint.setStyleSheet(
+            f"color: {Styles.TEXT_SECONDARY}; font-size: {Styles.FONT_SIZE_NORMAL}px;"
+        )
+        self._scanner_session_hint.setWordWrap(True)
+        scanner_layout.addWidget(self._scanner_session_hint)
+
+        layout.addWidget(scanner_group)
         layout.addStretch()
 
         return widget
@@ -160,6 +200,45 @@ class SettingsView(QWidget):
         settings_storage.preferences.sound_enabled = (state == Qt.CheckState.Checked.value)
         settings_storage.save()
 
+    def _on_metrics_changed(self, state: int):
+        """Обработчик включения/выключения метрик"""
+        from ..services.settings_storage import settings_storage
+        from ..services import metrics_server
+
+        enabled = (state == Qt.CheckState.Checked.value)
+        settings_storage.preferences.metrics_enabled = enabled
+        settings_storage.save()
+
+        if enabled:
+            metrics_server.start(settings_storage.preferences.metrics_port)
+        else:
+            metrics_server.stop()
+
+    def _on_scanner_session_changed(self, state: int):
+        """Обработчик включения/выключения постоянного сеанса сканера"""
+        from ..services.settings_storage import settings_storage
+
+        enabled = (state == Qt.CheckState.Checked.value)
+        settings_storage.preferences.scanner_session_enabled = enabled
+        settings_storage.save()
+        self.scanner_session_changed.emit(enabled)
+
+    def set_scanner_session_unavailable(self):
+        """Сеанс сканера недоступен (нет python-sane): снять и заблокировать флажок"""
+        from ..services.settings_storage import settings_storage
+
+        self._scanner_session_check.blockSignals(True)
+        self._scanner_session_check.setChecked(False)
+        self._scanner_session_check.blockSignals(False)
+        self._scanner_session_check.setEnabled(False)
+        self._scanner_session_hint.setText(
+            "Недоступно: не установлен пакет python-sane. Сканирование идёт через scanimage"
+        )
+
+        if settings_storage.preferences.scanner_session_enabled:
+            settings_storage.preferences.scanner_session_enabled = False
+            settings_storage.save()
+
     def _create_update_tab(self) -> QWidget:
         """Создать вкладку обновлений"""
         widget = QWidget()
@@ -2,16 +2,82 @@
 Представление для отображения статуса принтера
 """
 
+import time
+from typing import Optional
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QFrame, QProgressBar, QGroupBox
+    QPushButton, QLabel, QFrame, QProgressBar, QGroupBox, QComboBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QTimer
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QPointF, QRectF
+from PyQt6.QtGui import QFont, QPainter, QColor, QPen, QPolygonF
 
 from .styles import Styles
 from ..models import PrinterStatus, PrinterState
-from ..services import StatusService
+from ..services import StatusService, HistorySeries
+from .service_bridge import ServiceBridge
+
+
+class StatusHistoryChart(QWidget):
+    """График длины очереди и доступности принтера"""
+
+    # Высота полосы доступности внизу графика
+    UPTIME_STRIP_HEIGHT = 12
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._series: Optional[HistorySeries] = None
+        self.setMinimumHeight(140)
+
+    def set_series(self, series: HistorySeries) -> None:
+        """Установить данные для отображения"""
+        self._series = series
+        self.update()
+
+    def paintEvent(self, event):
+        """Отрисовка графика"""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), QColor("#FAFAFA"))
+
+        series = self._series
+        if series is None or len(series) == 0:
+            painter.setPen(QColor(Styles.TEXT_SECONDARY))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Нет данных")
+            return
+
+        count = len(series)
+        width = self.width()
+        plot_height = self.height() - self.UPTIME_STRIP_HEIGHT - 4
+        step = width / count
+
+        # Полоса доступности: зелёный - в сети, красный - нет, серый - нет данных
+        for index, uptime in enumerate(series.uptime):
+            if uptime < 0:
+                color = QColor("#E0E0E0")
+            elif uptime >= 0.99:
+                color = QColor(Styles.SUCCESS_COLOR)
+            elif uptime > 0:
+                color = QColor(Styles.WARNING_COLOR)
+            else:
+                color = QColor(Styles.DANGER_COLOR)
+            painter.fillRect(
+                QRectF(index * step, plot_height + 4, step + 0.5, self.UPTIME_STRIP_HEIGHT),
+                color
+            )
+
+        # Длина очереди
+        max_jobs = max(max(series.jobs_max), 1)
+        points = QPolygonF()
+        for index, jobs in enumerate(series.jobs_mean):
+            x = (index + 0.5) * step
+            y = plot_height - jobs / max_jobs * (plot_height - 16)
+            points.append(QPointF(x, y))
+
+        painter.setPen(QPen(QColor(Styles.PRIMARY_COLOR), 2))
+        painter.drawPolyline(points)
+
+        painter.setPen(QColor(Styles.TEXT_SECONDARY))
+        painter.drawText(4, 14, f"Заданий, макс.: {max_jobs}")
 
 
 class StatusView(QWidget):
@@ -19,19 +85,21 @@ class StatusView(QWidget):
 
     navigate_back = pyqtSignal()
 
-    def __init__(self, status_service: StatusService, parent=None):
+    # Периоды графика истории (секунды)
+    HISTORY_PERIODS = [3600, 86400, 7 * 86400]
+
+    # Как часто перестраивать график истории (секунды)
+    HISTORY_REFRESH_INTERVAL = 30
+
+    def __init__(self, status_service: StatusService, service_bridge: ServiceBridge, parent=None):
         super().__init__(parent)
         self._status_service = status_service
+        self._history_updated_at = 0.0
 
         self._init_ui()
 
-        # Подписываемся на обновления статуса
-        self._status_service.add_status_changed_callback(self._on_status_changed)
-
-        # Таймер для обновления интерфейса
-        self._update_timer = QTimer(self)
-        self._update_timer.timeout.connect(self._update_display)
-        self._update_timer.start(1000)
+        # Обновления статуса приходят в GUI-поток через мост
+        service_bridge.status_changed.connect(self._on_status_changed)
 
     def _init_ui(self):
         """Инициализация интерфейса"""
@@ -138,6 +206,21 @@ class StatusView(QWidget):
 
         content_layout.addWidget(queue_group)
 
+        # История очереди и доступности
+        history_group = QGroupBox("История")
+        history_layout = QVBoxLayout(history_group)
+
+        self._history_period_combo = QComboBox()
+        self._history_period_combo.addItems(["1 час", "24 часа", "7 дней"])
+        self._history_period_combo.setCurrentIndex(1)
+        self._history_period_combo.currentIndexChanged.connect(self._update_history_chart)
+        history_layout.addWidget(self._history_period_combo)
+
+        self._history_chart = StatusHistoryChart()
+        history_layout.addWidget(self._history_chart)
+
+        content_layout.addWidget(history_group)
+
         # Возможности
         capabilities_group = QGroupBox("Возможности")
         capabilities_layout = QHBoxLayout(capabilities_group)
@@ -184,14 +267,16 @@ class StatusView(QWidget):
         refresh_btn.clicked.connect(self._refresh_status)
         main_layout.addWidget(refresh_btn)
 
+    @pyqtSlot(object)
     def _on_status_changed(self, status: PrinterStatus):
-        """Callback при изменении статуса"""
-        # Обновление будет происходить через таймер
-        pass
+        """Обработчик изменения статуса (GUI-поток)"""
+        if self.isVisible():
+            self._update_display(status)
 
-    def _update_display(self):
+    def _update_display(self, status: Optional[PrinterStatus] = None):
         """Обновить отображение статуса"""
-        status = self._status_service.get_current_status()
+        if status is None:
+            status = self._status_service.get_current_status()
 
         # Обновляем индикатор
         if status.is_online:
@@ -259,10 +344,29 @@ class StatusView(QWidget):
             f"Последнее обновление: {status.last_updated.strftime('%H:%M:%S')}"
         )
 
+        # График истории перестраиваем реже, чем остальной статус
+        if time.time() - self._history_updated_at >= self.HISTORY_REFRESH_INTERVAL:
+            self._update_history_chart()
+
+    def _update_history_chart(self):
+        """Перестроить график истории статуса"""
+        self._history_updated_at = time.time()
+
+        status = self._status_service.get_current_status()
+        if not status.printer_name:
+            return
+
+        period = self.HISTORY_PERIODS[self._history_period_combo.currentIndex()]
+        end = time.time()
+        # Одна точка на ~4 пикселя ширины графика
+        points = max(10, self._history_chart.width() // 4)
+        series = self._status_service.get_history().query(status.printer_name, end - period, end, points)
+        self._history_chart.set_series(series)
+
     def _refresh_status(self):
         """Принудительное обновление статуса"""
-        self._status_service._update_status()
-        self._update_display()
+        # Опрос идёт в фоне, результат придёт сигналом status_changed
+        self._status_service.refresh()
 
     def showEvent(self, event):
         """При показе страницы"""
@@ -0,0 +1,257 @@
+"""
+Лента миниатюр страниц PDF
+"""
+
+from collections import deque
+from threading import Condition, Thread
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+from PyQt6.QtWidgets import QListView, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QSize, pyqtSignal
+from PyQt6.QtGui import QImage, QColor
+import fitz
+
+from .page_render_cache import PageKey, PageRenderCache, render_pdf_page
+from ..services import logger
+
+
+class ThumbnailRenderer(QObject):
+    """Пул потоков, рисующих миниатюры
+
+    Запросы обслуживаются с конца: первыми рисуются страницы, до которых
+    пользователь докрутил последними. Очередь ограничена - при быстрой
+    прокрутке страницы, пролистанные мимо, выбрасываются. Каждый поток
+    открывает документ сам: fitz.Document не делится между потоками.
+    """
+
+    # Миниатюра готова и лежит в кэше: ключ страницы
+    rendered = pyqtSignal(object)
+
+    # Сколько запросов может ждать отрисовки
+    MAX_PENDING = 48
+
+    def __init__(self, cache: PageRenderCache, workers: int = 2, parent=None):
+        super().__init__(parent)
+        self._cache = cache
+        self._workers = workers
+        self._condition = Condition()
+        self._pending: Deque[Tuple[str, PageKey]] = deque()
+        self._queued: set = set()
+        self._threads: List[Thread] = []
+        self._stopped = False
+
+    def request(self, path: str, key: PageKey) -> None:
+        """Поставить страницу в очередь (повторный запрос поднимает её наверх)"""
+        with self._condition:
+            if self._stopped:
+                return
+            if key in self._queued:
+                self._pending.remove((path, key))
+            self._pending.append((path, key))
+            self._queued.add(key)
+
+            while len(self._pending) > self.MAX_PENDING:
+                _, dropped = self._pending.popleft()
+                self._queued.discard(dropped)
+
+            if not self._threads:
+                for n in range(self._workers):
+                    thread = Thread(target=self._render_loop, name=f"pdf-thumbnails-{n}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+            self._condition.notify()
+
+    def is_queued(self, key: PageKey) -> bool:
+        with self._condition:
+            return key in self._queued
+
+    def clear(self) -> None:
+        """Отказаться от всех ожидающих запросов"""
+        with self._condition:
+            self._pending.clear()
+            self._queued.clear()
+
+    def stop(self) -> None:
+        """Остановить потоки"""
+        with self._condition:
+            self._stopped = True
+            self._pending.clear()
+            self._queued.clear()
+            self._condition.notify_all()
+
+    def _render_loop(self) -> None:
+        documents: Dict[Hashable, 'fitz.Document'] = {}
+
+        try:
+            while True:
+                with self._condition:
+                    while not self._pending and not self._stopped:
+                        self._condition.wait()
+                    if self._stopped:
+                        return
+                    path, key = self._pending.pop()
+
+                document_key, page, width, height = key
+                try:
+                    document = documents.get(document_key)
+                    if document is None:
+                        # Держим открытым только текущий документ
+                        for old in documents.values():
+                            old.close()
+                        documents = {document_key: fitz.open(path)}
+                        document = documents[document_key]
+
+                    self._cache.put(key, render_pdf_page(document[page], width, height))
+                    rendered = True
+                except Exception as e:
+                    logger.warning(f"Не удалось отрисовать миниатюру страницы {page + 1}: {e}")
+                    rendered = False
+
+                with self._condition:
+                    self._queued.discard(key)
+                if rendered:
+                    # Сигнал из чужого потока доставляется в GUI-поток очередью
+                    self.rendered.emit(key)
+        finally:
+            for document in documents.values():
+                document.close()
+
+
+class PageThumbnailModel(QAbstractListModel):
+    """Страницы документа как элементы списка; миниатюры рисуются по запросу
+
+    QListView запрашивает данные только для видимых строк, поэтому
+    рисуются лишь те миниатюры, которые пользователь действительно видит.
+    """
+
+    def __init__(self, renderer: ThumbnailRenderer, cache: PageRenderCache,
+                 thumbnail_size: QSize, ratio: float = 1.0, parent=None):
+        super().__init__(parent)
+        self._renderer = renderer
+        self._cache = cache
+        self._path: Optional[str] = None
+        self._document_key: Optional[Hashable] = None
+        self._page_count = 0
+        self._device_size = thumbnail_size
+        self._ratio = ratio
+        self._placeholder = QImage()
+        self.set_device_size(thumbnail_size, ratio)
+
+        self._renderer.rendered.connect(self._on_rendered)
+
+    def set_device_size(self, size: QSize, ratio: float) -> None:
+        """Размер миниатюры в физических пикселях и масштаб экрана"""
+        self._device_size = size
+        self._ratio = ratio
+        self._placeholder = QImage(size, QImage.Format.Format_RGB888)
+        self._placeholder.fill(QColor("#E0E0E0"))
+        self._placeholder.setDevicePixelRatio(ratio)
+
+    def set_document(self, path: Optional[str], document_key: Optional[Hashable], page_count: int) -> None:
+        """Показать страницы другого документа"""
+        self.beginResetModel()
+        self._renderer.clear()
+        self._path = path
+        self._document_key = document_key
+        self._page_count = page_count if path else 0
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._page_count
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < self._page_count:
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(index.row() + 1)
+
+        if role == Qt.ItemDataRole.DecorationRole:
+            key = self._key(index.row())
+            image = self._cache.get(key)
+            if image is not None:
+                if image.devicePixelRatio() != self._ratio:
+                    image.setDevicePixelRatio(self._ratio)
+                return image
+            if not self._renderer.is_queued(key):
+                self._renderer.request(self._path, key)
+            return self._placeholder
+
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"Страница {index.row() + 1}"
+
+        return None
+
+    def _key(self, row: int) -> PageKey:
+        return self._document_key, row, self._device_size.width(), self._device_size.height()
+
+    def _on_rendered(self, key: PageKey) -> None:
+        """Миниатюра готова (GUI-поток)"""
+        if key[0] != self._document_key or key[2:] != (self._device_size.width(), self._device_size.height()):
+            return
+        index = self.index(key[1])
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class ThumbnailStrip(QListView):
+    """Горизонтальная лента миниатюр с выбором страницы"""
+
+    # Выбрана страница (номер с нуля)
+    page_selected = pyqtSignal(int)
+
+    # Размер миниатюры в логических пикселях
+    THUMBNAIL_SIZE = QSize(72, 96)
+
+    # Память под миниатюры (около 400 штук)
+    CACHE_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cache = PageRenderCache(self.CACHE_BYTES)
+        self._renderer = ThumbnailRenderer(self._cache, parent=self)
+        self._model = PageThumbnailModel(self._renderer, self._cache, self._device_size(),
+                                         self.devicePixelRatioF(), self)
+        self.setModel(self._model)
+
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(False)
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
+        # Одинаковый размер строк - QListView не опрашивает все 1000 страниц ради раскладки
+        self.setUniformItemSizes(True)
+        self.setIconSize(self.THUMBNAIL_SIZE)
+        self.setGridSize(QSize(self.THUMBNAIL_SIZE.width() + 16, self.THUMBNAIL_SIZE.height() + 28))
+        self.setFixedHeight(self.THUMBNAIL_SIZE.height() + 48)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        # Отступы карточки-родителя съели бы высоту ленты
+        self.setStyleSheet("QListView { padding: 0px; border: none; background: transparent; }")
+
+        self.selectionModel().currentChanged.connect(self._on_current_changed)
+
+    def _device_size(self) -> QSize:
+        ratio = self.devicePixelRatioF()
+        return QSize(round(self.THUMBNAIL_SIZE.width() * ratio), round(self.THUMBNAIL_SIZE.height() * ratio))
+
+    def set_document(self, path: Optional[str], document_key: Optional[Hashable], page_count: int) -> None:
+        """Показать миниатюры документа (None - очистить ленту)"""
+        self._model.set_device_size(self._device_size(), self.devicePixelRatioF())
+        self._model.set_document(path, document_key, page_count)
+
+    def set_current_page(self, page: int) -> None:
+        """Выделить страницу, не порождая page_selected"""
+        index = self._model.index(page)
+        if not index.isValid() or index == self.currentIndex():
+            return
+        self.selectionModel().blockSignals(True)
+        self.setCurrentIndex(index)
+        self.selectionModel().blockSignals(False)
+        self.scrollTo(index, QAbstractItemView.ScrollHint.EnsureVisible)
+
+    def stop(self) -> None:
+        """Остановить фоновую отрисовку"""
+        self._renderer.stop()
+
+    def _on_current_changed(self, current: QModelIndex, previous: QModelIndex) -> None:
+        if current.isValid():
+            self.page_selected.emit(current.row())